@@ -0,0 +1,156 @@
+"""
+API de subida local para benchmarks y pruebas: recibe el multipart de upload_files y
+responde {"link": ...}, con latencia y respuestas 429/5xx inyectables.
+
+Uso (desde '1 automatizacion-web'):
+    python -m benchmarks.api_stub --puerto 8000 --latencia 0.2 --error-429 0.1 --error-5xx 0.05
+    URL_API=http://127.0.0.1:8000/upload python main.py
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, List
+
+
+class _ManejadorApiStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        servidor: ApiStub = self.server
+        largo = int(self.headers.get("Content-Length") or 0)
+        recibidos = 0
+        while recibidos < largo:
+            bloque = self.rfile.read(min(64 * 1024, largo - recibidos))
+            if not bloque:
+                break
+            recibidos += len(bloque)
+
+        estado = servidor.elegir_estado()
+        if servidor.latencia:
+            time.sleep(servidor.latencia + servidor.rnd_uniforme(0, servidor.jitter))
+
+        if estado == 200:
+            cuerpo = {"link": f"http://{servidor.server_address[0]}:{servidor.server_address[1]}/archivos/{servidor.siguiente_id()}"}
+        elif estado == 429:
+            cuerpo = {"detail": "Too Many Requests"}
+        else:
+            cuerpo = {"detail": "Internal Server Error"}
+        servidor.registrar(estado, recibidos)
+
+        datos = json.dumps(cuerpo).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, *args):
+        pass
+
+
+class ApiStub(ThreadingHTTPServer):
+    """
+    Servidor HTTP local que imita la API de subida.
+
+    Args:
+        latencia: Segundos de espera antes de responder cada petición
+        jitter: Segundos adicionales aleatorios (uniforme entre 0 y jitter)
+        error_429: Probabilidad de responder 429
+        error_5xx: Probabilidad de responder 500/502/503
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", puerto: int = 0, latencia: float = 0.0, jitter: float = 0.0,
+                 error_429: float = 0.0, error_5xx: float = 0.0, semilla: int = 42):
+        super().__init__((host, puerto), _ManejadorApiStub)
+        self.latencia = latencia
+        self.jitter = jitter
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self._rnd = random.Random(semilla)
+        self._lock = threading.Lock()
+        self._id = 0
+        self.peticiones: List[Dict[str, Any]] = []
+        self._hilo = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/upload"
+
+    def rnd_uniforme(self, a: float, b: float) -> float:
+        with self._lock:
+            return self._rnd.uniform(a, b)
+
+    def elegir_estado(self) -> int:
+        with self._lock:
+            valor = self._rnd.random()
+            if valor < self.error_429:
+                return 429
+            if valor < self.error_429 + self.error_5xx:
+                return self._rnd.choice((500, 502, 503))
+            return 200
+
+    def siguiente_id(self) -> int:
+        with self._lock:
+            self._id += 1
+            return self._id
+
+    def registrar(self, estado: int, bytes_recibidos: int):
+        with self._lock:
+            self.peticiones.append({"estado": estado, "bytes": bytes_recibidos})
+
+    def resumen(self) -> Dict[str, Any]:
+        with self._lock:
+            estados: Dict[int, int] = {}
+            for p in self.peticiones:
+                estados[p["estado"]] = estados.get(p["estado"], 0) + 1
+            return {
+                "peticiones": len(self.peticiones),
+                "estados": estados,
+                "bytes": sum(p["bytes"] for p in self.peticiones)
+            }
+
+    def iniciar(self) -> "ApiStub":
+        """Atiende peticiones en un hilo de fondo"""
+        self._hilo = threading.Thread(target=self.serve_forever, daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API de subida local con latencia y errores inyectables")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--latencia", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-429", type=float, default=0.0)
+    parser.add_argument("--error-5xx", type=float, default=0.0)
+    args = parser.parse_args()
+
+    servidor = ApiStub(args.host, args.puerto, args.latencia, args.jitter, args.error_429, args.error_5xx)
+    print(f"API stub escuchando en {servidor.url} (Ctrl+C para detener)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        print(json.dumps(servidor.resumen(), indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Benchmark de latencia de WebAutomationDownloader contra el portal local (benchmarks/portal_mock.py):
+levanta el portal, apunta URL_PAGE a él y repite la descarga de los tres servicios, informando
+la duración total y el presupuesto de esperas/trabajo (RegistroTiempos) por servicio.
+
+Con --http --sin-data-url los botones no exponen la URL: la primera repetición descarga con
+el clic y aprende la URL (datos_procesados/urls_descarga.json del directorio temporal), y
+las siguientes la usan por HTTP; el paso descarga_http muestra cuándo se tomó ese camino.
+
+Requiere Chrome y chromedriver, igual que la descarga real.
+
+Uso (desde '1 automatizacion-web'):
+    python -m benchmarks.bench_descargas --repeticiones 5 --retardo-pagina 0.2 --retardo-descarga 1 --kbps 5000
+    python -m benchmarks.bench_descargas --paralelo --http
+    python -m benchmarks.bench_descargas --http --sin-data-url --repeticiones 5
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from benchmarks.portal_mock import PortalMock, generar_archivos_portal, agregar_argumentos_portal
+
+
+def percentiles(valores, qs=(50, 90, 99)):
+    return {f"p{q}": float(np.percentile(valores, q)) for q in qs}
+
+
+def _linea(nombre, valores):
+    p = percentiles(valores)
+    return f"   {nombre.ljust(28)} p50 {p['p50']:7.2f}s | p90 {p['p90']:7.2f}s | p99 {p['p99']:7.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de descargas contra el portal local")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--paralelo", action="store_true", help="Un navegador por servicio")
+    parser.add_argument("--http", action="store_true", help="Descargar por HTTP con las cookies del navegador")
+    parser.add_argument("--max-wait", type=int, default=None,
+                        help="Espera máxima por descarga (s); por defecto, la de cada servicio")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar la salida del descargador")
+    agregar_argumentos_portal(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        print("Generando archivos del portal...")
+        generar_archivos_portal(os.path.join(directorio, "portal"), args.marcas, args.filas_autofix,
+                                args.filas_express, args.filas_repcar)
+
+        with PortalMock(os.path.join(directorio, "portal"), marcas=args.marcas,
+                        retardo_pagina=args.retardo_pagina, retardo_descarga=args.retardo_descarga,
+                        kbps=args.kbps, data_url=not args.sin_data_url) as portal:
+            # config.config lee las variables al importarse: se fijan antes de importar el controlador
+            os.environ["URL_PAGE"] = portal.url
+            os.environ["URL_USERNAME"] = portal.usuario
+            os.environ["URL_PASSWORD"] = portal.clave
+            from controller.obtener_datos_controller import download_all_files_single_session, RegistroTiempos
+
+            # Las descargas quedan en <cwd>/data_sin_procesar
+            os.chdir(directorio)
+            totales = []
+            pasos = defaultdict(list)
+            servicios = defaultdict(list)
+            fallidas = 0
+            for i in range(args.repeticiones):
+                print(f"Repetición {i + 1}/{args.repeticiones}...")
+                registro = RegistroTiempos()
+                salida = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+                inicio = time.perf_counter()
+                with salida:
+                    resultados = download_all_files_single_session(
+                        max_wait_time=args.max_wait, clean_download_dir=True, parallel=args.paralelo,
+                        modo_http=args.http, registro_tiempos=registro)
+                totales.append(time.perf_counter() - inicio)
+                fallidas += sum(1 for s in ("auto_express", "auto_fix", "mundo_repcar") if not resultados.get(s))
+
+                for servicio, datos in registro.reporte().items():
+                    servicios[servicio].append((datos["total"], datos["espera"], datos["trabajo"]))
+                    for paso, valores in datos["pasos"].items():
+                        pasos[(servicio, paso)].append(valores["espera"] + valores["trabajo"])
+
+            print("\n" + "=" * 72)
+            modo = ("paralelo" if args.paralelo else "sesión única") + (" + HTTP" if args.http else "") \
+                + (" sin data-url" if args.sin_data_url else "")
+            print(f"DESCARGAS ({modo}, {args.repeticiones} repeticiones)")
+            print("=" * 72)
+            print(_linea("total", totales))
+            for servicio, valores in servicios.items():
+                total, espera, trabajo = (np.array(v) for v in zip(*valores))
+                print(f"\n{servicio}: espera {np.median(espera):.2f}s | trabajo {np.median(trabajo):.2f}s (medianas)")
+                print(_linea("total", total))
+                for (s, paso), duraciones in pasos.items():
+                    if s == servicio:
+                        print(_linea(paso, duraciones))
+
+            resumen = defaultdict(int)
+            for descarga in portal.descargas:
+                resumen[descarga["proveedor"]] += 1
+            print(f"\nPortal: {len(portal.sesiones)} logins, descargas servidas {dict(resumen)}")
+            print(f"Descargas fallidas: {fallidas}")
+
+
+if __name__ == "__main__":
+    main()
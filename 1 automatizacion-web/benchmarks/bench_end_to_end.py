@@ -0,0 +1,143 @@
+"""
+Benchmark de punta a punta sin el sitio de los proveedores ni la API real: genera archivos
+sintéticos, levanta la API stub y ejecuta procesamiento -> export_data -> upload_files.
+
+Informa filas/s por proveedor, tiempos por etapa, pico de memoria y percentiles de latencia de subida.
+
+Uso (desde '1 automatizacion-web'):
+    python -m benchmarks.bench_end_to_end --filas-express 200000 --filas-repcar 200000 \\
+        --hojas-autofix 50 --filas-autofix 2000 --latencia 0.1 --error-429 0.1 --repeticiones 3
+"""
+import io
+import os
+import sys
+import json
+import argparse
+import tempfile
+import contextlib
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from benchmarks.generadores import generar_archivos_proveedores
+from benchmarks.api_stub import ApiStub
+from controller.fetch_data_controller import ClienteSubida, configurar_cliente_subida
+from utils.memoria import rss_pico_mb
+from utils.metricas import RegistroMetricas
+
+
+ETAPAS = ('lectura', 'transformacion', 'validacion', 'exportacion', 'subida', 'pipeline')
+
+
+def percentiles(valores, qs=(50, 90, 99)):
+    if not valores:
+        return {f"p{q}": None for q in qs}
+    return {f"p{q}": float(np.percentile(valores, q)) for q in qs}
+
+
+def ejecutar_repeticion(metricas, concurrencia, verbose):
+    # Import tardío: main importa el controlador de descargas (selenium)
+    from main import ejecutar_pipelines
+
+    salida = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with salida:
+        return ejecutar_pipelines(forzar=True, max_concurrencia=concurrencia, metricas=metricas)
+
+
+def leer_metricas(ruta):
+    """
+    Agrupa las líneas del JSONL: (proveedor, etapa) -> lista de líneas.
+    """
+    lineas = defaultdict(list)
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            dato = json.loads(linea)
+            lineas[(dato["proveedor"], dato["etapa"])].append(dato)
+    return lineas
+
+
+def imprimir_reporte(filas, lineas, resultados, stub, rss):
+    print("\n" + "=" * 72)
+    print("RESULTADOS (mediana de las repeticiones)")
+    print("=" * 72)
+    for proveedor, cantidad in filas.items():
+        total = [l["segundos"] for l in lineas[(proveedor, "pipeline")]]
+        if not total:
+            continue
+        mediana = float(np.median(total))
+        print(f"\n{proveedor}: {cantidad:,} filas | pipeline {mediana:.2f}s | {cantidad / mediana:,.0f} filas/s")
+        for etapa in ETAPAS[:-1]:
+            segundos = [l["segundos"] for l in lineas[(proveedor, etapa)] if l["segundos"] is not None]
+            if segundos:
+                print(f"   {etapa.ljust(15)} {float(np.median(segundos)):8.3f}s")
+
+    subidas = [l for (p, e), ls in lineas.items() if e == "subida" for l in ls]
+    latencias = [l["latencia_total"] for l in subidas if l.get("latencia_total") is not None]
+    totales = [l["segundos"] for l in subidas if l["segundos"] is not None]
+    ttfb = [l["ttfb"] for l in subidas if l.get("ttfb") is not None]
+    fallidas = sum(1 for l in subidas if not l.get("exitosa"))
+
+    print("\nSubidas:")
+    print(f"   exitosas {len(subidas) - fallidas} | fallidas {fallidas}")
+    for nombre, valores in (("latencia (último intento)", latencias), ("TTFB", ttfb),
+                            ("total con reintentos", totales)):
+        p = percentiles(valores)
+        if p["p50"] is not None:
+            print(f"   {nombre.ljust(26)} p50 {p['p50']:.3f}s | p90 {p['p90']:.3f}s | p99 {p['p99']:.3f}s")
+
+    resumen = stub.resumen()
+    print(f"\nAPI stub: {resumen['peticiones']} peticiones, estados {resumen['estados']}, "
+          f"{resumen['bytes']:,} bytes recibidos")
+    print(f"Pico de memoria (RSS del proceso): {rss:,.1f} MB" if rss is not None else "Pico de memoria: n/d")
+    errores = [(p, r.get("error")) for p, r in resultados if not r or not r.get("subida_exitosa")]
+    if errores:
+        print(f"Errores: {errores}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de punta a punta con archivos sintéticos y API stub")
+    parser.add_argument("--hojas-autofix", type=int, default=20)
+    parser.add_argument("--filas-autofix", type=int, default=2000, help="Filas por hoja de AutoFix")
+    parser.add_argument("--filas-express", type=int, default=50_000)
+    parser.add_argument("--filas-repcar", type=int, default=50_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--concurrencia", type=int, default=3, help="Proveedores en paralelo")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Latencia de la API stub (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latencia aleatoria adicional (s)")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Probabilidad de 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Probabilidad de 5xx")
+    parser.add_argument("--reintentos", type=int, default=5)
+    parser.add_argument("--retry-delay", type=float, default=0.05, help="Delay base entre reintentos (s)")
+    parser.add_argument("--directorio", help="Directorio de trabajo (por defecto, uno temporal)")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar la salida del pipeline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directorio = os.path.abspath(args.directorio or tmp)
+        os.makedirs(directorio, exist_ok=True)
+        os.chdir(directorio)
+
+        print(f"Generando archivos sintéticos en {directorio}...")
+        filas = generar_archivos_proveedores("data_sin_procesar", args.filas_autofix, args.hojas_autofix,
+                                             args.filas_express, args.filas_repcar)
+
+        with ApiStub(latencia=args.latencia, jitter=args.jitter, error_429=args.error_429,
+                     error_5xx=args.error_5xx) as stub:
+            configurar_cliente_subida(ClienteSubida(api_url=stub.url, max_concurrencia=args.concurrencia,
+                                                    max_retries=args.reintentos, retry_delay=args.retry_delay,
+                                                    verbose=False))
+            metricas = RegistroMetricas(directorio=os.path.join(directorio, "metricas"))
+            resultados = []
+            for i in range(args.repeticiones):
+                print(f"Repetición {i + 1}/{args.repeticiones}...")
+                resultados = ejecutar_repeticion(metricas, args.concurrencia, args.verbose)
+
+            imprimir_reporte(filas, leer_metricas(metricas.ruta), resultados, stub, rss_pico_mb())
+            if args.directorio:
+                print(f"\nMétricas completas: {metricas.ruta}")
+            configurar_cliente_subida(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark de motores de lectura de Excel sobre un libro AutoFix sintético con varias hojas.
+
+Uso (desde '1 automatizacion-web'):
+    python -m benchmarks.bench_lectores_excel --hojas 100 --filas 2000 --repeticiones 3
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.lectores import MOTORES_EXCEL, motor_disponible, leer_excel
+from benchmarks.generadores import generar_libro_autofix
+
+
+def medir(motor, ruta, repeticiones):
+    tiempos = []
+    filas = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        hojas = leer_excel(ruta, sheet_name=None, motor=motor)
+        tiempos.append(time.perf_counter() - inicio)
+        filas = sum(len(df) for df in hojas.values())
+    return min(tiempos), filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de motores de lectura de Excel")
+    parser.add_argument("--hojas", type=int, default=50)
+    parser.add_argument("--filas", type=int, default=2000, help="Filas por hoja")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--archivo", help="Usar un libro existente en lugar de generar uno")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = args.archivo
+        if not ruta:
+            ruta = os.path.join(tmp, "autofix_sintetico.xlsx")
+            print(f"Generando libro sintético: {args.hojas} hojas x {args.filas} filas...")
+            generar_libro_autofix(ruta, args.hojas, args.filas)
+        print(f"Archivo: {ruta} ({os.path.getsize(ruta):,} bytes)\n")
+
+        resultados = []
+        for motor in MOTORES_EXCEL:
+            if not motor_disponible(motor):
+                print(f"{motor.ljust(20)} - no disponible")
+                continue
+            segundos, filas = medir(motor, ruta, args.repeticiones)
+            resultados.append((motor, segundos, filas))
+            print(f"{motor.ljust(20)} - {segundos:.2f}s ({filas / segundos:,.0f} filas/s)")
+
+        if resultados:
+            base = next((s for m, s, _ in resultados if m == 'openpyxl'), None)
+            if base:
+                print("\nAceleración respecto de openpyxl:")
+                for motor, segundos, _ in resultados:
+                    print(f"   {motor.ljust(20)} x{base / segundos:.2f}")
+
+
+if __name__ == "__main__":
+    main()
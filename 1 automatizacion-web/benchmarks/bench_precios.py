@@ -0,0 +1,65 @@
+"""
+Benchmark del parser de precios vectorizado contra la implementación anterior de formatear_precio.
+
+Uso (desde '1 automatizacion-web'):
+    python -m benchmarks.bench_precios --filas 1000000
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from utils.utils import parsear_precio
+
+
+def formatear_precio_anterior(serie):
+    """
+    Implementación anterior: texto, quitar comas y puntos, y dividir por 100.
+    """
+    serie = serie.astype(str)
+    serie = serie.str.replace(',', '').str.replace('.', '', regex=False)
+    return (pd.to_numeric(serie, errors='coerce') / 100).fillna(0)
+
+
+def generar_series(filas, semilla=42):
+    rng = np.random.default_rng(semilla)
+    valores = rng.integers(100, 10_000_000, filas) / 100
+    texto_ar = pd.Series([f"{v:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.') for v in valores], dtype=object)
+    numerica = pd.Series(valores)
+    mixta = pd.Series(np.where(np.arange(filas) % 2 == 0, texto_ar.to_numpy(), valores), dtype=object)
+    return valores, {"texto '1.234,56'": texto_ar, "float de Excel": numerica, "mixta": mixta}
+
+
+def medir(funcion, serie, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(serie)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del parser de precios")
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    esperado, series = generar_series(args.filas)
+    print(f"Filas: {args.filas:,}\n")
+    for nombre, serie in series.items():
+        t_anterior, r_anterior = medir(formatear_precio_anterior, serie, args.repeticiones)
+        t_nuevo, r_nuevo = medir(parsear_precio, serie, args.repeticiones)
+        ok_anterior = np.isclose(r_anterior.to_numpy(dtype=float), esperado).mean()
+        ok_nuevo = np.isclose(r_nuevo.to_numpy(dtype=float), esperado).mean()
+        print(f"{nombre}:")
+        print(f"   anterior   {t_anterior:.3f}s | correctos {ok_anterior:.1%}")
+        print(f"   vectorial  {t_nuevo:.3f}s | correctos {ok_nuevo:.1%} | x{t_anterior / t_nuevo:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Generadores de archivos sintéticos con el formato de cada proveedor, para benchmarks sin el sitio real.
+"""
+import os
+import csv
+import random
+from openpyxl import Workbook
+
+
+COLUMNAS_AUTOFIX = ['CODIGO', 'DESCR', 'NROORI', 'PRECIO', 'DESCR2', 'CODPRO', 'ORIGEN',
+                    'CANPED', 'FOTO', 'COEF', 'CODRUB']
+
+COLUMNAS_EXPRESS = ['CODIGO PROVEEDOR', 'DESCRIPCION', 'PRECIO DE LISTA', 'PRECIO OFERTA/OUTLET',
+                    'CODIGO RUBRO', 'RUBRO', 'CODIGO MARCA', 'MARCA', 'IVA', 'CODIGO BARRA']
+
+COLUMNAS_REPCAR = ['Cod. Fabrica', 'Marca', 'Cod. Articulo', 'Descripcion', 'Rubro',
+                   'Importe', 'Iva 105', 'Imagen']
+
+MARCAS = ['BOSCH', 'FRAM', 'SKF', 'VALEO', 'NGK', 'MAHLE', 'CORVEN', 'FERODO', 'WEGA', 'MONROE']
+RUBROS = ['FILTROS', 'FRENOS', 'SUSPENSIÓN', 'ENCENDIDO', 'EMBRAGUE', 'REFRIGERACIÓN', 'ILUMINACIÓN']
+
+
+def _precio_texto(rnd):
+    """Precio con coma decimal y punto de miles, como en las listas de los proveedores"""
+    entero = rnd.randint(100, 9_999_999)
+    return f"{entero:,}".replace(',', '.') + f",{rnd.randint(0, 99):02d}"
+
+
+def generar_libro_autofix(ruta, hojas, filas, semilla=42):
+    """
+    Genera un libro con una hoja por marca y las columnas del archivo de AutoFix.
+    """
+    rnd = random.Random(semilla)
+    wb = Workbook(write_only=True)
+    for h in range(hojas):
+        ws = wb.create_sheet(title=f"MARCA{h:03d}")
+        ws.append(COLUMNAS_AUTOFIX)
+        for i in range(filas):
+            ws.append([
+                f"AF{h:03d}{i:06d}", f"REPUESTO {i} MODELO {rnd.randint(1, 999)}", f"OR{i}",
+                f"{rnd.randint(100, 999999)},{rnd.randint(0, 99):02d}", f"LINEA {rnd.randint(1, 50)}",
+                rnd.randint(1, 9999), "NAC", 0, None, 1.0, rnd.randint(1, 300)
+            ])
+    wb.save(ruta)
+
+
+def generar_express(ruta, filas, semilla=42):
+    """
+    Genera la lista de Express: 10 filas de encabezado del proveedor antes de los títulos de columnas
+    y precios como números de Excel.
+    """
+    rnd = random.Random(semilla)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="Lista")
+    ws.append(["AUTOREPUESTOS EXPRESS - LISTA DE PRECIOS"])
+    for i in range(9):
+        ws.append([f"Información del proveedor {i}" if i % 3 == 0 else None])
+    ws.append(COLUMNAS_EXPRESS)
+    for i in range(filas):
+        marca = rnd.choice(MARCAS)
+        precio = round(rnd.uniform(100, 500_000), 2)
+        ws.append([
+            f"EX{i:07d}", f"REPUESTO EXPRESS {i} {rnd.choice(RUBROS)}", precio, round(precio * 0.9, 2),
+            rnd.randint(1, 99), rnd.choice(RUBROS), MARCAS.index(marca), marca, 21, f"779{i:010d}"
+        ])
+    wb.save(ruta)
+
+
+def generar_repcar(ruta, filas, semilla=42):
+    """
+    Genera la lista de RepCar: CSV separado por ';', en latin-1 y con precios '1.234,56'.
+    """
+    rnd = random.Random(semilla)
+    with open(ruta, "w", encoding="latin-1", newline="") as f:
+        escritor = csv.writer(f, delimiter=';')
+        escritor.writerow(COLUMNAS_REPCAR)
+        for i in range(filas):
+            escritor.writerow([
+                f"F{rnd.randint(1, 99999)}", rnd.choice(MARCAS), f"RC{i:07d}",
+                f"Artículo {i} para vehículo {rnd.randint(1, 500)}", rnd.choice(RUBROS),
+                _precio_texto(rnd), "S", f"img{i}.jpg"
+            ])
+
+
+def generar_archivos_proveedores(directorio, filas_autofix=2000, hojas_autofix=20, filas_express=50_000,
+                                 filas_repcar=50_000, semilla=42):
+    """
+    Genera los tres archivos con los nombres que deja la descarga (autofix.xlsx, express.xlsx, repcar.csv).
+
+    Returns:
+        Dict proveedor -> cantidad de filas generadas
+    """
+    os.makedirs(directorio, exist_ok=True)
+    generar_libro_autofix(os.path.join(directorio, "autofix.xlsx"), hojas_autofix, filas_autofix, semilla)
+    generar_express(os.path.join(directorio, "express.xlsx"), filas_express, semilla)
+    generar_repcar(os.path.join(directorio, "repcar.csv"), filas_repcar, semilla)
+    return {
+        "autofix": hojas_autofix * filas_autofix,
+        "express": filas_express,
+        "repcar": filas_repcar
+    }
@@ -0,0 +1,301 @@
+"""
+Portal de proveedores local que reproduce lo que usa WebAutomationDownloader: los botones
+de la página principal, el formulario de login, las casillas de marcas de AutoFix, el
+botón de descarga de RepCar y las descargas, con tamaños y demoras configurables.
+
+Uso (desde '1 automatizacion-web'):
+    python -m benchmarks.portal_mock --puerto 8100 --retardo-pagina 0.2 --retardo-descarga 1 --kbps 5000
+    python -m benchmarks.portal_mock --puerto 8100 --sin-data-url   # botones sin URL directa
+    URL_PAGE=http://127.0.0.1:8100/ URL_USERNAME=usuario URL_PASSWORD=clave python main.py
+"""
+import os
+import sys
+import time
+import secrets
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generadores import generar_libro_autofix, generar_express, generar_repcar
+
+
+# Archivo servido por cada descarga: (archivo generado, nombre sugerido al navegador, content-type)
+DESCARGAS = {
+    "express": ("express.xlsx", "AutoRepuestos Express - Lista.xlsx",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "autofix": ("autofix.xlsx", "AutoFix - Lista de precios.xlsx",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "repcar": ("repcar.csv", "MundoRepCar - Lista.csv", "text/csv; charset=latin-1"),
+}
+
+# Descargas que requieren sesión iniciada
+REQUIEREN_LOGIN = ("autofix", "repcar")
+
+_PLANTILLA = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>{titulo}</title></head>
+<body>{cuerpo}</body></html>"""
+
+
+class _ManejadorPortal(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # --- utilidades ---
+
+    def _sesion_valida(self) -> bool:
+        cookies = self.headers.get("Cookie", "")
+        for cookie in cookies.split(";"):
+            nombre, _, valor = cookie.strip().partition("=")
+            if nombre == "sesion" and valor in self.server.sesiones:
+                return True
+        return False
+
+    def _html(self, titulo: str, cuerpo: str, estado: int = 200, cabeceras=None):
+        if self.server.retardo_pagina:
+            time.sleep(self.server.retardo_pagina)
+        datos = _PLANTILLA.format(titulo=titulo, cuerpo=cuerpo).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _redirigir(self, destino: str, cabeceras=None):
+        self.send_response(303)
+        self.send_header("Location", destino)
+        self.send_header("Content-Length", "0")
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+
+    def _exigir_login(self, ruta: str) -> bool:
+        if self._sesion_valida():
+            return True
+        self._redirigir("/login?" + urlencode({"next": ruta}))
+        return False
+
+    # --- páginas ---
+
+    def _data_url(self, ruta: str) -> str:
+        """Atributo data-url del botón de descarga (vacío si el portal no expone las URLs)"""
+        return f' data-url="{ruta}"' if self.server.data_url else ""
+
+    def _pagina_principal(self):
+        self._html("Proveedores", f"""
+<h1>Listas de precios</h1>
+<button id="download-button-autorepuestos-express"{self._data_url('/descargas/express')}
+        onclick="window.location.href='/descargas/express'">Autorepuestos Express</button>
+<button id="download-button-autofix" onclick="window.location.href='/autofix'">Auto Fix</button>
+<button id="download-button-mundo-repcar" onclick="window.location.href='/repcar'">Mundo RepCar</button>
+""")
+
+    def _pagina_login(self, consulta):
+        destino = consulta.get("next", ["/"])[0]
+        self._html("Iniciar sesión", f"""
+<form method="post" action="/login?{urlencode({'next': destino})}">
+  <input id="username" name="username" type="text">
+  <input id="password" name="password" type="password">
+  <button type="submit" class="login-button">Iniciar sesión</button>
+</form>
+""")
+
+    def _pagina_autofix(self):
+        casillas = "\n".join(
+            f'<label><input type="checkbox" id="marca-{i}" value="MARCA{i:03d}"> MARCA{i:03d}</label>'
+            for i in range(self.server.marcas)
+        )
+        self._html("Auto Fix", f"""
+<div id="brands-checkboxes">
+{casillas}
+</div>
+<button id="descargar-autofix"{self._data_url('/descargas/autofix')} onclick="descargar()">Descargar lista de precios</button>
+<script>
+function descargar() {{
+  var marcas = Array.from(document.querySelectorAll('#brands-checkboxes input:checked')).map(function (c) {{ return c.value; }});
+  window.location.href = '/descargas/autofix?marcas=' + encodeURIComponent(marcas.join(','));
+}}
+</script>
+""")
+
+    def _pagina_repcar(self):
+        self._html("Mundo RepCar", f"""
+<button class="download-button"{self._data_url('/descargas/repcar')}
+        onclick="window.location.href='/descargas/repcar'">Descargar lista</button>
+""")
+
+    def _descarga(self, proveedor: str):
+        archivo, nombre, tipo = DESCARGAS[proveedor]
+        ruta = os.path.join(self.server.directorio_archivos, archivo)
+        tamano = os.path.getsize(ruta)
+        self.server.registrar_descarga(proveedor, tamano)
+
+        if self.server.retardo_descarga:
+            time.sleep(self.server.retardo_descarga)
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(tamano))
+        self.send_header("Content-Disposition", f'attachment; filename="{nombre}"')
+        self.end_headers()
+
+        bloque = 64 * 1024
+        with open(ruta, "rb") as f:
+            for datos in iter(lambda: f.read(bloque), b""):
+                self.wfile.write(datos)
+                # Ancho de banda limitado: cada bloque tarda len / (kbps * 1024) segundos
+                if self.server.kbps:
+                    time.sleep(len(datos) / (self.server.kbps * 1024))
+
+    # --- rutas ---
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        consulta = parse_qs(url.query)
+        if url.path == "/":
+            return self._pagina_principal()
+        if url.path == "/login":
+            return self._pagina_login(consulta)
+        if url.path == "/autofix":
+            return self._exigir_login("/autofix") and self._pagina_autofix()
+        if url.path == "/repcar":
+            return self._exigir_login("/repcar") and self._pagina_repcar()
+        if url.path.startswith("/descargas/"):
+            proveedor = url.path.rsplit("/", 1)[-1]
+            if proveedor not in DESCARGAS:
+                return self._html("No encontrado", "<p>No encontrado</p>", 404)
+            if proveedor in REQUIEREN_LOGIN and not self._exigir_login(url.path):
+                return
+            return self._descarga(proveedor)
+        self._html("No encontrado", "<p>No encontrado</p>", 404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/login":
+            return self._html("No encontrado", "<p>No encontrado</p>", 404)
+        largo = int(self.headers.get("Content-Length") or 0)
+        datos = parse_qs(self.rfile.read(largo).decode("utf-8"))
+        usuario = datos.get("username", [""])[0]
+        clave = datos.get("password", [""])[0]
+        destino = parse_qs(url.query).get("next", ["/"])[0]
+        if (usuario, clave) != (self.server.usuario, self.server.clave):
+            return self._html("Iniciar sesión", "<p>Credenciales inválidas</p>", 401)
+        token = self.server.nueva_sesion()
+        self._redirigir(destino, {"Set-Cookie": f"sesion={token}; Path=/; HttpOnly"})
+
+    def log_message(self, *args):
+        pass
+
+
+class PortalMock(ThreadingHTTPServer):
+    """
+    Servidor del portal de proveedores.
+
+    Args:
+        directorio_archivos: Directorio con express.xlsx, autofix.xlsx y repcar.csv
+        marcas: Cantidad de casillas de marcas en la página de AutoFix
+        retardo_pagina: Segundos antes de responder cada página HTML
+        retardo_descarga: Segundos antes de empezar a enviar cada archivo
+        kbps: Ancho de banda de las descargas en KB/s (0 = sin límite)
+        data_url: Si los botones de descarga exponen su URL en data-url; sin ella, el modo
+            HTTP del descargador necesita la URL aprendida de un clic anterior
+    """
+    daemon_threads = True
+
+    def __init__(self, directorio_archivos: str, host: str = "127.0.0.1", puerto: int = 0,
+                 usuario: str = "usuario", clave: str = "clave", marcas: int = 20,
+                 retardo_pagina: float = 0.0, retardo_descarga: float = 0.0, kbps: float = 0.0,
+                 data_url: bool = True):
+        super().__init__((host, puerto), _ManejadorPortal)
+        self.directorio_archivos = directorio_archivos
+        self.usuario = usuario
+        self.clave = clave
+        self.marcas = marcas
+        self.retardo_pagina = retardo_pagina
+        self.retardo_descarga = retardo_descarga
+        self.kbps = kbps
+        self.data_url = data_url
+        self.sesiones = set()
+        self.descargas = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/"
+
+    def nueva_sesion(self) -> str:
+        token = secrets.token_hex(16)
+        with self._lock:
+            self.sesiones.add(token)
+        return token
+
+    def registrar_descarga(self, proveedor: str, tamano: int):
+        with self._lock:
+            self.descargas.append({"proveedor": proveedor, "bytes": tamano, "fecha": time.time()})
+
+    def iniciar(self) -> "PortalMock":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def detener(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+
+def generar_archivos_portal(directorio: str, marcas: int = 20, filas_autofix: int = 1000,
+                            filas_express: int = 20_000, filas_repcar: int = 20_000):
+    """
+    Genera los archivos que sirve el portal (una hoja de AutoFix por marca).
+    """
+    os.makedirs(directorio, exist_ok=True)
+    generar_libro_autofix(os.path.join(directorio, "autofix.xlsx"), marcas, filas_autofix)
+    generar_express(os.path.join(directorio, "express.xlsx"), filas_express)
+    generar_repcar(os.path.join(directorio, "repcar.csv"), filas_repcar)
+
+
+def agregar_argumentos_portal(parser: argparse.ArgumentParser):
+    parser.add_argument("--marcas", type=int, default=20, help="Casillas de marcas (y hojas de AutoFix)")
+    parser.add_argument("--filas-autofix", type=int, default=1000, help="Filas por hoja de AutoFix")
+    parser.add_argument("--filas-express", type=int, default=20_000)
+    parser.add_argument("--filas-repcar", type=int, default=20_000)
+    parser.add_argument("--retardo-pagina", type=float, default=0.0, help="Demora de cada página HTML (s)")
+    parser.add_argument("--retardo-descarga", type=float, default=0.0, help="Demora antes de cada descarga (s)")
+    parser.add_argument("--kbps", type=float, default=0.0, help="Ancho de banda de descarga en KB/s (0 = sin límite)")
+    parser.add_argument("--sin-data-url", action="store_true",
+                        help="Botones sin data-url: --http debe aprender la URL del clic")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portal de proveedores local para pruebas de descarga")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8100)
+    parser.add_argument("--usuario", default="usuario")
+    parser.add_argument("--clave", default="clave")
+    agregar_argumentos_portal(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        print("Generando archivos del portal...")
+        generar_archivos_portal(directorio, args.marcas, args.filas_autofix, args.filas_express, args.filas_repcar)
+        portal = PortalMock(directorio, args.host, args.puerto, args.usuario, args.clave, args.marcas,
+                            args.retardo_pagina, args.retardo_descarga, args.kbps, not args.sin_data_url)
+        print(f"Portal escuchando en {portal.url} (usuario '{args.usuario}', clave '{args.clave}'; Ctrl+C para detener)")
+        try:
+            portal.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            portal.server_close()
+
+
+if __name__ == "__main__":
+    main()
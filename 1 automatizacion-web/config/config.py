@@ -7,3 +7,47 @@ URL_PAGE = os.getenv("URL_PAGE")
 URL_USERNAME = os.getenv("URL_USERNAME")
 URL_PASSWORD = os.getenv("URL_PASSWORD")
 URL_API = os.getenv("URL_API")
+
+# Daemon de descargas con navegador persistente
+DAEMON_HOST = os.getenv("DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", "8765"))
+CHROME_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", os.path.join(os.getcwd(), "perfil_chrome"))
+
+# Procesamiento de datos
+# Filas por bloque al leer el CSV de RepCar: acota el parseo, no la lista transformada
+TAMANO_BLOQUE_CSV = int(os.getenv("TAMANO_BLOQUE_CSV", "100000"))
+# Filas por lote del modo por lotes (--por-lotes): lectura, transformación y escritura con memoria acotada
+TAMANO_LOTE = int(os.getenv("TAMANO_LOTE", "50000"))
+
+# Manifiestos de ejecución (--reanudar): si se guarda además la lista procesada de cada
+# proveedor (una escritura parquet extra por proveedor, solo útil si el proceso se corta
+# entre la transformación y la exportación) y cuántas ejecuciones se conservan
+EJECUCION_GUARDAR_PROCESADO = os.getenv("EJECUCION_GUARDAR_PROCESADO", "0").lower() in ("1", "true", "si", "sí")
+EJECUCIONES_CONSERVADAS = int(os.getenv("EJECUCIONES_CONSERVADAS", "10"))
+# Proveedores que se procesan y suben a la vez
+PIPELINE_CONCURRENCIA = int(os.getenv("PIPELINE_CONCURRENCIA", "3"))
+# Procesos para las hojas de AutoFix (1 = secuencial)
+AUTOFIX_WORKERS = int(os.getenv("AUTOFIX_WORKERS", str(os.cpu_count() or 1)))
+# Motor de lectura de Excel: auto, calamine, openpyxl_streaming u openpyxl
+MOTOR_EXCEL = os.getenv("MOTOR_EXCEL", "auto")
+
+# Exportación: formato del archivo que se sube (xlsx o xlsx_streaming) y formatos
+# adicionales para el archivo interno (csv, parquet). Se pueden definir por proveedor
+# con FORMATO_SUBIDA_<PROVEEDOR> y FORMATOS_ARCHIVO_<PROVEEDOR>.
+FORMATO_SUBIDA = os.getenv("FORMATO_SUBIDA", "xlsx_streaming")
+FORMATOS_ARCHIVO = os.getenv("FORMATOS_ARCHIVO", "")
+
+# Subida fragmentada: las listas con más filas se dividen en partes de hasta
+# FILAS_POR_FRAGMENTO filas que se suben a la vez (0 = un solo archivo).
+# Se puede definir por proveedor con FILAS_POR_FRAGMENTO_<PROVEEDOR>.
+FILAS_POR_FRAGMENTO = int(os.getenv("FILAS_POR_FRAGMENTO", "0"))
+
+# Registro de subidas por hash del archivo procesado: horas durante las que se
+# reutiliza el link devuelto por la API en lugar de subir el mismo contenido (0 = no vence)
+VIGENCIA_REGISTRO_SUBIDAS_HORAS = float(os.getenv("VIGENCIA_REGISTRO_SUBIDAS_HORAS", "24"))
+
+# Validación previa a la exportación: fracción máxima de filas con clave CODIGO+MARCA
+# duplicada, descripción vacía o precio en 0 antes de cancelar la subida (1 = solo advertir)
+VALIDACION_MAX_DUPLICADOS = float(os.getenv("VALIDACION_MAX_DUPLICADOS", "0.5"))
+VALIDACION_MAX_DESCRIPCIONES_VACIAS = float(os.getenv("VALIDACION_MAX_DESCRIPCIONES_VACIAS", "0.5"))
+VALIDACION_MAX_PRECIOS_CERO = float(os.getenv("VALIDACION_MAX_PRECIOS_CERO", "0.5"))
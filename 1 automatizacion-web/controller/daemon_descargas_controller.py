@@ -0,0 +1,208 @@
+import sys
+import os
+import json
+import socket
+import socketserver
+import threading
+import time
+from typing import Optional, List, Dict, Any
+
+# Agregar el directorio padre al path para importar config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.config import DAEMON_HOST, DAEMON_PORT, CHROME_PROFILE_DIR
+from controller.obtener_datos_controller import (
+    WebAutomationDownloader, RegistroTiempos, DOWNLOAD_CONFIGS,
+    limpiar_directorio_descargas, mostrar_resumen_descargas
+)
+
+
+class DownloaderDaemon:
+    """
+    Mantiene un navegador caliente con perfil persistente y ejecuta los trabajos
+    de descarga que envían los clientes. Los trabajos se ejecutan de a uno, y si
+    el navegador se cae se reinicia automáticamente.
+
+    El WebDriver no es thread-safe: solo se usa con _lock tomado. estado() espera
+    el lock un momento y, si hay un trabajo en curso, informa el último estado
+    conocido del navegador.
+    """
+
+    # Segundos que estado() espera el lock antes de informar el estado conocido
+    ESPERA_ESTADO = 0.5
+
+    def __init__(self, download_dir: Optional[str] = None, user_data_dir: str = CHROME_PROFILE_DIR,
+                 modo_http: bool = False):
+        self.download_dir = os.path.abspath(download_dir or os.path.join(os.getcwd(), "data_sin_procesar"))
+        self.user_data_dir = os.path.abspath(user_data_dir)
+        self.modo_http = modo_http
+        self.downloader: Optional[WebAutomationDownloader] = None
+        self._lock = threading.Lock()
+        self._navegador_activo = False
+        self.trabajos_completados = 0
+        self.reinicios = 0
+        self.iniciado = time.time()
+
+    def asegurar_navegador(self):
+        """Inicia el navegador si no existe o lo reinicia si dejó de responder (con _lock tomado)"""
+        if self.downloader and self.downloader.navegador_activo():
+            self._navegador_activo = True
+            return
+        if self.downloader:
+            print("⚠️ El navegador dejó de responder, reiniciando...")
+            self.downloader.cerrar()
+            self.reinicios += 1
+
+        self.downloader = WebAutomationDownloader(download_dir=self.download_dir,
+                                                  user_data_dir=self.user_data_dir,
+                                                  modo_http=self.modo_http)
+        print("⚙️  Iniciando navegador del daemon...")
+        self.downloader.setup_driver()
+        self._navegador_activo = True
+        print("Navegador del daemon listo")
+
+    def calentar(self):
+        """Inicia el navegador antes de recibir trabajos"""
+        with self._lock:
+            self.asegurar_navegador()
+
+    def ejecutar_trabajo(self, services: Optional[List[str]] = None, clean_download_dir: bool = False) -> Dict[str, Optional[str]]:
+        """
+        Descarga los servicios pedidos con el navegador caliente. Los servicios
+        que fallan porque el navegador se cayó se reintentan una vez tras reiniciarlo.
+        """
+        services = [s for s in (services or list(DOWNLOAD_CONFIGS)) if s in DOWNLOAD_CONFIGS]
+
+        with self._lock:
+            registro_tiempos = RegistroTiempos()
+            with registro_tiempos.medir("general", "asegurar_navegador", "trabajo"):
+                self.asegurar_navegador()
+            self.downloader.tiempos = registro_tiempos
+
+            if clean_download_dir:
+                limpiar_directorio_descargas(self.download_dir)
+
+            start_time = time.time()
+            results = {}
+            for service in services:
+                results[service] = self.downloader.descargar_servicio(service)
+                if results[service] is None and not self.downloader.navegador_activo():
+                    self.asegurar_navegador()
+                    self.downloader.tiempos = registro_tiempos
+                    results[service] = self.downloader.descargar_servicio(service)
+
+            mostrar_resumen_descargas(results, services, time.time() - start_time, "DAEMON")
+            registro_tiempos.imprimir()
+            self._navegador_activo = self.downloader.navegador_activo()
+            self.trabajos_completados += 1
+            return results
+
+    def estado(self) -> Dict[str, Any]:
+        ocupado = not self._lock.acquire(timeout=self.ESPERA_ESTADO)
+        if not ocupado:
+            try:
+                self._navegador_activo = bool(self.downloader and self.downloader.navegador_activo())
+            finally:
+                self._lock.release()
+        return {
+            "navegador_activo": self._navegador_activo,
+            "ocupado": ocupado,
+            "trabajos_completados": self.trabajos_completados,
+            "reinicios": self.reinicios,
+            "segundos_activo": round(time.time() - self.iniciado, 1),
+            "download_dir": self.download_dir,
+            "user_data_dir": self.user_data_dir
+        }
+
+    def cerrar(self):
+        with self._lock:
+            if self.downloader:
+                self.downloader.cerrar()
+                self.downloader = None
+            self._navegador_activo = False
+
+
+class _ManejadorPeticiones(socketserver.StreamRequestHandler):
+    """Protocolo de una línea JSON por petición y una línea JSON por respuesta"""
+
+    def handle(self):
+        daemon: DownloaderDaemon = self.server.daemon
+        try:
+            peticion = json.loads(self.rfile.readline().decode("utf-8"))
+            accion = peticion.get("accion")
+            if accion == "descargar":
+                resultados = daemon.ejecutar_trabajo(peticion.get("servicios"), peticion.get("limpiar", False))
+                respuesta = {"ok": True, "resultados": resultados}
+            elif accion == "estado":
+                respuesta = {"ok": True, "estado": daemon.estado()}
+            elif accion == "detener":
+                respuesta = {"ok": True}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                respuesta = {"ok": False, "error": f"Acción desconocida: {accion}"}
+        except Exception as e:
+            respuesta = {"ok": False, "error": str(e)}
+        self.wfile.write((json.dumps(respuesta) + "\n").encode("utf-8"))
+
+
+class _ServidorDaemon(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def iniciar_daemon(host: str = DAEMON_HOST, port: int = DAEMON_PORT, modo_http: bool = False):
+    """Inicia el daemon, calienta el navegador y atiende peticiones hasta recibir 'detener'"""
+    daemon = DownloaderDaemon(modo_http=modo_http)
+    daemon.calentar()
+
+    with _ServidorDaemon((host, port), _ManejadorPeticiones) as servidor:
+        servidor.daemon = daemon
+        print(f"🚀 Daemon de descargas escuchando en {host}:{port}")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print("🔒 Cerrando daemon de descargas...")
+            daemon.cerrar()
+
+
+def _enviar(peticion: Dict[str, Any], host: str, port: int, timeout: float) -> Dict[str, Any]:
+    with socket.create_connection((host, port), timeout=timeout) as conexion:
+        conexion.sendall((json.dumps(peticion) + "\n").encode("utf-8"))
+        with conexion.makefile("r", encoding="utf-8") as respuesta:
+            return json.loads(respuesta.readline())
+
+
+def daemon_disponible(host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> bool:
+    """Indica si hay un daemon escuchando"""
+    try:
+        return _enviar({"accion": "estado"}, host, port, timeout=2).get("ok", False)
+    except (OSError, ValueError):
+        return False
+
+
+def enviar_trabajo(services_to_download: Optional[List[str]] = None, clean_download_dir: bool = False,
+                   host: str = DAEMON_HOST, port: int = DAEMON_PORT, timeout: float = 900) -> Dict[str, Optional[str]]:
+    """
+    Envía un trabajo de descarga al daemon y espera el resultado.
+
+    Returns:
+        Dict servicio -> ruta del archivo descargado (o None), igual que download_all_files_single_session
+
+    Raises:
+        OSError si el daemon no está disponible, RuntimeError si el trabajo falla
+    """
+    respuesta = _enviar({"accion": "descargar", "servicios": services_to_download, "limpiar": clean_download_dir},
+                        host, port, timeout)
+    if not respuesta.get("ok"):
+        raise RuntimeError(f"El daemon no pudo completar el trabajo: {respuesta.get('error')}")
+    return respuesta["resultados"]
+
+
+def consultar_estado(host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> Dict[str, Any]:
+    return _enviar({"accion": "estado"}, host, port, timeout=5)["estado"]
+
+
+def detener_daemon(host: str = DAEMON_HOST, port: int = DAEMON_PORT):
+    _enviar({"accion": "detener"}, host, port, timeout=5)
@@ -2,27 +2,338 @@ from __future__ import annotations
 import os
 import time
 import random
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 from config.config import URL_API
+from utils.registro_subidas import registrar_subida, subida_registrada
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, Timeout, ReadTimeout, ConnectionError as ReqConnectionError
 
 API_URL = URL_API
 
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+HEADERS_SUBIDA = {
+    "Accept": "application/json",
+    "User-Agent": "AutomatizacionWeb/1.0 (+selenium-pandas-ait-challenge)"
+}
+
+# Tamaño de los bloques en que se envía el archivo: la memoria usada no depende del tamaño del archivo
+TAMANO_BLOQUE_SUBIDA = 64 * 1024
+
+
+class CuerpoMultipart:
+    """
+    Cuerpo multipart/form-data que se envía en bloques de tamaño fijo leyendo el archivo
+    a medida que avanza la subida. Expone __len__ para que requests envíe Content-Length
+    en lugar de transfer-encoding chunked, y registra cuándo terminó de enviarse.
+    """
+
+    def __init__(self, path: Path, campo: str = "file", mime_type: str = MIME_XLSX,
+                 tamano_bloque: int = TAMANO_BLOQUE_SUBIDA,
+                 progreso: Optional[Callable[[int, int], None]] = None):
+        self.path = path
+        self.tamano_bloque = tamano_bloque
+        self.progreso = progreso
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self._inicio = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{campo}"; filename="{path.name}"\r\n'
+            f"Content-Type: {mime_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._fin = f"\r\n--{boundary}--\r\n".encode("utf-8")
+        self._total = len(self._inicio) + path.stat().st_size + len(self._fin)
+        self.enviados = 0
+        self.fin_envio: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._total
+
+    def _avanzar(self, bloque: bytes) -> bytes:
+        self.enviados += len(bloque)
+        if self.progreso:
+            self.progreso(self.enviados, self._total)
+        return bloque
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._avanzar(self._inicio)
+        with self.path.open("rb") as f:
+            for bloque in iter(lambda: f.read(self.tamano_bloque), b""):
+                yield self._avanzar(bloque)
+        yield self._avanzar(self._fin)
+        self.fin_envio = time.perf_counter()
+
+
+class ClienteSubida:
+    """
+    Cliente de subida a la API con una sesión HTTP y pool de conexiones reutilizable.
+
+    Permite subir varios archivos a la vez con concurrencia acotada; cada subida
+    mantiene la semántica de upload_files (400 sin reintento, 429/5xx y fallos de
+    red con reintentos y backoff exponencial).
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        max_concurrencia: int = 3,
+        max_retries: int = 3,
+        retry_delay: float = 5.0,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 180.0,
+        verify_ssl: bool = True,
+        verbose: bool = True,
+        tamano_bloque: int = TAMANO_BLOQUE_SUBIDA,
+        progreso: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.api_url = api_url or API_URL
+        self.max_concurrencia = max(1, max_concurrencia)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.verify_ssl = verify_ssl
+        self.verbose = verbose
+        self.tamano_bloque = tamano_bloque
+        self.progreso = progreso
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS_SUBIDA)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrencia)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def subir(self, file_ruta: str | Path, forzar: bool = False) -> Dict[str, Any]:
+        """Sube un archivo y devuelve la respuesta JSON {"link": "..."} con sus 'metricas' (bloqueante)"""
+        return self._subir_con_reintentos(file_ruta, self.max_retries, self.retry_delay,
+                                          (self.connect_timeout, self.read_timeout), self.verify_ssl, self.verbose,
+                                          forzar)
+
+    def enviar(self, file_ruta: str | Path, forzar: bool = False) -> Future:
+        """Encola la subida de un archivo y devuelve un Future con el resultado"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrencia,
+                                                    thread_name_prefix="subida")
+            return self._executor.submit(self.subir, file_ruta, forzar)
+
+    def enviar_varios(self, rutas: Iterable[str | Path], forzar: bool = False) -> Dict[str, Future]:
+        """Encola varias subidas; devuelve un Future por archivo"""
+        return {str(ruta): self.enviar(ruta, forzar) for ruta in rutas}
+
+    def subir_varios(self, rutas: Iterable[str | Path], forzar: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Sube varios archivos con concurrencia acotada y espera todos los resultados.
+
+        Returns:
+            Dict ruta -> {"ok": bool, "respuesta": dict | None, "error": str | None}
+        """
+        resultados = {}
+        for ruta, future in self.enviar_varios(rutas, forzar).items():
+            try:
+                resultados[ruta] = {"ok": True, "respuesta": future.result(), "error": None}
+            except Exception as e:
+                resultados[ruta] = {"ok": False, "respuesta": None, "error": str(e)}
+        return resultados
+
+    def cerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def _post_streaming(self, path: Path, timeout_tuple: tuple, verify_ssl: bool):
+        """
+        Envía el archivo en bloques y mide la transferencia.
+
+        Returns:
+            (respuesta, métricas) con bytes enviados, bytes/s de envío, tiempo desde el fin
+            del envío hasta el primer byte de la respuesta (ttfb) y latencia total
+        """
+        cuerpo = CuerpoMultipart(path, tamano_bloque=self.tamano_bloque, progreso=self.progreso)
+        inicio = time.perf_counter()
+        resp = self.session.post(
+            self.api_url,
+            data=cuerpo,
+            headers={"Content-Type": cuerpo.content_type},
+            timeout=timeout_tuple,
+            verify=verify_ssl,
+            stream=True,
+        )
+        primer_byte = time.perf_counter()
+        try:
+            resp.content
+        finally:
+            resp.close()
+        fin = time.perf_counter()
+
+        fin_envio = cuerpo.fin_envio or primer_byte
+        segundos_envio = max(fin_envio - inicio, 1e-9)
+        return resp, {
+            "bytes": cuerpo.enviados,
+            "segundos_envio": round(segundos_envio, 4),
+            "bytes_por_segundo": round(cuerpo.enviados / segundos_envio, 1),
+            # Desde el fin del envío: con el tiempo de envío incluido, un archivo grande parecería un servidor lento
+            "ttfb": round(max(primer_byte - fin_envio, 0.0), 4),
+            "latencia_total": round(fin - inicio, 4),
+        }
+
+    def _subir_con_reintentos(
+        self,
+        file_ruta: str | Path,
+        max_retries: int,
+        retry_delay: float,
+        timeout_tuple: tuple,
+        verify_ssl: bool,
+        verbose: bool,
+        forzar: bool = False,
+    ) -> Dict[str, Any]:
+        path = Path(file_ruta)
+        if not path.exists() or not path.is_file():
+            raise FileNotFoundError(f"No se encontró el archivo: {path!s}")
+        if path.stat().st_size == 0:
+            raise ValueError(f"El archivo está vacío: {path!s}")
+
+        # Mismo contenido ya subido: se reutiliza el link sin enviar el archivo
+        hash_procesado, registrada = subida_registrada(str(path), self.api_url)
+        if registrada and not forzar:
+            if verbose:
+                print(f"[upload_files] {path.name} ya subido el {registrada['fecha']}, se reutiliza: {registrada['link']}")
+            return {"link": registrada["link"], "metricas": None, "desde_registro": True}
+
+        attempt = 0
+        last_exc: Optional[Exception] = None
+        metricas: Dict[str, Any] = {}
+        inicio_total = time.perf_counter()
+
+        while attempt <= max_retries:
+            try:
+                if verbose:
+                    print(f"[upload_files] Intento {attempt + 1}/{max_retries + 1} | timeout={timeout_tuple} | archivo={path.name}")
+
+                resp, metricas = self._post_streaming(path, timeout_tuple, verify_ssl)
+                metricas["intentos"] = attempt + 1
+                metricas["segundos_totales"] = round(time.perf_counter() - inicio_total, 4)
+                if verbose:
+                    print(f"[upload_files] {metricas['bytes']:,} bytes a {metricas['bytes_por_segundo'] / 1024:,.0f} KB/s | "
+                          f"TTFB {metricas['ttfb']:.2f}s | total {metricas['latencia_total']:.2f}s | HTTP {resp.status_code}")
+
+                # Éxito
+                if resp.status_code == 200:
+                    try:
+                        data = resp.json()
+                    except ValueError:
+                        raise RuntimeError(f"200 OK pero la respuesta no es JSON. Texto: {resp.text[:500]}")
+                    if "link" not in data:
+                        raise RuntimeError(f"200 OK pero falta 'link' en la respuesta: {data}")
+                    if verbose:
+                        print(f"[upload_files] Subida OK: {data['link']}")
+                    data["metricas"] = metricas
+                    registrar_subida(hash_procesado, data["link"], str(path), self.api_url)
+                    return data
+
+                # 400: validar mensaje
+                if resp.status_code == 400:
+                    try:
+                        err = resp.json()
+                    except ValueError:
+                        err = {"detail": resp.text}
+                    msg = (err.get("message") or err.get("detail") or "").lower()
+                    if "missing required columns" in msg:
+                        raise ValueError("Missing required columns: faltan columnas obligatorias (CODIGO, DESCRIPCION, MARCA, PRECIO).")
+                    raise RuntimeError(f"Error 400 de la API: {err}")
+
+                # 5xx y 429 => reintentar
+                if resp.status_code >= 500 or resp.status_code == 429:
+                    attempt += 1
+                    if attempt > max_retries:
+                        error_msg = f"Error {resp.status_code} persistente tras {max_retries} reintentos. Respuesta: {resp.text[:500]}"
+                        if verbose:
+                            print(f"[upload_files] ❌ {error_msg}")
+                        raise RuntimeError(error_msg)
+                    sleep_s = retry_delay * (2 ** (attempt - 1)) + random.uniform(0, 1.5)
+                    if verbose:
+                        print(f"[upload_files] HTTP {resp.status_code}. Reintentando en {sleep_s:.1f}s...")
+                    time.sleep(sleep_s)
+                    continue
+
+                # Otros 4xx: no vale reintento
+                raise RuntimeError(f"Error de la API ({resp.status_code}): {resp.text[:500]}")
+
+            except (ReadTimeout, Timeout, ReqConnectionError) as e:
+                # Reintento en fallos de red/timeout
+                last_exc = e
+                attempt += 1
+                if attempt > max_retries:
+                    raise RequestException(f"Fallo de red persistente tras {max_retries} reintentos: {e}") from e
+                sleep_s = retry_delay * (2 ** (attempt - 1)) + random.uniform(0, 1.5)
+                if verbose:
+                    print(f"[upload_files] {type(e).__name__}: {e}. Reintento en {sleep_s:.1f}s...")
+                time.sleep(sleep_s)
+
+            except RequestException as e:
+                # Otros errores de requests (no suele ayudar reintentar)
+                raise
+
+        # Falla inesperada
+        if last_exc:
+            raise RequestException(f"Fallo al subir el archivo: {last_exc}") from last_exc
+        raise RuntimeError("Fallo desconocido al subir el archivo.")
+
+
+_cliente_por_defecto: Optional[ClienteSubida] = None
+_lock_cliente = threading.Lock()
+
+
+def obtener_cliente_subida() -> ClienteSubida:
+    """Devuelve el cliente compartido por upload_files (se crea la primera vez)"""
+    global _cliente_por_defecto
+    with _lock_cliente:
+        if _cliente_por_defecto is None:
+            _cliente_por_defecto = ClienteSubida()
+        return _cliente_por_defecto
+
+
+def configurar_cliente_subida(cliente: Optional[ClienteSubida]):
+    """Reemplaza el cliente compartido (por ejemplo, para apuntar a una API local de pruebas)"""
+    global _cliente_por_defecto
+    with _lock_cliente:
+        if _cliente_por_defecto is not None and _cliente_por_defecto is not cliente:
+            _cliente_por_defecto.cerrar()
+        _cliente_por_defecto = cliente
+
+
 def upload_files(
     file_ruta: str | Path,
-    max_retries: int = 3,
-    retry_delay: float = 5.0,
-    connect_timeout: float = 10.0,
-    read_timeout: float = 180.0,
-    verify_ssl: bool = True,
-    verbose: bool = True,
+    max_retries: Optional[int] = None,
+    retry_delay: Optional[float] = None,
+    connect_timeout: Optional[float] = None,
+    read_timeout: Optional[float] = None,
+    verify_ssl: Optional[bool] = None,
+    verbose: Optional[bool] = None,
+    cliente: Optional[ClienteSubida] = None,
+    forzar: bool = False,
 ) -> Dict[str, Any]:
     """
     Sube un archivo .xlsx a la API (multipart/form-data, campo 'file') con reintentos
-    y timeouts separados para conexión y lectura.
+    y timeouts separados para conexión y lectura. El archivo se envía en bloques de
+    tamaño fijo y se reutilizan las conexiones del ClienteSubida compartido.
+    Los parámetros que no se indican toman el valor configurado en el cliente
+    (por defecto: 3 reintentos, 5 s de delay base, timeouts de 10 s y 180 s).
 
     Args:
         file_ruta: Ruta al archivo .xlsx a subir.
@@ -32,100 +343,25 @@ def upload_files(
         read_timeout: Timeout para leer la respuesta completa (segundos).
         verify_ssl: Verifica certificado SSL (deje True en prod).
         verbose: Imprime logs simples por intento.
+        cliente: Cliente de subida a usar (por defecto, el compartido).
+        forzar: Sube aunque el mismo contenido figure en el registro de subidas.
 
     Returns:
-        dict con la respuesta JSON {"link": "..."} en caso de éxito.
+        dict con la respuesta JSON {"link": "..."} en caso de éxito, más 'metricas' de la
+        transferencia (bytes, bytes_por_segundo, ttfb, latencia_total, intentos).
+        Si el contenido ya estaba registrado, devuelve ese link con 'desde_registro': True.
 
     Raises:
         FileNotFoundError, ValueError, RuntimeError, RequestException
     """
-    path = Path(file_ruta)
-    if not path.exists() or not path.is_file():
-        raise FileNotFoundError(f"No se encontró el archivo: {path!s}")
-    if path.stat().st_size == 0:
-        raise ValueError(f"El archivo está vacío: {path!s}")
-
-    mime_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    headers = {
-        "Accept": "application/json",
-        "User-Agent": "AutomatizacionWeb/1.0 (+selenium-pandas-ait-challenge)"
-    }
-    timeout_tuple = (connect_timeout, read_timeout)
-
-    attempt = 0
-    last_exc: Optional[Exception] = None
-
-    while attempt <= max_retries:
-        try:
-            if verbose:
-                print(f"[upload_files] Intento {attempt + 1}/{max_retries + 1} | timeout={timeout_tuple} | archivo={path.name}")
-
-            with path.open("rb") as f:
-                files = {"file": (path.name, f, mime_type)}
-                resp = requests.post(
-                    API_URL,
-                    headers=headers,
-                    files=files,
-                    timeout=timeout_tuple,
-                    verify=verify_ssl,
-                )
-
-            # Éxito
-            if resp.status_code == 200:
-                try:
-                    data = resp.json()
-                except ValueError:
-                    raise RuntimeError(f"200 OK pero la respuesta no es JSON. Texto: {resp.text[:500]}")
-                if "link" not in data:
-                    raise RuntimeError(f"200 OK pero falta 'link' en la respuesta: {data}")
-                if verbose:
-                    print(f"[upload_files] Subida OK: {data['link']}")
-                return data
-
-            # 400: validar mensaje
-            if resp.status_code == 400:
-                try:
-                    err = resp.json()
-                except ValueError:
-                    err = {"detail": resp.text}
-                msg = (err.get("message") or err.get("detail") or "").lower()
-                if "missing required columns" in msg:
-                    raise ValueError("Missing required columns: faltan columnas obligatorias (CODIGO, DESCRIPCION, MARCA, PRECIO).")
-                raise RuntimeError(f"Error 400 de la API: {err}")
-
-            # 5xx y 429 => reintentar
-            if resp.status_code >= 500 or resp.status_code == 429:
-                attempt += 1
-                if attempt > max_retries:
-                    error_msg = f"Error {resp.status_code} persistente tras {max_retries} reintentos. Respuesta: {resp.text[:500]}"
-                    if verbose:
-                        print(f"[upload_files] ❌ {error_msg}")
-                    raise RuntimeError(error_msg)
-                sleep_s = retry_delay * (2 ** (attempt - 1)) + random.uniform(0, 1.5)
-                if verbose:
-                    print(f"[upload_files] HTTP {resp.status_code}. Reintentando en {sleep_s:.1f}s...")
-                time.sleep(sleep_s)
-                continue
-
-            # Otros 4xx: no vale reintento
-            raise RuntimeError(f"Error de la API ({resp.status_code}): {resp.text[:500]}")
-
-        except (ReadTimeout, Timeout, ReqConnectionError) as e:
-            # Reintento en fallos de red/timeout
-            last_exc = e
-            attempt += 1
-            if attempt > max_retries:
-                raise RequestException(f"Fallo de red persistente tras {max_retries} reintentos: {e}") from e
-            sleep_s = retry_delay * (2 ** (attempt - 1)) + random.uniform(0, 1.5)
-            if verbose:
-                print(f"[upload_files] {type(e).__name__}: {e}. Reintento en {sleep_s:.1f}s...")
-            time.sleep(sleep_s)
-
-        except RequestException as e:
-            # Otros errores de requests (no suele ayudar reintentar)
-            raise
-
-    # Falla inesperada
-    if last_exc:
-        raise RequestException(f"Fallo al subir el archivo: {last_exc}") from last_exc
-    raise RuntimeError("Fallo desconocido al subir el archivo.")
+    cliente = cliente or obtener_cliente_subida()
+    elegir = lambda valor, por_defecto: por_defecto if valor is None else valor
+    return cliente._subir_con_reintentos(
+        file_ruta,
+        elegir(max_retries, cliente.max_retries),
+        elegir(retry_delay, cliente.retry_delay),
+        (elegir(connect_timeout, cliente.connect_timeout), elegir(read_timeout, cliente.read_timeout)),
+        elegir(verify_ssl, cliente.verify_ssl),
+        elegir(verbose, cliente.verbose),
+        forzar,
+    )
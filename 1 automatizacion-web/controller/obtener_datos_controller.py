@@ -1,26 +1,61 @@
 import sys
 import os
 import fnmatch
+import json
+import re
+import hashlib
 
 # Agregar el directorio padre al path para importar config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.config import URL_PAGE, URL_USERNAME, URL_PASSWORD
+from utils.manifiesto import cargar_manifiesto, guardar_manifiesto
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 from selenium.webdriver.common.action_chains import ActionChains
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin, urlparse, unquote
 import time
 import os
 import glob
+import shutil
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 
+# URLs de descarga aprendidas del navegador, por servicio, para el modo HTTP de las próximas ejecuciones
+RUTA_URLS_DESCARGA = os.path.join("datos_procesados", "urls_descarga.json")
+
+_lock_urls_descarga = threading.Lock()
+
+
+def cargar_urls_descarga(ruta: str = RUTA_URLS_DESCARGA) -> Dict[str, str]:
+    """URLs aprendidas en ejecuciones anteriores contra el mismo portal (URL_PAGE)"""
+    return {servicio: entrada["url"] for servicio, entrada in cargar_manifiesto(ruta).items()
+            if isinstance(entrada, dict) and entrada.get("portal") == URL_PAGE and entrada.get("url")}
+
+
+def guardar_url_descarga(service: str, url: Optional[str], ruta: str = RUTA_URLS_DESCARGA):
+    """Guarda (o con url=None, olvida) la URL de descarga aprendida de un servicio"""
+    with _lock_urls_descarga:
+        urls = cargar_manifiesto(ruta)
+        if url:
+            urls[service] = {"url": url, "portal": URL_PAGE, "fecha": datetime.now().isoformat(timespec="seconds")}
+        elif urls.pop(service, None) is None:
+            return
+        guardar_manifiesto(urls, ruta)
+
+
 @dataclass
 class DownloadConfig:
     """Configuración para cada tipo de descarga"""
@@ -58,21 +93,148 @@ DOWNLOAD_CONFIGS = {
 }
 
 
+class SesionCompartida:
+    """
+    Sesión autenticada compartida entre workers paralelos.
+
+    El primer worker que necesita login lo realiza y publica las cookies;
+    el resto espera esas cookies y las inyecta en su propio navegador.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._evento = threading.Event()
+        self._login_reclamado = False
+        self.cookies: Optional[List[Dict[str, Any]]] = None
+
+    def reclamar_login(self) -> bool:
+        """Devuelve True si el worker que llama debe encargarse del login"""
+        with self._lock:
+            if self._login_reclamado:
+                return False
+            self._login_reclamado = True
+            return True
+
+    def publicar(self, cookies: Optional[List[Dict[str, Any]]]):
+        """Publica las cookies de la sesión (o None si el login falló)"""
+        if not self._evento.is_set():
+            self.cookies = cookies
+            self._evento.set()
+
+    def liberar(self):
+        """Desbloquea a los workers en espera aunque no se hayan publicado cookies"""
+        self._evento.set()
+
+    def esperar_cookies(self, timeout: float = 90) -> Optional[List[Dict[str, Any]]]:
+        """Espera a que el worker encargado del login publique las cookies"""
+        self._evento.wait(timeout)
+        return self.cookies
+
+
+class RegistroTiempos:
+    """
+    Presupuesto de tiempos de una ejecución: cuánto se va en esperas
+    (condiciones del navegador, descargas) y cuánto en trabajo, por servicio y paso.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tiempos: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(
+            lambda: defaultdict(lambda: {"espera": 0.0, "trabajo": 0.0})
+        )
+        self.totales: Dict[str, float] = defaultdict(float)
+
+    @contextmanager
+    def medir(self, servicio: Optional[str], paso: str, tipo: str = "trabajo"):
+        """Acumula la duración del bloque como 'espera' o 'trabajo'"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracion = time.perf_counter() - inicio
+            with self._lock:
+                self.tiempos[servicio or "general"][paso][tipo] += duracion
+
+    def registrar_total(self, servicio: str, segundos: float):
+        with self._lock:
+            self.totales[servicio] += segundos
+
+    def reporte(self) -> Dict[str, Any]:
+        """Devuelve el presupuesto por servicio: pasos, espera, trabajo y tiempo no medido"""
+        reporte = {}
+        for servicio, pasos in self.tiempos.items():
+            espera = sum(v["espera"] for v in pasos.values())
+            trabajo = sum(v["trabajo"] for v in pasos.values())
+            total = self.totales.get(servicio, espera + trabajo)
+            reporte[servicio] = {
+                "pasos": {paso: dict(valores) for paso, valores in pasos.items()},
+                "espera": espera,
+                "trabajo": trabajo,
+                "otros": max(total - espera - trabajo, 0.0),
+                "total": total
+            }
+        return reporte
+
+    def imprimir(self):
+        print("\n============================================================")
+        print("⏱️  PRESUPUESTO DE TIEMPOS (ESPERA vs. TRABAJO):")
+        print("============================================================")
+        for servicio, datos in self.reporte().items():
+            nombre = DOWNLOAD_CONFIGS[servicio].name if servicio in DOWNLOAD_CONFIGS else servicio
+            print(f"{nombre}: total {datos['total']:.2f}s | espera {datos['espera']:.2f}s | "
+                  f"trabajo {datos['trabajo']:.2f}s | otros {datos['otros']:.2f}s")
+            for paso, valores in datos["pasos"].items():
+                print(f"   • {paso.ljust(28)} espera {valores['espera']:6.2f}s | trabajo {valores['trabajo']:6.2f}s")
+        print("============================================================")
+
+
 class WebAutomationDownloader:
     """Clase para descargar archivos con una única sesión de navegador"""
     
-    def __init__(self):
-        """Inicializa el descargador de automatización web"""
-        self.download_dir = os.path.join(os.getcwd(), "data_sin_procesar")
-        self.screenshot_dir = os.path.join(self.download_dir, "screenshots")
+    def __init__(self, download_dir: Optional[str] = None, output_dir: Optional[str] = None,
+                 debugging_port: Optional[int] = 9222, sesion_compartida: Optional[SesionCompartida] = None,
+                 modo_http: bool = False, registro_tiempos: Optional[RegistroTiempos] = None,
+                 user_data_dir: Optional[str] = None, max_wait_time: Optional[int] = None):
+        """
+        Inicializa el descargador de automatización web
+
+        Args:
+            download_dir: Directorio donde Chrome guarda las descargas
+            output_dir: Directorio final de los archivos renombrados (por defecto, download_dir)
+            debugging_port: Puerto de depuración remota de Chrome (None para no fijarlo)
+            sesion_compartida: Sesión autenticada compartida con otros workers
+            modo_http: Descarga los archivos por HTTP con las cookies del navegador,
+                con fallback al clic en el navegador
+            registro_tiempos: Registro donde se acumulan los tiempos de espera y trabajo
+            user_data_dir: Perfil persistente de Chrome (conserva cookies y sesión entre ejecuciones)
+            max_wait_time: Espera máxima por descarga en segundos (por defecto, la de cada servicio)
+        """
+        self.download_dir = download_dir or os.path.join(os.getcwd(), "data_sin_procesar")
+        self.output_dir = output_dir or self.download_dir
+        self.screenshot_dir = os.path.join(self.output_dir, "screenshots")
+        self.debugging_port = debugging_port
+        self.user_data_dir = user_data_dir
+        self.max_wait_time = max_wait_time
+        self.sesion_compartida = sesion_compartida
         self.driver = None
         self.wait = None
+        self.eventos_descarga = False
+        self.modo_http = modo_http
+        self.http_session: Optional[requests.Session] = None
+        # Con modo_http se parte de las URLs aprendidas en ejecuciones anteriores
+        self.urls_descarga: Dict[str, str] = cargar_urls_descarga() if modo_http else {}
+        self.ultima_url_descarga: Optional[str] = None
+        self.detalles_http: Dict[str, Dict[str, Any]] = {}
+        self.tiempos = registro_tiempos or RegistroTiempos()
+        self.servicio_actual: Optional[str] = None
         
     def setup_driver(self):
         """Configura el navegador y directorio de descargas"""
         # Crear directorios si no existen
         if not os.path.exists(self.download_dir):
             os.makedirs(self.download_dir)
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
         if not os.path.exists(self.screenshot_dir):
             os.makedirs(self.screenshot_dir)
             
@@ -86,7 +248,11 @@ class WebAutomationDownloader:
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-gpu")
-        options.add_argument("--remote-debugging-port=9222")
+        if self.debugging_port:
+            options.add_argument(f"--remote-debugging-port={self.debugging_port}")
+        if self.user_data_dir:
+            os.makedirs(self.user_data_dir, exist_ok=True)
+            options.add_argument(f"--user-data-dir={self.user_data_dir}")
         
         # Opciones anti-detección
         options.add_argument("--disable-blink-features=AutomationControlled")
@@ -109,6 +275,10 @@ class WebAutomationDownloader:
             "profile.default_content_settings.popups": 0
         })
         
+        # Registro de eventos DevTools del dominio Page (incluye downloadWillBegin/downloadProgress)
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": False, "enablePage": True})
+        
         # Inicializar WebDriver
         self.driver = webdriver.Chrome(options=options)
         
@@ -126,6 +296,229 @@ class WebAutomationDownloader:
         # Configurar wait
         self.wait = WebDriverWait(self.driver, 15)
         
+        # Habilitar la detección de descargas por eventos
+        self._configurar_eventos_descarga()
+    
+    def _configurar_eventos_descarga(self):
+        """Activa los eventos de descarga de DevTools; si no están disponibles se usa el monitoreo del directorio"""
+        try:
+            self.driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+                "behavior": "allow",
+                "downloadPath": self.download_dir,
+                "eventsEnabled": True
+            })
+            self.driver.get_log("performance")
+            self.eventos_descarga = True
+            print("Detección de descargas por eventos DevTools habilitada")
+        except Exception as e:
+            self.eventos_descarga = False
+            print(f"⚠️ Eventos de descarga no disponibles, se monitoreará el directorio: {str(e)}")
+    
+    def _leer_eventos_descarga(self) -> List[Dict[str, Any]]:
+        """Lee (y consume) los eventos de descarga pendientes del log de rendimiento"""
+        eventos = []
+        for entrada in self.driver.get_log("performance"):
+            try:
+                mensaje = json.loads(entrada["message"])["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            metodo = mensaje.get("method", "")
+            if metodo.endswith(".downloadWillBegin") or metodo.endswith(".downloadProgress"):
+                eventos.append(mensaje)
+        return eventos
+    
+    def _marcar_inicio_descarga(self):
+        """Descarta los eventos previos para asociar la próxima descarga al clic que sigue"""
+        self.ultima_url_descarga = None
+        if self.eventos_descarga:
+            try:
+                self._leer_eventos_descarga()
+            except Exception:
+                pass
+    
+    def _resolver_archivo_descargado(self, nombre_sugerido: str) -> Optional[str]:
+        """
+        Devuelve la ruta del archivo completado. Si ya existía uno con el mismo nombre,
+        Chrome agrega un sufijo ' (N)', por lo que se toma la variante más reciente.
+        """
+        ruta = os.path.join(self.download_dir, nombre_sugerido)
+        base, ext = os.path.splitext(nombre_sugerido)
+        candidatos = [ruta] + glob.glob(os.path.join(self.download_dir, f"{glob.escape(base)} (*){glob.escape(ext)}"))
+        candidatos = [c for c in candidatos if os.path.isfile(c)]
+        if not candidatos:
+            return None
+        return max(candidatos, key=os.path.getmtime)
+    
+    def _esperar_descarga_por_eventos(self, max_wait_time: int, espera_inicio: int = 20) -> Optional[str]:
+        """
+        Espera la descarga iniciada por el último clic usando los eventos
+        downloadWillBegin / downloadProgress de DevTools.
+
+        Args:
+            max_wait_time: Tiempo máximo total de espera en segundos
+            espera_inicio: Tiempo máximo para que la descarga comience
+
+        Returns:
+            Ruta al archivo descargado o None si no hubo descarga o fue cancelada
+        """
+        start_time = time.time()
+        guid = None
+        nombre_sugerido = None
+        
+        while time.time() - start_time < max_wait_time:
+            for evento in self._leer_eventos_descarga():
+                params = evento.get("params", {})
+                if evento["method"].endswith(".downloadWillBegin") and guid is None:
+                    guid = params.get("guid")
+                    nombre_sugerido = params.get("suggestedFilename")
+                    self.ultima_url_descarga = params.get("url")
+                    print(f"⬇️  Descarga iniciada: {nombre_sugerido}")
+                elif evento["method"].endswith(".downloadProgress") and params.get("guid") == guid:
+                    estado = params.get("state")
+                    if estado == "completed":
+                        elapsed = time.time() - start_time
+                        print(f"Descarga completada en {elapsed:.1f}s ({params.get('receivedBytes', 0):,} bytes)")
+                        return self._resolver_archivo_descargado(nombre_sugerido)
+                    if estado == "canceled":
+                        print(f"⚠️ Descarga cancelada: {nombre_sugerido}")
+                        return None
+            
+            if guid is None and time.time() - start_time > espera_inicio:
+                print(f"⚠️ No se recibió el evento de inicio de descarga en {espera_inicio}s")
+                return None
+            
+            time.sleep(0.2)
+        
+        print(f"⚠️ Timeout esperando la finalización de {nombre_sugerido}")
+        return None
+    
+    def _esperar_descarga(self, current_files: List[str], max_wait_time: int = 120) -> Optional[str]:
+        """
+        Espera la descarga del último clic: por eventos DevTools si están disponibles
+        y, si no se detecta nada, monitoreando el directorio de descargas durante el
+        tiempo que quede de max_wait_time (la espera total no supera max_wait_time).
+        Si el descargador tiene max_wait_time, reemplaza al del servicio.
+        """
+        max_wait_time = self.max_wait_time or max_wait_time
+        inicio = time.time()
+        with self.tiempos.medir(self.servicio_actual, "descarga", "espera"):
+            if self.eventos_descarga:
+                print("⏳ Esperando eventos de descarga...")
+                try:
+                    downloaded_file = self._esperar_descarga_por_eventos(max_wait_time)
+                    if downloaded_file:
+                        return downloaded_file
+                except Exception as e:
+                    print(f"⚠️ Error leyendo eventos de descarga: {str(e)}")
+                restante = max(max_wait_time - (time.time() - inicio), 0)
+                print(f"Se continúa monitoreando el directorio de descargas ({restante:.0f}s restantes)")
+                return self._monitor_downloads(current_files, restante)
+            return self._monitor_downloads(current_files, max_wait_time)
+    
+    def navegador_activo(self) -> bool:
+        """Indica si el navegador sigue respondiendo"""
+        if not self.driver:
+            return False
+        try:
+            self.driver.window_handles
+            return True
+        except Exception:
+            return False
+    
+    def cerrar(self):
+        """Cierra la sesión HTTP y el navegador"""
+        if self.http_session:
+            self.http_session.close()
+            self.http_session = None
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"⚠️ Error al cerrar navegador: {str(e)}")
+            self.driver = None
+            self.wait = None
+    
+    def inyectar_cookies(self, cookies: List[Dict[str, Any]]) -> int:
+        """Carga en el navegador las cookies de una sesión ya autenticada"""
+        self.driver.get(URL_PAGE)
+        inyectadas = 0
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+                inyectadas += 1
+            except Exception as e:
+                print(f"⚠️ No se pudo inyectar la cookie {cookie.get('name')}: {str(e)}")
+        print(f"🍪 {inyectadas}/{len(cookies)} cookies de sesión inyectadas")
+        return inyectadas
+        
+    def _esperar(self, condicion, paso: str, timeout: Optional[float] = None):
+        """Espera una condición explícita y registra su duración como espera del paso"""
+        wait = self.wait if timeout is None else WebDriverWait(self.driver, timeout, poll_frequency=0.1)
+        with self.tiempos.medir(self.servicio_actual, paso, "espera"):
+            return wait.until(condicion)
+    
+    @staticmethod
+    def _condicion_red_inactiva(ventana: float = 0.5):
+        """
+        Condición de espera: documento cargado y sin nuevos recursos de red
+        durante 'ventana' segundos.
+        """
+        estado = {"recursos": -1, "desde": time.time()}
+        
+        def condicion(driver):
+            listo, recursos = driver.execute_script(
+                "return [document.readyState === 'complete', performance.getEntriesByType('resource').length];"
+            )
+            ahora = time.time()
+            if not listo or recursos != estado["recursos"]:
+                estado["recursos"] = recursos
+                estado["desde"] = ahora
+                return False
+            return ahora - estado["desde"] >= ventana
+        
+        return condicion
+    
+    def _esperar_pagina_lista(self, paso: str, timeout: float = 10):
+        """Espera a que el documento esté listo y la red inactiva"""
+        try:
+            self._esperar(self._condicion_red_inactiva(), paso, timeout)
+        except TimeoutException:
+            print("⚠️ La página no quedó inactiva a tiempo, se continúa")
+    
+    def _navegar(self, url: str, paso: str = "navegacion"):
+        """Navega a la URL y espera a que la página esté lista"""
+        with self.tiempos.medir(self.servicio_actual, paso, "trabajo"):
+            self.driver.get(url)
+        self._esperar_pagina_lista(f"{paso}_pagina_lista")
+    
+    def _esperar_tras_clic(self, element, url_anterior: str, paso: str = "clic", timeout: float = 5):
+        """
+        Espera la reacción a un clic: cambio de URL, elemento obsoleto (re-render)
+        o red inactiva, lo que ocurra primero.
+        """
+        red_inactiva = self._condicion_red_inactiva()
+        
+        def condicion(driver):
+            if driver.current_url != url_anterior:
+                return True
+            try:
+                element.is_enabled()
+            except StaleElementReferenceException:
+                return True
+            return red_inactiva(driver)
+        
+        try:
+            self._esperar(condicion, f"{paso}_respuesta", timeout)
+        except TimeoutException:
+            pass
+    
+    def _clic(self, element, paso: str = "clic"):
+        """Clic simple seguido de la espera de su reacción"""
+        url_anterior = self.driver.current_url
+        with self.tiempos.medir(self.servicio_actual, paso, "trabajo"):
+            element.click()
+        self._esperar_tras_clic(element, url_anterior, paso)
+    
     def _take_screenshot(self, service, step):
         """Toma una captura de pantalla para diagnóstico"""
         if not self.driver:
@@ -147,8 +540,8 @@ class WebAutomationDownloader:
             print("Ingresando credenciales...")
             
             # Encontrar campo de usuario
-            username_input = self.wait.until(
-                EC.presence_of_element_located((By.ID, "username"))
+            username_input = self._esperar(
+                EC.presence_of_element_located((By.ID, "username")), "login_formulario"
             )
             username_input.clear()
             username_input.send_keys(URL_USERNAME)
@@ -163,16 +556,23 @@ class WebAutomationDownloader:
             # Hacer clic en el botón de "Iniciar sesión"
             login_button = self.driver.find_element(By.CSS_SELECTOR, "button.login-button")
             print("🔓 Iniciando sesión...")
-            login_button.click()
+            with self.tiempos.medir(self.servicio_actual, "login", "trabajo"):
+                login_button.click()
             
             # Esperar a que se complete el login
-            self.wait.until(lambda driver: "login" not in driver.current_url)
+            self._esperar(lambda driver: "login" not in driver.current_url, "login_redireccion")
             print("Login exitoso")
             
+            # Compartir la sesión con los demás workers
+            if self.sesion_compartida:
+                self.sesion_compartida.publicar(self.driver.get_cookies())
+            
             return True
             
         except Exception as e:
             print(f"Error en el login: {e}")
+            if self.sesion_compartida:
+                self.sesion_compartida.publicar(None)
             return False
     
     def _select_all_checkboxes(self):
@@ -181,8 +581,8 @@ class WebAutomationDownloader:
             print("📋 Seleccionando todas las marcas...")
             
             # Esperar a que aparezcan los checkboxes
-            brands_container = self.wait.until(
-                EC.presence_of_element_located((By.ID, "brands-checkboxes"))
+            brands_container = self._esperar(
+                EC.presence_of_element_located((By.ID, "brands-checkboxes")), "marcas_contenedor"
             )
             print("  ✓ Contenedor de marcas encontrado")
             
@@ -191,17 +591,22 @@ class WebAutomationDownloader:
             print(f"  ✓ {len(checkboxes)} checkboxes detectados")
             
             # Marcar todos los checkboxes
-            for i, checkbox in enumerate(checkboxes, 1):
-                checkbox_id = checkbox.get_attribute("id")
-                print(f"  ✓ Marcando checkbox {i}/{len(checkboxes)}: {checkbox_id}")
-                
-                if not checkbox.is_selected():
-                    try:
-                        checkbox.click()
-                    except:
-                        self.driver.execute_script("arguments[0].click();", checkbox)
+            with self.tiempos.medir(self.servicio_actual, "marcas_seleccion", "trabajo"):
+                for i, checkbox in enumerate(checkboxes, 1):
+                    checkbox_id = checkbox.get_attribute("id")
+                    print(f"  ✓ Marcando checkbox {i}/{len(checkboxes)}: {checkbox_id}")
+                    
+                    if not checkbox.is_selected():
+                        try:
+                            checkbox.click()
+                        except:
+                            self.driver.execute_script("arguments[0].click();", checkbox)
             
-            time.sleep(2)  # Dar tiempo a que se actualice la UI
+            # Esperar a que la UI refleje todas las marcas seleccionadas
+            try:
+                self._esperar(lambda driver: all(cb.is_selected() for cb in checkboxes), "marcas_actualizacion", timeout=5)
+            except TimeoutException:
+                print("⚠️ No todas las marcas quedaron seleccionadas, se continúa")
             return True
             
         except Exception as e:
@@ -217,11 +622,14 @@ class WebAutomationDownloader:
             ("JavaScript", lambda: self.driver.execute_script("arguments[0].click();", element))
         ]
         
+        url_anterior = self.driver.current_url
         for i, (name, func) in enumerate(strategies, 1):
             try:
                 print(f"   {i}. Intentando {name}...")
-                func()
-                time.sleep(2)  # Esperar a que se procese el clic
+                with self.tiempos.medir(self.servicio_actual, "clic", "trabajo"):
+                    func()
+                # Esperar a que se procese el clic
+                self._esperar_tras_clic(element, url_anterior)
                 return True
             except Exception as e:
                 pass
@@ -231,7 +639,9 @@ class WebAutomationDownloader:
     
     def _monitor_downloads(self, current_files: List[str], max_wait_time: int = 120) -> Optional[str]:
         """
-        Monitorea el directorio de descargas para detectar nuevos archivos o archivos modificados
+        Monitorea el directorio de descargas para detectar nuevos archivos o archivos modificados.
+        Solo se acepta un archivo nuevo o modificado desde current_files que coincida con los
+        patrones de descarga del servicio actual; nunca se adivina con archivos anteriores.
         
         Args:
             current_files: Lista de archivos actuales en el directorio
@@ -244,12 +654,15 @@ class WebAutomationDownloader:
         start_time = time.time()
         initial_check_time = time.time()
         
-        # Patrones que coinciden con los archivos descargados para cada servicio
-        # Esto nos ayudará a priorizar los archivos que coincidan con estos patrones
-        download_patterns = []
-        for config in DOWNLOAD_CONFIGS.values():
-            if config.download_patterns:
-                download_patterns.extend(config.download_patterns)
+        # Patrones de los archivos que descarga el servicio actual (o de todos si no se conoce)
+        config_actual = DOWNLOAD_CONFIGS.get(self.servicio_actual)
+        if config_actual is not None and config_actual.download_patterns:
+            download_patterns = list(config_actual.download_patterns)
+        else:
+            download_patterns = []
+            for config in DOWNLOAD_CONFIGS.values():
+                if config.download_patterns:
+                    download_patterns.extend(config.download_patterns)
         
         # Guardar tiempos de modificación iniciales y tamaños
         initial_file_info = {}
@@ -307,30 +720,15 @@ class WebAutomationDownloader:
                 except Exception:
                     pass
             
-            # Si encontramos archivos nuevos o modificados
-            if new_or_modified_files:
-                # Primero, intentar encontrar archivos que coincidan con patrones conocidos
-                pattern_matches = [f for f in new_or_modified_files 
-                                if matches_pattern(os.path.basename(f), download_patterns)]
-                
-                if pattern_matches:
-                    # Priorizar los archivos que coinciden con patrones conocidos
-                    latest_file = max(pattern_matches, key=os.path.getmtime)
-                else:
-                    # Si no hay coincidencias, usar el archivo más reciente
-                    latest_file = max(new_or_modified_files, key=os.path.getmtime)
-                
+            # Solo cuentan los archivos nuevos o modificados que coinciden con el patrón del servicio
+            pattern_matches = [f for f in new_or_modified_files 
+                            if matches_pattern(os.path.basename(f), download_patterns)]
+            if pattern_matches:
+                latest_file = max(pattern_matches, key=os.path.getmtime)
                 print(f"Archivo seleccionado para descarga: {os.path.basename(latest_file)}")
                 return latest_file
-            
-            # Si no encontramos nada después de 30 segundos, buscar cualquier archivo que coincida con patrones
-            if elapsed > 30 and not new_or_modified_files:
-                pattern_matches = [f for f in all_files 
-                                if matches_pattern(os.path.basename(f), download_patterns)]
-                
-                if pattern_matches:
-                    print("⚠️ No se detectaron nuevos archivos, pero se encontró un archivo existente que coincide con el patrón esperado")
-                    return max(pattern_matches, key=os.path.getmtime)
+            if new_or_modified_files:
+                print(f"⚠️ Ningún archivo nuevo coincide con los patrones esperados: {', '.join(download_patterns)}")
             
             return None
         
@@ -351,31 +749,6 @@ class WebAutomationDownloader:
                 if result:
                     return result
                 last_check_time = time.time()
-            
-            # Si han pasado más de 45 segundos, asumir que la descarga ya ocurrió
-            # y buscar un archivo que coincida con los patrones esperados
-            if time.time() - start_time > 45:
-                all_files = glob.glob(os.path.join(self.download_dir, "*"))
-                all_files = [f for f in all_files if not os.path.basename(f).startswith('.') and 
-                            os.path.isfile(f) and not f.endswith('.tmp') and 
-                            not f.endswith('.crdownload') and not f.endswith('.part') and
-                            not os.path.basename(f).startswith('screenshot')]
-                
-                pattern_matches = [f for f in all_files 
-                                if matches_pattern(os.path.basename(f), download_patterns)]
-                
-                if pattern_matches:
-                    best_match = max(pattern_matches, key=os.path.getmtime)
-                    print(f"⏱️ Se alcanzó el tiempo de espera máximo (45s), usando archivo existente que coincide con el patrón: {os.path.basename(best_match)}")
-                    return best_match
-                elif all_files:
-                    # Si no hay coincidencias pero hay archivos, usar el más reciente
-                    most_recent_file = max(all_files, key=os.path.getmtime)
-                    print(f"⏱️ Se alcanzó el tiempo de espera máximo (45s), usando el archivo más reciente: {os.path.basename(most_recent_file)}")
-                    return most_recent_file
-                    
-                print(f"⏱️ Se alcanzó el tiempo de espera máximo (45s), continuando con el siguiente servicio")
-                return None
                 
             time.sleep(0.5)
         
@@ -390,6 +763,126 @@ class WebAutomationDownloader:
         print("FALLÓ: No se detectó un nuevo archivo")
         return None
             
+    def _resolver_url_descarga(self, element, service: str) -> Optional[str]:
+        """
+        Obtiene la URL directa de descarga del elemento (href, data-url, formaction)
+        o, si no la expone, la URL aprendida en una descarga anterior por el navegador.
+        """
+        for atributo in ("href", "data-href", "data-url", "data-download-url", "formaction"):
+            try:
+                valor = element.get_attribute(atributo)
+            except Exception:
+                valor = None
+            if not valor or valor.strip() == "#":
+                continue
+            url = urljoin(self.driver.current_url, valor.strip())
+            if urlparse(url).scheme in ("http", "https"):
+                return url
+        return self.urls_descarga.get(service)
+    
+    def _obtener_sesion_http(self) -> requests.Session:
+        """Devuelve la sesión HTTP con pool de conexiones y las cookies actuales del navegador"""
+        if self.http_session is None:
+            self.http_session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+            self.http_session.mount("http://", adapter)
+            self.http_session.mount("https://", adapter)
+            self.http_session.headers["User-Agent"] = self.driver.execute_script("return navigator.userAgent")
+        
+        for cookie in self.driver.get_cookies():
+            self.http_session.cookies.set(cookie["name"], cookie["value"],
+                                          domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        return self.http_session
+    
+    def _descargar_http(self, url: str, service: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Descarga el archivo por HTTP en streaming, calculando checksum y bytes.
+
+        Returns:
+            Ruta al archivo descargado, ya renombrado con el file_name configurado
+
+        Raises:
+            RuntimeError si la respuesta no es un archivo, RequestException ante fallos de red
+        """
+        config = DOWNLOAD_CONFIGS[service]
+        session = self._obtener_sesion_http()
+        start_time = time.time()
+        
+        with session.get(url, stream=True, timeout=(10, 120), headers={"Referer": self.driver.current_url}) as resp:
+            resp.raise_for_status()
+            if "text/html" in resp.headers.get("Content-Type", ""):
+                raise RuntimeError("La respuesta es una página HTML, no un archivo")
+            
+            # Extensión según Content-Disposition, la URL o el patrón configurado
+            nombre = None
+            disposition = resp.headers.get("Content-Disposition", "")
+            match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', disposition, re.IGNORECASE)
+            if match:
+                nombre = unquote(match.group(1))
+            if not nombre or not os.path.splitext(nombre)[1]:
+                nombre = os.path.basename(unquote(urlparse(resp.url).path))
+            file_ext = os.path.splitext(nombre)[1] or os.path.splitext(config.download_patterns[0])[1]
+            
+            tmp_path = os.path.join(self.download_dir, f".{config.file_name}{file_ext}.part")
+            sha256 = hashlib.sha256()
+            total_bytes = 0
+            with open(tmp_path, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        f.write(chunk)
+                        sha256.update(chunk)
+                        total_bytes += len(chunk)
+        
+        if total_bytes == 0:
+            os.remove(tmp_path)
+            raise RuntimeError("La respuesta no contiene datos")
+        
+        new_filepath = os.path.join(self.output_dir, config.file_name + file_ext)
+        os.replace(tmp_path, new_filepath)
+        
+        elapsed = time.time() - start_time
+        self.detalles_http[service] = {
+            "url": url,
+            "bytes": total_bytes,
+            "sha256": sha256.hexdigest(),
+            "segundos": elapsed
+        }
+        print(f"Descarga HTTP completada: {total_bytes:,} bytes en {elapsed:.2f}s | sha256={sha256.hexdigest()[:16]}...")
+        return new_filepath
+    
+    def _intentar_descarga_http(self, element, service: str) -> Optional[str]:
+        """Intenta la descarga directa por HTTP; devuelve None para continuar con el clic"""
+        if not self.modo_http:
+            return None
+        url = self._resolver_url_descarga(element, service)
+        if not url:
+            print("ℹ️ No se encontró URL directa de descarga, se usará el navegador")
+            return None
+        try:
+            print(f"🌐 Descargando por HTTP: {url}")
+            with self.tiempos.medir(service, "descarga_http", "trabajo"):
+                file_path = self._descargar_http(url, service)
+            print(f"🎉 ÉXITO: Descarga HTTP completada para {DOWNLOAD_CONFIGS[service].name}")
+            return file_path
+        except Exception as e:
+            print(f"⚠️ Falló la descarga HTTP ({str(e)}), se usará el navegador")
+            if self.urls_descarga.get(service) == url:
+                # La URL aprendida ya no sirve: se vuelve a aprender con el clic
+                self.urls_descarga.pop(service, None)
+                guardar_url_descarga(service, None)
+            return None
+    
+    def _recordar_url_descarga(self, service: str):
+        """
+        Guarda la URL de la última descarga del navegador para usarla por HTTP en la próxima,
+        también en RUTA_URLS_DESCARGA para las ejecuciones siguientes.
+        """
+        url = self.ultima_url_descarga
+        if url and urlparse(url).scheme in ("http", "https"):
+            if self.urls_descarga.get(service) != url:
+                guardar_url_descarga(service, url)
+            self.urls_descarga[service] = url
+    
     def _download_auto_express(self) -> Optional[str]:
         """
         Descarga desde Autorepuestos Express
@@ -399,17 +892,22 @@ class WebAutomationDownloader:
             
             # Navegar a la página principal
             print("🌐 Navegando a la página principal...")
-            self.driver.get(URL_PAGE)
-            time.sleep(2)
+            self._navegar(URL_PAGE)
             
             # Buscar y hacer clic en el botón
             print("🔍 Buscando botón de Autorepuestos Express...")
             
-            auto_express_button = self.wait.until(
-                EC.element_to_be_clickable((By.ID, DOWNLOAD_CONFIGS["auto_express"].button_id))
+            auto_express_button = self._esperar(
+                EC.element_to_be_clickable((By.ID, DOWNLOAD_CONFIGS["auto_express"].button_id)), "buscar_boton"
             )
             
+            # Modo HTTP: descarga directa con las cookies del navegador
+            downloaded_file = self._intentar_descarga_http(auto_express_button, "auto_express")
+            if downloaded_file:
+                return downloaded_file
+            
             print("🖱️  Haciendo clic en el botón...")
+            self._marcar_inicio_descarga()
             self._click_with_multiple_strategies(auto_express_button, "botón de Auto Express")
             
             # Esperar descarga
@@ -425,13 +923,15 @@ class WebAutomationDownloader:
                     print(f"  {idx}. {os.path.basename(file)}")
             
             # Usar un tiempo máximo de espera más corto para este servicio (60 segundos)
-            downloaded_file = self._monitor_downloads(current_files, 60)
+            downloaded_file = self._esperar_descarga(current_files, 60)
             
             if downloaded_file:
+                self._recordar_url_descarga("auto_express")
+                
                 # Renombrar el archivo usando el file_name configurado
                 file_ext = os.path.splitext(downloaded_file)[1]  # Obtener la extensión
                 new_filename = DOWNLOAD_CONFIGS["auto_express"].file_name + file_ext
-                new_filepath = os.path.join(self.download_dir, new_filename)
+                new_filepath = os.path.join(self.output_dir, new_filename)
                 
                 try:
                     if os.path.exists(new_filepath):
@@ -461,19 +961,18 @@ class WebAutomationDownloader:
             
             # Volver a la página principal
             print("🔙 Volviendo a la página principal...")
-            self.driver.get(URL_PAGE)
-            time.sleep(2)
+            self._navegar(URL_PAGE)
             
             # Buscar y hacer clic en el botón
             print("🔍 Buscando botón de Auto Fix...")
             # self._take_screenshot("auto_fix", "1-pagina_principal")
             
-            auto_fix_button = self.wait.until(
-                EC.element_to_be_clickable((By.ID, DOWNLOAD_CONFIGS["auto_fix"].button_id))
+            auto_fix_button = self._esperar(
+                EC.element_to_be_clickable((By.ID, DOWNLOAD_CONFIGS["auto_fix"].button_id)), "buscar_boton"
             )
             
             print("🖱️  Haciendo clic en el botón...")
-            auto_fix_button.click()
+            self._clic(auto_fix_button)
             
             # Verificar si requiere login
             if "login" in self.driver.current_url:
@@ -492,11 +991,17 @@ class WebAutomationDownloader:
             print("🔍 Buscando botón de descarga...")
             # self._take_screenshot("auto_fix", "4-boton_descarga")
             
-            download_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Descargar lista de precios')]"))
+            download_button = self._esperar(
+                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Descargar lista de precios')]")), "buscar_boton_descarga"
             )
             
+            # Modo HTTP: descarga directa con las cookies del navegador
+            downloaded_file = self._intentar_descarga_http(download_button, "auto_fix")
+            if downloaded_file:
+                return downloaded_file
+            
             print("🖱️  Haciendo clic en el botón...")
+            self._marcar_inicio_descarga()
             self._click_with_multiple_strategies(download_button, "botón de descarga")
             
             # Esperar a que se complete la descarga
@@ -506,13 +1011,15 @@ class WebAutomationDownloader:
                             not f.endswith('.crdownload') and not f.endswith('.part') and
                             not os.path.basename(f).startswith('screenshot')]
             
-            downloaded_file = self._monitor_downloads(current_files)
+            downloaded_file = self._esperar_descarga(current_files)
             
             if downloaded_file:
+                self._recordar_url_descarga("auto_fix")
+                
                 # Renombrar el archivo usando el file_name configurado
                 file_ext = os.path.splitext(downloaded_file)[1]  # Obtener la extensión
                 new_filename = DOWNLOAD_CONFIGS["auto_fix"].file_name + file_ext
-                new_filepath = os.path.join(self.download_dir, new_filename)
+                new_filepath = os.path.join(self.output_dir, new_filename)
                 
                 try:
                     if os.path.exists(new_filepath):
@@ -542,19 +1049,18 @@ class WebAutomationDownloader:
             
             # Volver a la página principal
             print("🔙 Volviendo a la página principal...")
-            self.driver.get(URL_PAGE)
-            time.sleep(2)
+            self._navegar(URL_PAGE)
             
             # Buscar y hacer clic en el botón
             print("🔍 Buscando botón de Mundo RepCar...")
             # self._take_screenshot("mundo_repcar", "1-pagina_principal")
             
-            mundo_repcar_button = self.wait.until(
-                EC.element_to_be_clickable((By.ID, DOWNLOAD_CONFIGS["mundo_repcar"].button_id))
+            mundo_repcar_button = self._esperar(
+                EC.element_to_be_clickable((By.ID, DOWNLOAD_CONFIGS["mundo_repcar"].button_id)), "buscar_boton"
             )
             
             print("🖱️  Haciendo clic en el botón...")
-            mundo_repcar_button.click()
+            self._clic(mundo_repcar_button)
             
             # Verificar si requiere login
             if "login" in self.driver.current_url:
@@ -602,7 +1108,13 @@ class WebAutomationDownloader:
             print(f"  • Clase: {element_class}")
             
             # Hacer clic en el botón normalmente
+            # Modo HTTP: descarga directa con las cookies del navegador
+            downloaded_file = self._intentar_descarga_http(download_element, "mundo_repcar")
+            if downloaded_file:
+                return downloaded_file
+            
             print("🖱️  Haciendo clic en el botón...")
+            self._marcar_inicio_descarga()
             self._click_with_multiple_strategies(download_element, "botón de descarga")
             
             # Esperar a que se complete la descarga
@@ -612,13 +1124,15 @@ class WebAutomationDownloader:
                             not f.endswith('.crdownload') and not f.endswith('.part') and
                             not os.path.basename(f).startswith('screenshot')]
             
-            downloaded_file = self._monitor_downloads(current_files)
+            downloaded_file = self._esperar_descarga(current_files)
             
             if downloaded_file:
+                self._recordar_url_descarga("mundo_repcar")
+                
                 # Renombrar el archivo usando el file_name configurado
                 file_ext = os.path.splitext(downloaded_file)[1]  # Obtener la extensión
                 new_filename = DOWNLOAD_CONFIGS["mundo_repcar"].file_name + file_ext
-                new_filepath = os.path.join(self.download_dir, new_filename)
+                new_filepath = os.path.join(self.output_dir, new_filename)
                 
                 try:
                     if os.path.exists(new_filepath):
@@ -638,15 +1152,118 @@ class WebAutomationDownloader:
         except Exception as e:
             print(f"💥 Error en descarga de Mundo RepCar: {str(e)}")
             return None
+    
+    def descargar_servicio(self, service: str) -> Optional[str]:
+        """Descarga el archivo del servicio indicado registrando su tiempo total"""
+        metodos = {
+            "auto_express": self._download_auto_express,
+            "auto_fix": self._download_auto_fix,
+            "mundo_repcar": self._download_mundo_repcar
+        }
+        if service not in metodos:
+            return None
+        
+        self.servicio_actual = service
+        start_time = time.perf_counter()
+        try:
+            return metodos[service]()
+        finally:
+            self.tiempos.registrar_total(service, time.perf_counter() - start_time)
+            self.servicio_actual = None
+
+
+def limpiar_directorio_descargas(download_dir: str):
+    """Elimina los archivos descargados previamente (conserva capturas y ocultos)"""
+    try:
+        print("🧹 Limpiando directorio de descargas...")
+        files_to_delete = glob.glob(os.path.join(download_dir, "*"))
+        files_to_delete = [f for f in files_to_delete if not os.path.basename(f).startswith('.') and 
+                        os.path.isfile(f) and not os.path.basename(f).startswith('screenshot')]
+        
+        for file_path in files_to_delete:
+            try:
+                os.remove(file_path)
+                print(f"  ✓ Eliminado: {os.path.basename(file_path)}")
+            except Exception as e:
+                print(f"  ✗ No se pudo eliminar {os.path.basename(file_path)}: {str(e)}")
+        
+        print(f"Se eliminaron {len(files_to_delete)} archivos del directorio de descargas")
+    except Exception as e:
+        print(f"⚠️ Error al limpiar directorio de descargas: {str(e)}")
+
+
+def mostrar_resumen_descargas(results: Dict[str, Optional[str]], services_to_download: List[str],
+                              total_time: float, modo: str):
+    """Muestra el resumen de descargas y el tiempo total"""
+    print("\n============================================================")
+    print(f"📊 RESUMEN DE DESCARGAS ({modo}):")
+    print("============================================================")
+    
+    successful_count = 0
+    for service, file_path in results.items():
+        # Obtener el nombre configurado y el nombre mostrado
+        config_name = DOWNLOAD_CONFIGS[service].name
+        
+        if file_path:
+            file_size = os.path.getsize(file_path)
+            file_name = os.path.basename(file_path)
+            print(f"{config_name.ljust(20)} - {file_name} ({file_size:,} bytes)")
+            successful_count += 1
+        else:
+            print(f"{config_name.ljust(20)} - DESCARGA FALLIDA")
+    
+    # Mostrar resultado final
+    if successful_count == len(services_to_download):
+        print(f"\n🎉 ¡ÉXITO TOTAL! {successful_count}/{len(services_to_download)} descargas completadas correctamente")
+    else:
+        print(f"\n🏁 RESULTADO FINAL: {successful_count}/{len(services_to_download)} descargas exitosas")
+    
+    print(f"⏱️  Tiempo total de proceso: {total_time:.2f} segundos")
+    print("============================================================")
+
+
+def _mostrar_archivos_descargados(results: Dict[str, Optional[str]]):
+    """Muestra el listado final de descargas exitosas y fallidas"""
+    print("\n🎊 PROCESO COMPLETADO:")
+    successful_downloads = {k: v for k, v in results.items() if v is not None}
+    failed_downloads = {k: v for k, v in results.items() if v is None}
+    
+    print(f"Exitosos: {len(successful_downloads)}")
+    print(f"Fallidos: {len(failed_downloads)}")
+    
+    if successful_downloads:
+        print("\n📦 ARCHIVOS DESCARGADOS:")
+        for service, file_path in successful_downloads.items():
+            print(f"   • {service}: {file_path}")
+    
+    if failed_downloads:
+        print("\n⚠️  DESCARGAS FALLIDAS:")
+        for service in failed_downloads:
+            print(f"   • {service}")
 
-def download_all_files_single_session(services_to_download: List[str] = None, max_wait_time: int = 120, clean_download_dir: bool = False) -> Dict[str, Optional[str]]:
+def download_all_files_single_session(services_to_download: List[str] = None, max_wait_time: Optional[int] = None, clean_download_dir: bool = False,
+                                      parallel: bool = False, max_workers: Optional[int] = None,
+                                      modo_http: bool = False, registro_tiempos: Optional[RegistroTiempos] = None) -> Dict[str, Optional[str]]:
+    """
+    Descarga los servicios con una única sesión de navegador.
+
+    Si se pasa registro_tiempos, en él queda el presupuesto de esperas/trabajo de la ejecución.
+    max_wait_time es la espera máxima por descarga (por defecto, la de cada servicio).
+    """
   
+    # Modo paralelo: un navegador por servicio
+    if parallel:
+        return download_all_files_parallel(services_to_download, max_wait_time, clean_download_dir, max_workers,
+                                           modo_http, registro_tiempos)
+    
     # Si no se especifican servicios, usar todos
     if services_to_download is None:
         services_to_download = ["auto_express", "auto_fix", "mundo_repcar"]
     
     # Crear una instancia única del downloader
-    downloader = WebAutomationDownloader()
+    registro_tiempos = registro_tiempos or RegistroTiempos()
+    downloader = WebAutomationDownloader(modo_http=modo_http, registro_tiempos=registro_tiempos,
+                                         max_wait_time=max_wait_time)
     results = {}
     
     try:
@@ -658,77 +1275,30 @@ def download_all_files_single_session(services_to_download: List[str] = None, ma
         
         # Inicializar navegador una sola vez
         print("⚙️  Configurando navegador único para todas las descargas...")
-        downloader.setup_driver()
+        with registro_tiempos.medir("general", "setup_driver", "trabajo"):
+            downloader.setup_driver()
         print("Navegador iniciado exitosamente\n")
         
         # Limpiar directorio de descargas si se solicita
         if clean_download_dir:
-            download_dir = downloader.download_dir
-            try:
-                print("🧹 Limpiando directorio de descargas...")
-                files_to_delete = glob.glob(os.path.join(download_dir, "*"))
-                files_to_delete = [f for f in files_to_delete if not os.path.basename(f).startswith('.') and 
-                                os.path.isfile(f) and not os.path.basename(f).startswith('screenshot')]
-                
-                for file_path in files_to_delete:
-                    try:
-                        os.remove(file_path)
-                        print(f"  ✓ Eliminado: {os.path.basename(file_path)}")
-                    except Exception as e:
-                        print(f"  ✗ No se pudo eliminar {os.path.basename(file_path)}: {str(e)}")
-                
-                print(f"Se eliminaron {len(files_to_delete)} archivos del directorio de descargas")
-            except Exception as e:
-                print(f"⚠️ Error al limpiar directorio de descargas: {str(e)}")
+            limpiar_directorio_descargas(downloader.download_dir)
         
         # Medir el tiempo total
         start_time = time.time()
         
         # Descargar cada servicio secuencialmente
         for service in services_to_download:
-            # Descargar el archivo según el servicio
-            if service == "auto_express":
-                file_path = downloader._download_auto_express()
-            elif service == "auto_fix":
-                file_path = downloader._download_auto_fix()
-            elif service == "mundo_repcar":
-                file_path = downloader._download_mundo_repcar()
-            else:
+            if service not in DOWNLOAD_CONFIGS:
                 continue
-                
-            # Guardar resultado
-            results[service] = file_path
+            # Descargar el archivo según el servicio y guardar resultado
+            results[service] = downloader.descargar_servicio(service)
         
         # Calcular tiempo total
         total_time = time.time() - start_time
         
         # Mostrar resumen
-        print("\n============================================================")
-        print("📊 RESUMEN DE DESCARGAS (SESIÓN ÚNICA):")
-        print("============================================================")
-        
-        successful_count = 0
-        for service, file_path in results.items():
-            # Obtener el nombre configurado y el nombre mostrado
-            config_name = DOWNLOAD_CONFIGS[service].name
-            file_name_config = DOWNLOAD_CONFIGS[service].file_name
-            
-            if file_path:
-                file_size = os.path.getsize(file_path)
-                file_name = os.path.basename(file_path)
-                print(f"{config_name.ljust(20)} - {file_name} ({file_size:,} bytes)")
-                successful_count += 1
-            else:
-                print(f"{config_name.ljust(20)} - DESCARGA FALLIDA")
-        
-        # Mostrar resultado final
-        if successful_count == len(services_to_download):
-            print(f"\n🎉 ¡ÉXITO TOTAL! {successful_count}/{len(services_to_download)} descargas completadas correctamente")
-        else:
-            print(f"\n🏁 RESULTADO FINAL: {successful_count}/{len(services_to_download)} descargas exitosas")
-        
-        print(f"⏱️  Tiempo total de proceso: {total_time:.2f} segundos")
-        print("============================================================")
+        mostrar_resumen_descargas(results, services_to_download, total_time, "SESIÓN ÚNICA")
+        registro_tiempos.imprimir()
         
         return results
     
@@ -737,7 +1307,9 @@ def download_all_files_single_session(services_to_download: List[str] = None, ma
         return {}
     
     finally:
-        # Cerrar el navegador al finalizar todas las descargas
+        # Cerrar la sesión HTTP y el navegador al finalizar todas las descargas
+        if downloader.http_session:
+            downloader.http_session.close()
         if downloader.driver:
             print("🔒 Cerrando navegador...")
             try:
@@ -747,19 +1319,121 @@ def download_all_files_single_session(services_to_download: List[str] = None, ma
                 print(f"⚠️ Error al cerrar navegador: {str(e)}")
                 
         # Mostrar información final
-        print("\n🎊 PROCESO COMPLETADO:")
-        successful_downloads = {k: v for k, v in results.items() if v is not None}
-        failed_downloads = {k: v for k, v in results.items() if v is None}
-        
-        print(f"Exitosos: {len(successful_downloads)}")
-        print(f"Fallidos: {len(failed_downloads)}")
-        
-        if successful_downloads:
-            print("\n📦 ARCHIVOS DESCARGADOS:")
-            for service, file_path in successful_downloads.items():
-                print(f"   • {service}: {file_path}")
-        
-        if failed_downloads:
-            print("\n⚠️  DESCARGAS FALLIDAS:")
-            for service in failed_downloads:
-                print(f"   • {service}")
\ No newline at end of file
+        _mostrar_archivos_descargados(results)
+
+
+def _ejecutar_worker(service: str, base_dir: str, sesion: SesionCompartida, modo_http: bool = False,
+                     registro_tiempos: Optional[RegistroTiempos] = None,
+                     max_wait_time: Optional[int] = None) -> Optional[str]:
+    """
+    Descarga un único servicio en su propio navegador y directorio de descargas.
+    El archivo final se deja en base_dir con el mismo nombre que en el modo secuencial.
+    """
+    config = DOWNLOAD_CONFIGS[service]
+    worker_dir = os.path.join(base_dir, f"worker_{service}")
+    downloader = WebAutomationDownloader(download_dir=worker_dir, output_dir=base_dir,
+                                         debugging_port=None, sesion_compartida=sesion, modo_http=modo_http,
+                                         registro_tiempos=registro_tiempos, max_wait_time=max_wait_time)
+    es_lider_login = config.requires_login and sesion.reclamar_login()
+    
+    try:
+        print(f"⚙️  [{config.name}] Iniciando navegador del worker...")
+        with downloader.tiempos.medir(service, "setup_driver", "trabajo"):
+            downloader.setup_driver()
+        
+        # Los workers autenticados reutilizan la sesión del que hizo login
+        if config.requires_login and not es_lider_login:
+            print(f"⏳ [{config.name}] Esperando sesión compartida...")
+            with downloader.tiempos.medir(service, "sesion_compartida", "espera"):
+                cookies = sesion.esperar_cookies()
+            if cookies:
+                with downloader.tiempos.medir(service, "inyectar_cookies", "trabajo"):
+                    downloader.inyectar_cookies(cookies)
+            else:
+                print(f"⚠️ [{config.name}] Sin sesión compartida, se hará login propio")
+        
+        file_path = downloader.descargar_servicio(service)
+        
+        # Si el renombrado falló, el archivo sigue en worker_dir, que se borra al terminar
+        directorio_worker = os.path.abspath(worker_dir)
+        if file_path and os.path.commonpath([os.path.abspath(file_path), directorio_worker]) == directorio_worker:
+            destino = os.path.join(base_dir, os.path.basename(file_path))
+            try:
+                os.replace(file_path, destino)
+                file_path = destino
+            except OSError as e:
+                print(f"❌ [{config.name}] No se pudo mover {os.path.basename(file_path)} a {base_dir}: {str(e)}")
+                return None
+        return file_path
+    
+    except Exception as e:
+        print(f"💥 [{config.name}] Error en el worker: {str(e)}")
+        return None
+    
+    finally:
+        # Nunca dejar bloqueados a los workers que esperan la sesión
+        if es_lider_login:
+            sesion.liberar()
+        if downloader.http_session:
+            downloader.http_session.close()
+        if downloader.driver:
+            try:
+                downloader.driver.quit()
+            except Exception as e:
+                print(f"⚠️ [{config.name}] Error al cerrar navegador: {str(e)}")
+        shutil.rmtree(worker_dir, ignore_errors=True)
+
+
+def download_all_files_parallel(services_to_download: List[str] = None, max_wait_time: Optional[int] = None, clean_download_dir: bool = False,
+                                max_workers: Optional[int] = None, modo_http: bool = False,
+                                registro_tiempos: Optional[RegistroTiempos] = None) -> Dict[str, Optional[str]]:
+    """
+    Descarga los servicios en paralelo con un navegador por servicio.
+
+    Cada worker descarga en su propio directorio y el archivo final queda en
+    data_sin_procesar con el mismo nombre que en el modo de sesión única. El login
+    se hace una sola vez y las cookies se comparten con los workers que lo requieren.
+
+    Returns:
+        Dict servicio -> ruta del archivo descargado (o None), igual que el modo secuencial
+    """
+    if services_to_download is None:
+        services_to_download = ["auto_express", "auto_fix", "mundo_repcar"]
+    services = [s for s in services_to_download if s in DOWNLOAD_CONFIGS]
+    
+    base_dir = os.path.join(os.getcwd(), "data_sin_procesar")
+    os.makedirs(base_dir, exist_ok=True)
+    sesion = SesionCompartida()
+    registro_tiempos = registro_tiempos or RegistroTiempos()
+    results = {}
+    
+    try:
+        print("Servicios: " + ", ".join(DOWNLOAD_CONFIGS[s].name for s in services))
+        print("============================================================")
+        print("🚀 INICIANDO AUTOMATIZACIÓN EN PARALELO")
+        print("============================================================\n")
+        
+        if clean_download_dir:
+            limpiar_directorio_descargas(base_dir)
+        
+        start_time = time.time()
+        
+        with ThreadPoolExecutor(max_workers=max_workers or len(services) or 1) as executor:
+            futures = {s: executor.submit(_ejecutar_worker, s, base_dir, sesion, modo_http, registro_tiempos,
+                                          max_wait_time) for s in services}
+            # Respetar el orden de los servicios solicitados
+            for service in services:
+                results[service] = futures[service].result()
+        
+        total_time = time.time() - start_time
+        mostrar_resumen_descargas(results, services, total_time, "EN PARALELO")
+        registro_tiempos.imprimir()
+        
+        return results
+    
+    except Exception as e:
+        print(f"💥 Error general en la automatización: {str(e)}")
+        return {}
+    
+    finally:
+        _mostrar_archivos_descargados(results)
@@ -1,8 +1,26 @@
 import pandas as pd
 import os
 import numpy as np
-from controller.fetch_data_controller import upload_files
-from utils.utils import renombrar_columnas, formatear_precio, filtrar_columnas, export_data, print_data
+import time
+import itertools
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from controller.fetch_data_controller import upload_files, obtener_cliente_subida
+from utils.utils import export_data, exportar_lotes, subir_exportacion, print_data, columnas_requeridas
+from utils.manifiesto import calcular_hash, resultado_sin_cambios, registrar_resultado
+from utils.lectores import procesar_csv_por_bloques, leer_excel, LibroExcel, leer_csv_por_lotes, leer_excel_por_lotes
+from utils.transformaciones import compilar_plan
+from utils.memoria import ReporteMemoria, concatenar_bloques
+from utils.delta import (cargar_snapshot, guardar_snapshot, copiar_snapshot, calcular_delta, resumen_delta,
+                         filas_a_subir, DIRECTORIO_SNAPSHOTS)
+from utils.escritores import escribir, abrir_escritor
+from utils.metricas import SIN_METRICAS
+from utils.validacion import ValidadorLista, ErrorValidacion, validar_lista
+from config.config import TAMANO_BLOQUE_CSV, AUTOFIX_WORKERS, TAMANO_LOTE
 
 
 
@@ -13,130 +31,544 @@ pd.set_option('display.width', 1000)
 pd.set_option('display.float_format', '{:.2f}'.format)
 
 
-def procesar_datos_autofix():
-    download_dir = "data_sin_procesar"
-    file_path = os.path.join(download_dir, "autofix.xlsx")
-    dfs = []
-    viejas_columnas = ['CODIGO', 'DESCR', 'NROORI', 'PRECIO', 'DESCR2', 'CODPRO', 'ORIGEN',
-       'CANPED', 'FOTO', 'COEF', 'CODRUB']
-    nuevas_columnas = {'DESCR':'DESCRIPCION','DESCR2':'DESCRIPCION2'}
-    if not os.path.exists(file_path):
-        print(f"El archivo {file_path} no existe.")
-        return
+@dataclass
+class ProveedorConfig:
+    """Configuración declarativa del procesamiento de cada proveedor"""
+    nombre: str
+    servicio: str                   # clave en DOWNLOAD_CONFIGS
+    archivo: str                    # archivo descargado en data_sin_procesar
+    formato_origen: str             # 'excel', 'excel_hojas' (una hoja por marca) o 'csv'
+    columnas: Dict[str, str]        # columna del origen -> columna requerida
+    concatenar: Dict[str, List[str]] = field(default_factory=dict)
+    eliminar_caracteres: Dict[str, str] = field(default_factory=dict)
+    truncar: Dict[str, int] = field(default_factory=dict)
+    limpiar_codigo: bool = False
+    marca_desde_hoja: bool = False
+    skiprows: int = 0
+    sep: str = ';'
+    separador_decimal: Optional[str] = None
+    separador_miles: Optional[str] = None
 
-    # Leer el archivo Excel
-    xls = pd.read_excel(file_path, engine='openpyxl',sheet_name=None)
-    
-    for sheet_name, df in xls.items():
-        
-        # Renombrar columnas
-        df = renombrar_columnas(df, viejas_columnas, nuevas_columnas)
-        df = df.dropna(subset=['CODIGO'])
-        # Agregar columna MARCA con el nombre de la hoja
-        df['MARCA'] = sheet_name
-
-        # Combinar DESCRIPCION y DESCRIPCION2
-        df['CODIGO'] = df['CODIGO'].astype(str).str.strip().fillna('')
-        df['PRECIO'] = df['PRECIO'].fillna('')
-        df['DESCRIPCION'] = df['DESCRIPCION'].fillna('')
-        df['DESCRIPCION2'] = df['DESCRIPCION2'].fillna('')
-        df['DESCRIPCION'] = df['DESCRIPCION'] + ' ' + df['DESCRIPCION2']
-        
-        # Limpiar DESCRIPCION: quitar comas y truncar a 100 caracteres
-        df['DESCRIPCION'] = df['DESCRIPCION'].str.replace(',', '').str[:100]
-        
-        # Formatear precios
-        df = formatear_precio(df)
-        
-        # Filtrar columnas requeridas
-        df = filtrar_columnas(df)
+
+# Configuraciones para cada proveedor, en el orden del resumen final
+PROVEEDORES_CONFIGS = {
+    "autofix": ProveedorConfig(
+        nombre="AutoFix",
+        servicio="auto_fix",
+        archivo="autofix.xlsx",
+        formato_origen="excel_hojas",
+        columnas={'CODIGO': 'CODIGO', 'PRECIO': 'PRECIO'},
+        concatenar={'DESCRIPCION': ['DESCR', 'DESCR2']},
+        eliminar_caracteres={'DESCRIPCION': ','},
+        truncar={'DESCRIPCION': 100},
+        limpiar_codigo=True,
+        marca_desde_hoja=True
+    ),
+    "express": ProveedorConfig(
+        nombre="Express",
+        servicio="auto_express",
+        archivo="express.xlsx",
+        formato_origen="excel",
+        columnas={'CODIGO PROVEEDOR': 'CODIGO', 'DESCRIPCION': 'DESCRIPCION',
+                  'MARCA': 'MARCA', 'PRECIO DE LISTA': 'PRECIO'},
+        skiprows=10
+    ),
+    "repcar": ProveedorConfig(
+        nombre="RepCar",
+        servicio="mundo_repcar",
+        archivo="repcar.csv",
+        formato_origen="csv",
+        columnas={'Cod. Articulo': 'CODIGO', 'Marca': 'MARCA', 'Importe': 'PRECIO'},
+        concatenar={'DESCRIPCION': ['Descripcion', 'Rubro']},
+        truncar={'DESCRIPCION': 100},
+        # CSV con separador ';': coma decimal y punto de miles
+        separador_decimal=',',
+        separador_miles='.'
+    )
+}
+
+# Planes compilados por proveedor (también en los procesos del pool de hojas)
+PLANES = {proveedor: compilar_plan(config) for proveedor, config in PROVEEDORES_CONFIGS.items()}
+
+
+def _resultado_previo(proveedor, file_path, forzar):
+    """
+    Calcula el hash del archivo original y, si no cambió desde la última subida
+    exitosa (y no se fuerza el reproceso), devuelve el resultado anterior.
+    """
+    hash_origen = calcular_hash(file_path)
+    if forzar:
+        return hash_origen, None
+    previo = resultado_sin_cambios(proveedor, hash_origen, obtener_cliente_subida().api_url)
+    if previo:
+        print(f"⏭️ {file_path} no cambió desde la última subida, se reutiliza el enlace: {previo['link_api']}")
+    return hash_origen, previo
+
+
+# Libro y plan del proceso del pool de hojas (se abren una vez por proceso)
+_libro_worker = None
+_plan_worker = None
+
+
+def _inicializar_worker_hojas(file_path, motor, proveedor):
+    global _libro_worker, _plan_worker
+    _libro_worker = LibroExcel(file_path, motor)
+    _plan_worker = PLANES[proveedor]
+
+
+class _TransformacionMedida:
+    """
+    Aplica el plan de un proveedor acumulando el tiempo de transformación, para
+    separarlo del de lectura cuando ambas se intercalan (bloques de CSV, hojas).
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.segundos = 0.0
+
+    def __call__(self, df, hoja=None):
+        inicio = time.perf_counter()
+        try:
+            return self.plan.aplicar(df, hoja)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+
+
+def _procesar_hoja(sheet_name):
+    transformar = _TransformacionMedida(_plan_worker)
+    df = transformar(_libro_worker.leer_hoja(sheet_name), sheet_name)
+    return df, transformar.segundos
+
+
+def _procesar_hojas(proveedor, file_path, max_workers, transformar):
+    """
+    Procesa las hojas del libro una a una. Con más de un worker, cada proceso abre
+    el libro una vez y lee y transforma sus hojas; los resultados llegan en orden.
+    """
+    with LibroExcel(file_path) as libro:
+        hojas = libro.hojas
+        motor = libro.motor
         
-        # Agregar DataFrame procesado a la lista
-        dfs.append(df)
+        if max_workers > 1 and len(hojas) > 1:
+            try:
+                # 'spawn' evita heredar por fork locks tomados por los hilos de los otros pipelines
+                with ProcessPoolExecutor(max_workers=min(max_workers, len(hojas)),
+                                         mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_inicializar_worker_hojas,
+                                         initargs=(file_path, motor, proveedor)) as executor:
+                    dfs = []
+                    for df, segundos in executor.map(_procesar_hoja, hojas):
+                        transformar.segundos += segundos
+                        if df is not None:
+                            dfs.append(df)
+                    return dfs
+            except (BrokenProcessPool, OSError) as e:
+                print(f"⚠️ Falló el procesamiento en paralelo, se procesará secuencialmente: {e}")
         
-    # Unificar todos los DataFrames
-    if dfs:
-        final_df = pd.concat(dfs, ignore_index=True)
-    else:
-        print("No se encontraron datos válidos en las hojas.")
+        # Lectura perezosa: una hoja en memoria a la vez
+        dfs = []
+        for sheet_name, df in libro:
+            df = transformar(df, sheet_name)
+            if df is not None:
+                dfs.append(df)
+        return dfs
+
+
+def transformar_proveedor(proveedor, file_path, transformar=None):
+    """
+    Lee el archivo del proveedor según su formato de origen y aplica su plan de transformación.
+
+    Args:
+        transformar: _TransformacionMedida donde queda el tiempo de transformación (opcional)
+
+    Returns:
+        DataFrame con las columnas requeridas, o None si no hay datos válidos
+    """
+    config = PROVEEDORES_CONFIGS[proveedor]
+    transformar = transformar or _TransformacionMedida(PLANES[proveedor])
+
+    if config.formato_origen == 'excel_hojas':
+        dfs = _procesar_hojas(proveedor, file_path, AUTOFIX_WORKERS, transformar)
+        if not dfs:
+            print("No se encontraron datos válidos en las hojas.")
+            return None
+        return concatenar_bloques(dfs)
+
+    if config.formato_origen == 'excel':
+        return transformar(leer_excel(file_path, skiprows=config.skiprows))
+
+    if config.formato_origen == 'csv':
+        # Lectura por bloques, detectando el encoding una sola vez
+        df = procesar_csv_por_bloques(file_path, transformar, sep=config.sep, tamano_bloque=TAMANO_BLOQUE_CSV)
+        if df is None:
+            print(f"El archivo {file_path} no contiene datos.")
+        return df
+
+    raise ValueError(f"Formato de origen desconocido para {proveedor}: {config.formato_origen}")
+
+
+def leer_lotes_proveedor(proveedor, file_path, tamano_lote=TAMANO_LOTE):
+    """
+    Generador de lotes crudos del archivo del proveedor: (hoja o None, DataFrame de hasta tamano_lote filas).
+    """
+    config = PROVEEDORES_CONFIGS[proveedor]
+    if config.formato_origen in ('excel', 'excel_hojas'):
+        return leer_excel_por_lotes(file_path, skiprows=config.skiprows, tamano_lote=tamano_lote,
+                                    todas_las_hojas=config.formato_origen == 'excel_hojas')
+    if config.formato_origen == 'csv':
+        return ((None, lote) for lote in leer_csv_por_lotes(file_path, sep=config.sep, tamano_lote=tamano_lote))
+    raise ValueError(f"Formato de origen desconocido para {proveedor}: {config.formato_origen}")
+
+
+def transformar_por_lotes(proveedor, file_path, tamano_lote=TAMANO_LOTE, transformar=None):
+    """
+    Generador de lotes transformados (columnas requeridas): cada lote crudo se
+    transforma y se entrega sin acumularlo, así la memoria no depende del tamaño del archivo.
+    """
+    transformar = transformar or _TransformacionMedida(PLANES[proveedor])
+    for hoja, lote in leer_lotes_proveedor(proveedor, file_path, tamano_lote):
+        df = transformar(lote, hoja)
+        if df is not None and not df.empty:
+            yield df
+
+
+def _copiar_lotes(lotes, escritor, proveedor):
+    """
+    Escribe cada lote también en 'escritor' (la lista procesada para el snapshot) al pasar.
+    Si la copia falla se descarta y sigue la exportación: la subida no depende de ella.
+    """
+    for lote in lotes:
+        if escritor is not None and not escritor.descartado:
+            try:
+                escritor.escribir(lote)
+            except Exception as e:
+                print(f"⚠️ {proveedor}: no se guardará la lista procesada para el snapshot: {e}")
+                escritor.descartar()
+        yield lote
+
+
+def _validar_lotes(lotes, validador):
+    """Valida cada lote antes de que se escriba: un error de estructura corta en el primer lote"""
+    for lote in lotes:
+        validador.agregar(lote)
+        yield lote
+
+
+def _resultado_validacion_fallida(proveedor, reporte, archivo_local=None):
+    print(f"❌ {proveedor}: la lista no pasó la validación previa, no se sube")
+    return {
+        'archivo_local': archivo_local,
+        'subida_exitosa': False,
+        'link_api': None,
+        'error': f"Validación previa fallida: {'; '.join(reporte.errores)}",
+        'proveedor': proveedor,
+        'validacion': reporte.como_dict()
+    }
+
+
+def _registrar_validacion(metricas, proveedor, reporte, segundos=None):
+    metricas.registrar(proveedor, "validacion", segundos, valido=reporte.valido, filas=reporte.filas,
+                       errores=reporte.errores, **reporte.conteos)
+
+
+def _delta_contra_snapshot(proveedor, df):
+    """
+    Calcula el delta contra la última lista subida del proveedor, o None si no hay snapshot.
+    """
+    anterior = cargar_snapshot(proveedor)
+    if anterior is None:
         return None
-    # Aquí puedes agregar la lógica para procesar los datos según tus necesidades
-    print("Datos de Auto Fix:")
+    delta = calcular_delta(anterior, df)
+    resumen = resumen_delta(delta)
+    print(f"🔀 Delta de {proveedor}: {resumen['altas']:,} altas, {resumen['bajas']:,} bajas, "
+          f"{resumen['cambios_precio']:,} cambios de precio, {resumen['otros_cambios']:,} otros cambios")
+    return delta
 
-    
-    # Exportar datos a Excel
-    respuesta = export_data(final_df, "autofix")
-    return respuesta
 
-def procesar_datos_express():
-    download_dir = "data_sin_procesar"
-    file_path = os.path.join(download_dir, "express.xlsx")
+def _resultado_delta_vacio(proveedor):
+    print(f"⏭️ {proveedor}: no hay altas ni modificaciones respecto de la última subida, no se sube el delta")
+    return {
+        'archivo_local': None,
+        'subida_exitosa': True,
+        'link_api': None,
+        'error': None,
+        'proveedor': proveedor,
+        'sin_cambios': True
+    }
+
+
+def _guardar_bajas(proveedor, bajas, directorio="datos_procesados"):
+    """
+    La API no recibe bajas: se guardan localmente junto al archivo del delta.
+    """
+    if bajas.empty:
+        return None
+    fecha_actual = datetime.now().strftime("%Y%m%d")
+    bajas_info = escribir(bajas, os.path.join(directorio, f"{proveedor}_bajas_{fecha_actual}"), 'csv')
+    print(f"Bajas guardadas: {bajas_info['ruta']} ({len(bajas):,} artículos)")
+    return bajas_info['ruta']
 
-    if not os.path.exists(file_path):
-        print(f"El archivo {file_path} no existe.")
-        return
 
-    # Leer el archivo Excel
-    df = pd.read_excel(file_path, engine='openpyxl',skiprows=10)
-    
-    viejas_columnas = ['CODIGO PROVEEDOR', 'DESCRIPCION', 'PRECIO DE LISTA',
-       'PRECIO OFERTA/OUTLET', 'CODIGO RUBRO', 'RUBRO', 'CODIGO MARCA',
-       'MARCA', 'IVA', 'CODIGO BARRA']
-    nuevas_columnas = {'CODIGO PROVEEDOR':'CODIGO', 'PRECIO DE LISTA':'PRECIO' }
-
-    df = renombrar_columnas(df, viejas_columnas, nuevas_columnas)
-    df = df.dropna(subset=['CODIGO'])
-    # Formatear precios
-    df = formatear_precio(df)
-
-    df = filtrar_columnas(df)
-    # Aquí puedes agregar la lógica para procesar los datos según tus necesidades
-    print("Datos de Express:")
-
-    
-    # Exportar datos a Excel
-    respuesta = export_data(df, "express")
+def _registrar_exportacion(metricas, proveedor, respuesta):
+    """
+    Registra como etapas separadas la escritura del archivo y su subida a la API.
+    """
+    exportacion = respuesta.get('exportacion')
+    if exportacion:
+        metricas.registrar(proveedor, "exportacion", exportacion['segundos'],
+                           formato=exportacion['formato'], bytes=exportacion['bytes'])
+    subida = respuesta.get('metricas_subida')
+    metricas.registrar(proveedor, "subida", subida['segundos_totales'] if subida else None,
+                       exitosa=respuesta.get('subida_exitosa', False),
+                       desde_registro=respuesta.get('desde_registro', False),
+                       error=respuesta.get('error'), **(subida or {}))
+
+
+def procesar_proveedor(proveedor, forzar=False, incremental=False, metricas=SIN_METRICAS, ejecucion=None,
+                       tamano_lote=None):
+    """
+    Procesa y sube la lista de un proveedor de PROVEEDORES_CONFIGS.
+
+    Con incremental=True, si hay una lista anterior subida, solo se exportan y suben
+    las altas y los artículos modificados respecto de ella; las bajas se guardan en un CSV.
+    Si se pasa un RegistroMetricas, se registra la duración de cada etapa y del total ('pipeline').
+    Si se pasa un ManifiestoEjecucion, se registra cada etapa completada y el proveedor
+    sigue desde su primera etapa incompleta (procesado, exportado o subido).
+    Con tamano_lote, el archivo se procesa en modo por lotes (memoria acotada, sin delta).
+    """
+    with metricas.etapa(proveedor, "pipeline"):
+        return _procesar_proveedor(proveedor, forzar, incremental, metricas, ejecucion, tamano_lote)
+
+
+def _actualizar_snapshot(proveedor, df=None, ruta_lista=None):
+    """
+    Deja la lista (en memoria o ya guardada en disco) como referencia del próximo delta.
+    Un fallo solo se advierte: la subida ya se hizo y su resultado se registra igual.
+    """
+    try:
+        if df is not None:
+            guardar_snapshot(proveedor, df)
+        elif ruta_lista is not None:
+            copiar_snapshot(proveedor, ruta_lista)
+    except Exception as e:
+        print(f"⚠️ {proveedor}: no se pudo guardar el snapshot para el próximo delta: {e}")
+
+
+def _cerrar_subida(proveedor, file_path, hash_origen, respuesta, ejecucion, df=None, ruta_lista=None):
+    # El snapshot se actualiza solo si la lista llegó a la API
+    if respuesta.get('subida_exitosa'):
+        _actualizar_snapshot(proveedor, df, ruta_lista)
+        if ejecucion is not None:
+            ejecucion.registrar_subida(proveedor, respuesta)
+    registrar_resultado(proveedor, file_path, hash_origen, respuesta, obtener_cliente_subida().api_url)
     return respuesta
 
-def procesar_datos_repcar():
+
+def _reanudar_subida(proveedor, file_path, hash_origen, forzar, metricas, ejecucion):
+    """
+    Vuelve a subir el archivo exportado en la ejecución que se reanuda, sin leer ni exportar de nuevo.
+    """
+    exportado = ejecucion.etapa(proveedor, 'exportado')
+    print(f"↪️ {proveedor}: se reanuda desde la subida de {exportado['archivo']}")
+    respuesta = subir_exportacion(exportado['archivo'], proveedor, forzar=forzar)
+    respuesta['delta'] = exportado.get('delta')
+    respuesta['archivo_bajas'] = exportado.get('archivo_bajas')
+    _registrar_exportacion(metricas, proveedor, respuesta)
+    procesado = ejecucion.etapa(proveedor, 'procesado') if ejecucion.completada(proveedor, 'procesado') else None
+    return _cerrar_subida(proveedor, file_path, hash_origen, respuesta, ejecucion,
+                          ruta_lista=procesado['archivo'] if procesado else None)
+
+
+def _procesar_proveedor(proveedor, forzar, incremental, metricas, ejecucion, tamano_lote=None):
+    config = PROVEEDORES_CONFIGS[proveedor]
     download_dir = "data_sin_procesar"
-    file_path = os.path.join(download_dir, "repcar.csv")
+    file_path = os.path.join(download_dir, config.archivo)
+
+    if ejecucion is not None and ejecucion.completada(proveedor, 'subido'):
+        print(f"⏭️ {proveedor}: ya se subió en la ejecución que se reanuda")
+        return ejecucion.resultado(proveedor)
 
     if not os.path.exists(file_path):
         print(f"El archivo {file_path} no existe.")
         return
 
-    # Leer el archivo CSV con punto y coma como separador
+    with metricas.etapa(proveedor, "hash_origen"):
+        hash_origen, previo = _resultado_previo(proveedor, file_path, forzar)
+    if previo:
+        if ejecucion is not None:
+            ejecucion.registrar_subida(proveedor, previo)
+        return previo
+
+    if ejecucion is not None and ejecucion.completada(proveedor, 'exportado'):
+        return _reanudar_subida(proveedor, file_path, hash_origen, forzar, metricas, ejecucion)
+
+    if tamano_lote:
+        return _procesar_por_lotes(proveedor, file_path, hash_origen, forzar, incremental, tamano_lote,
+                                   metricas, ejecucion)
+
+    memoria = ReporteMemoria(config.nombre)
+    memoria.registrar("inicio")
+    df = ejecucion.cargar_procesado(proveedor) if ejecucion is not None else None
+    if df is not None:
+        print(f"↪️ {proveedor}: se reanuda con la lista procesada de la ejecución anterior ({len(df):,} filas)")
+    else:
+        transformar = _TransformacionMedida(PLANES[proveedor])
+        try:
+            with metricas.etapa(proveedor, "lectura_transformacion") as datos_lectura:
+                df = transformar_proveedor(proveedor, file_path, transformar)
+                datos_lectura['filas'] = len(df) if df is not None else 0
+        except Exception as e:
+            print(f"Error al leer el archivo {file_path}: {e}")
+            return
+        # La lectura y la transformación se intercalan por bloques u hojas: se registran también por separado
+        if 'segundos' in datos_lectura:
+            metricas.registrar(proveedor, "lectura", max(datos_lectura['segundos'] - transformar.segundos, 0.0))
+        metricas.registrar(proveedor, "transformacion", transformar.segundos)
+        if df is None:
+            return None
+        if ejecucion is not None and ejecucion.guardar_procesados:
+            # Sin la lista procesada solo se pierde la reanudación desde esta etapa
+            try:
+                ejecucion.guardar_procesado(proveedor, df)
+            except Exception as e:
+                print(f"⚠️ {proveedor}: no se pudo guardar la lista procesada para reanudar: {e}")
+    memoria.registrar("transformacion", df)
+
+    print(f"Datos de {config.nombre}:")
+
+    # Validación previa: una lista que la API rechazaría no se exporta ni se sube
+    inicio = time.perf_counter()
+    reporte = validar_lista(df, proveedor)
+    _registrar_validacion(metricas, proveedor, reporte, time.perf_counter() - inicio)
+    reporte.imprimir()
+    if not reporte.valido:
+        return _resultado_validacion_fallida(proveedor, reporte)
+
+    # El delta (carga del snapshot y merge completo) solo se calcula en modo incremental
+    delta = None
+    if incremental:
+        with metricas.etapa(proveedor, "delta"):
+            delta = _delta_contra_snapshot(proveedor, df)
+    if delta is not None:
+        filas = filas_a_subir(delta)
+        if filas.empty:
+            # Sin altas ni modificaciones no se sube nada; las bajas solo se guardan localmente
+            respuesta = _resultado_delta_vacio(proveedor)
+            respuesta['delta'] = resumen_delta(delta)
+            respuesta['archivo_bajas'] = _guardar_bajas(proveedor, delta['bajas'])
+            if not delta['bajas'].empty:
+                _actualizar_snapshot(proveedor, df)
+            if ejecucion is not None:
+                ejecucion.registrar_subida(proveedor, respuesta)
+            return respuesta
+        # Exportar solo altas y modificaciones
+        respuesta = export_data(filas, proveedor, forzar=forzar, sufijo="_delta")
+        respuesta['archivo_bajas'] = _guardar_bajas(proveedor, delta['bajas'])
+    else:
+        # Exportar datos a Excel
+        respuesta = export_data(df, proveedor, forzar=forzar)
+    _registrar_exportacion(metricas, proveedor, respuesta)
+    memoria.registrar("exportacion", df)
+    memoria.imprimir()
+    respuesta['memoria'] = memoria.etapas
+    respuesta['delta'] = resumen_delta(delta) if delta is not None else None
+    respuesta['validacion'] = reporte.como_dict()
+
+    if ejecucion is not None and respuesta.get('archivo_local'):
+        ejecucion.registrar(proveedor, 'exportado', archivo=respuesta['archivo_local'],
+                            delta=respuesta['delta'], archivo_bajas=respuesta.get('archivo_bajas'))
+    return _cerrar_subida(proveedor, file_path, hash_origen, respuesta, ejecucion, df=df)
+
+
+def _procesar_por_lotes(proveedor, file_path, hash_origen, forzar, incremental, tamano_lote, metricas, ejecucion):
+    """
+    Modo por lotes: lectura, transformación y escritura encadenadas con generadores,
+    con memoria acotada por tamano_lote en lugar del tamaño del archivo. La lista
+    procesada se escribe además en parquet (si hay pyarrow) para el snapshot y para
+    reanudar; el delta no se calcula porque requiere la lista completa en memoria.
+    """
+    config = PROVEEDORES_CONFIGS[proveedor]
+    if incremental:
+        print(f"⚠️ {proveedor}: el modo por lotes no calcula el delta, se sube la lista completa")
+
+    memoria = ReporteMemoria(config.nombre)
+    memoria.registrar("inicio")
+    transformar = _TransformacionMedida(PLANES[proveedor])
+
+    # Copia de la lista procesada: en el directorio de la ejecución o junto a los snapshots
+    ruta_base = (ejecucion.ruta_base_procesado(proveedor) if ejecucion is not None
+                 else os.path.join(DIRECTORIO_SNAPSHOTS, f"{proveedor}_pendiente"))
+    try:
+        os.makedirs(os.path.dirname(ruta_base), exist_ok=True)
+        lista = abrir_escritor(ruta_base, 'parquet', columnas_requeridas)
+    except Exception as e:
+        print(f"⚠️ {proveedor}: no se guardará la lista procesada para el snapshot: {e}")
+        lista = None
+
+    validador = ValidadorLista(proveedor)
+    exportacion = None
+    reporte = None
     try:
-        # Intentamos con codificación utf-8 primero
-        df = pd.read_csv(file_path, sep=';', encoding='utf-8')
+        with metricas.etapa(proveedor, "lotes", tamano_lote=tamano_lote) as datos_lotes:
+            lotes = transformar_por_lotes(proveedor, file_path, tamano_lote, transformar)
+            primero = next(lotes, None)
+            if primero is None:
+                print(f"No se encontraron datos válidos en {file_path}.")
+            else:
+                lotes = _validar_lotes(itertools.chain([primero], lotes), validador)
+                exportacion, archivos_extra = exportar_lotes(_copiar_lotes(lotes, lista, proveedor), proveedor)
+            datos_lotes['filas'] = exportacion['filas'] if exportacion else 0
+    except ErrorValidacion as e:
+        reporte = e.reporte
     except Exception as e:
-        print(f"Error al leer con utf-8, intentando con latin-1: {e}")
+        print(f"Error al procesar el archivo {file_path} por lotes: {e}")
+
+    archivo_lista = None
+    if lista is not None and not lista.descartado:
         try:
-            # Si falla, intentamos con codificación latin-1
-            df = pd.read_csv(file_path, sep=';', encoding='latin-1')
+            archivo_lista = lista.cerrar()['ruta']
         except Exception as e:
-            print(f"Error al leer el archivo CSV: {e}")
-            return
-    viejas_columnas = ['Cod. Fabrica', 'Marca', 'Cod. Articulo', 'Descripcion', 'Rubro',
-       'Importe', 'Iva 105', 'Imagen']
-    nuevas_columnas = {'Cod. Articulo':'CODIGO', 'Importe':'PRECIO', 'Descripcion':'DESCRIPCION','Marca':'MARCA'}
-    
-    df = renombrar_columnas(df, viejas_columnas, nuevas_columnas)
-    df = df.dropna(subset=['CODIGO'])
-    df['DESCRIPCION'] = df['DESCRIPCION'].fillna('')
-    df['Rubro'] = df['Rubro'].fillna('')
-    df['DESCRIPCION'] = df['DESCRIPCION'] + ' ' + df['Rubro']
-    df['DESCRIPCION'] = df['DESCRIPCION'].str[:100]
-    
-    # Formatear precios
-    df = formatear_precio(df)
-    
-    df = filtrar_columnas(df)
-    # Aquí puedes agregar la lógica para procesar los datos según tus necesidades
-    
-    print("Datos de RepCar:")
-    
-    # Exportar datos a Excel
-    respuesta = export_data(df, "repcar")
+            print(f"⚠️ {proveedor}: no se pudo guardar la lista procesada: {e}")
+    if exportacion is not None and reporte is None:
+        reporte = validador.finalizar()
+    if reporte is not None:
+        _registrar_validacion(metricas, proveedor, reporte)
+        reporte.imprimir()
+    if exportacion is None or not reporte.valido:
+        if archivo_lista:
+            os.remove(archivo_lista)
+        if reporte is not None and not reporte.valido:
+            return _resultado_validacion_fallida(proveedor, reporte, exportacion['ruta'] if exportacion else None)
+        return None
+    metricas.registrar(proveedor, "transformacion", transformar.segundos)
+    memoria.registrar("lotes")
+
+    if ejecucion is not None:
+        if archivo_lista:
+            ejecucion.registrar(proveedor, 'procesado', archivo=archivo_lista, filas=exportacion['filas'])
+        ejecucion.registrar(proveedor, 'exportado', archivo=exportacion['ruta'], delta=None, archivo_bajas=None)
+
+    respuesta = subir_exportacion(exportacion['ruta'], proveedor, forzar=forzar, exportacion=exportacion,
+                                  archivos_extra=archivos_extra)
+    _registrar_exportacion(metricas, proveedor, respuesta)
+    memoria.registrar("subida")
+    memoria.imprimir()
+    respuesta['memoria'] = memoria.etapas
+    respuesta['delta'] = None
+    respuesta['filas'] = exportacion['filas']
+    respuesta['validacion'] = reporte.como_dict()
+
+    _cerrar_subida(proveedor, file_path, hash_origen, respuesta, ejecucion, ruta_lista=archivo_lista)
+    if ejecucion is None and archivo_lista:
+        os.remove(archivo_lista)
     return respuesta
+
+
+def procesar_datos_autofix(forzar=False, incremental=False):
+    return procesar_proveedor("autofix", forzar, incremental)
+
+def procesar_datos_express(forzar=False, incremental=False):
+    return procesar_proveedor("express", forzar, incremental)
+
+def procesar_datos_repcar(forzar=False, incremental=False):
+    return procesar_proveedor("repcar", forzar, incremental)
@@ -0,0 +1,36 @@
+import argparse
+import json
+from controller.daemon_descargas_controller import (
+    iniciar_daemon, enviar_trabajo, consultar_estado, detener_daemon
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Daemon de descargas con navegador caliente y perfil persistente")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    iniciar = subparsers.add_parser("iniciar", help="Iniciar el daemon en primer plano")
+    iniciar.add_argument("--http", action="store_true",
+                         help="Descargar los archivos por HTTP usando la sesión del navegador")
+
+    descargar = subparsers.add_parser("descargar", help="Enviar un trabajo de descarga al daemon")
+    descargar.add_argument("servicios", nargs="*", help="Servicios a descargar (por defecto, todos)")
+    descargar.add_argument("--limpiar", action="store_true", help="Limpiar el directorio de descargas antes")
+
+    subparsers.add_parser("estado", help="Consultar el estado del daemon")
+    subparsers.add_parser("detener", help="Detener el daemon")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.comando == "iniciar":
+        iniciar_daemon(modo_http=args.http)
+    elif args.comando == "descargar":
+        resultados = enviar_trabajo(args.servicios or None, clean_download_dir=args.limpiar)
+        print(json.dumps(resultados, indent=2, ensure_ascii=False))
+    elif args.comando == "estado":
+        print(json.dumps(consultar_estado(), indent=2, ensure_ascii=False))
+    elif args.comando == "detener":
+        detener_daemon()
+        print("Daemon detenido")
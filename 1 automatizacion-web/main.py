@@ -1,41 +1,145 @@
 import os
+import argparse
 import pandas as pd
 import math
 # import zipfile  # Ya no se utiliza
 from datetime import datetime
-from controller.obtener_datos_controller import download_all_files_single_session
-from controller.procesar_datos_controller import procesar_datos_autofix, procesar_datos_express, procesar_datos_repcar
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from config.config import PIPELINE_CONCURRENCIA, TAMANO_LOTE
+from controller.obtener_datos_controller import download_all_files_single_session, RegistroTiempos
+from controller.daemon_descargas_controller import daemon_disponible, enviar_trabajo
+from controller.procesar_datos_controller import PROVEEDORES_CONFIGS, procesar_proveedor
+from utils.metricas import RegistroMetricas, SIN_METRICAS
+from utils.ejecucion import ManifiestoEjecucion
 
 
-def main():
+# Pipelines de procesamiento y subida (uno por proveedor configurado), en el orden del resumen final
+PIPELINES = [
+    (config.nombre, partial(procesar_proveedor, proveedor))
+    for proveedor, config in PROVEEDORES_CONFIGS.items()
+]
+
+
+def ejecutar_pipeline(proveedor, procesar, forzar=False, incremental=False, metricas=SIN_METRICAS, ejecucion=None,
+                      tamano_lote=None):
+    """
+    Ejecuta el procesamiento y la subida de un proveedor sin propagar errores,
+    para que un proveedor no interrumpa a los demás.
+    """
+    print(f"🔄 Procesando datos de {proveedor}...")
+    try:
+        return procesar(forzar=forzar, incremental=incremental, metricas=metricas, ejecucion=ejecucion,
+                        tamano_lote=tamano_lote)
+    except Exception as e:
+        print(f"❌ Error procesando {proveedor}: {str(e)}")
+        return None
+
+
+def ejecutar_pipelines(forzar=False, max_concurrencia=PIPELINE_CONCURRENCIA, incremental=False,
+                       metricas=SIN_METRICAS, ejecucion=None, tamano_lote=None):
+    """
+    Ejecuta los pipelines de los proveedores en paralelo con un límite de concurrencia.
+
+    Returns:
+        Lista de tuplas (proveedor, resultado) en el orden de PIPELINES
+    """
+    max_concurrencia = max(1, min(max_concurrencia, len(PIPELINES)))
+    with ThreadPoolExecutor(max_workers=max_concurrencia) as executor:
+        futures = [(proveedor, executor.submit(ejecutar_pipeline, proveedor, procesar, forzar, incremental,
+                                                 metricas, ejecucion, tamano_lote))
+                   for proveedor, procesar in PIPELINES]
+        return [(proveedor, future.result()) for proveedor, future in futures]
+
+
+def iniciar_ejecucion(reanudar=False):
+    """
+    Devuelve el manifiesto de la ejecución: la última incompleta si se reanuda y existe, o uno nuevo.
+
+    Returns:
+        (ManifiestoEjecucion, True si se reanuda una ejecución anterior)
+    """
+    if reanudar:
+        ejecucion = ManifiestoEjecucion.ultima_incompleta()
+        if ejecucion:
+            print(f"↪️ Reanudando la ejecución {ejecucion.id_ejecucion} ({ejecucion.ruta})")
+            return ejecucion, True
+        print("ℹ️ No hay una ejecución incompleta para reanudar, se inicia una nueva")
+    return ManifiestoEjecucion(), False
+
+
+def servicios_pendientes(ejecucion):
+    """Servicios a descargar: los de proveedores sin subir cuyo archivo descargado falta o cambió"""
+    return [config.servicio for proveedor, config in PROVEEDORES_CONFIGS.items()
+            if not ejecucion.completada(proveedor, 'subido') and not ejecucion.completada(proveedor, 'descargado')]
+
+
+def registrar_descargas(ejecucion, resultados, servicios):
+    """Registra en el manifiesto los archivos descargados de cada proveedor"""
+    for proveedor, config in PROVEEDORES_CONFIGS.items():
+        file_path = os.path.join("data_sin_procesar", config.archivo)
+        if config.servicio in servicios and (resultados or {}).get(config.servicio) and os.path.exists(file_path):
+            ejecucion.registrar_descarga(proveedor, file_path)
+
+
+def enlaces_api(resultado):
+    """Links devueltos por la API para un proveedor (uno por fragmento si la subida fue fragmentada)"""
+    link = resultado.get('link_api')
+    if not link:
+        return []
+    return list(link) if isinstance(link, list) else [link]
+
+
+def main(paralelo=False, modo_http=False, usar_daemon=False, forzar=False, max_concurrencia=PIPELINE_CONCURRENCIA,
+         incremental=False, metricas=SIN_METRICAS, reanudar=False, tamano_lote=None):
     """
     Función principal que ejecuta la automatización para descargar archivos, 
     procesarlos y enviarlos a la API.
+
+    Args:
+        paralelo: Descarga los proveedores en paralelo (un navegador por proveedor)
+        modo_http: Descarga los archivos por HTTP con la sesión del navegador
+        usar_daemon: Envía la descarga al daemon de descargas si está activo
+        forzar: Procesa y sube aunque el archivo del proveedor no haya cambiado o el contenido ya se haya subido
+        max_concurrencia: Cantidad de proveedores que se procesan y suben a la vez
+        incremental: Sube solo las altas y modificaciones respecto de la última lista subida
+        metricas: RegistroMetricas donde se registra la duración de cada etapa (modo --profile)
+        reanudar: Retoma la última ejecución incompleta desde la primera etapa pendiente de cada proveedor
+        tamano_lote: Procesa en modo por lotes de esta cantidad de filas (memoria acotada, sin delta)
     """
+    ejecucion, reanudando = iniciar_ejecucion(reanudar)
+    servicios = servicios_pendientes(ejecucion)
+    # Al reanudar se conservan los archivos ya descargados
+    limpiar = not reanudando
     
     ## Ejecutar descarga de archivos
-    download_all_files_single_session(clean_download_dir=True)
+    if not servicios:
+        print("⏭️ Todos los archivos de la ejecución ya están descargados")
+    elif usar_daemon and daemon_disponible():
+        print("🔌 Enviando descarga al daemon de descargas...")
+        with metricas.etapa(None, "descarga", daemon=True):
+            descargas = enviar_trabajo(services_to_download=servicios, clean_download_dir=limpiar)
+        registrar_descargas(ejecucion, descargas, servicios)
+    else:
+        if usar_daemon:
+            print("⚠️ El daemon de descargas no está activo, se descargará con un navegador nuevo")
+        registro_tiempos = RegistroTiempos()
+        with metricas.etapa(None, "descarga", daemon=False):
+            descargas = download_all_files_single_session(services_to_download=servicios, clean_download_dir=limpiar,
+                                                          parallel=paralelo, modo_http=modo_http,
+                                                          registro_tiempos=registro_tiempos)
+        metricas.registrar_tiempos_descarga(registro_tiempos)
+        registrar_descargas(ejecucion, descargas, servicios)
     
     ### Procesar Datos y exportar a Excel
     print("\n" + "="*60)
     print("INICIANDO PROCESAMIENTO DE DATOS")
     print("="*60 + "\n")
     
-    # Lista para almacenar resultados
-    resultados = []
-    
-    # Procesar y exportar los datos de cada proveedor
-    print("🔄 Procesando datos de AutoFix...")
-    respuesta_autofix = procesar_datos_autofix()
-    resultados.append(('AutoFix', respuesta_autofix))
-   
-    print("\n🔄 Procesando datos de Express...")
-    respuesta_express = procesar_datos_express()
-    resultados.append(('Express', respuesta_express))
-
-    print("\n🔄 Procesando datos de RepCar...")
-    respuesta_repcar = procesar_datos_repcar()
-    resultados.append(('RepCar', respuesta_repcar))
+    # Procesar, exportar y subir los datos de cada proveedor en paralelo
+    resultados = ejecutar_pipelines(forzar=forzar, max_concurrencia=max_concurrencia, incremental=incremental,
+                                    metricas=metricas, ejecucion=ejecucion, tamano_lote=tamano_lote)
+    completa = ejecucion.cerrar(PROVEEDORES_CONFIGS)
     
     # Mostrar resumen final detallado
     print("\n" + "="*60)
@@ -49,11 +153,24 @@ def main():
     
     for proveedor, resultado in resultados:
         if resultado:
-            if resultado.get('subida_exitosa', False):
-                print(f"✅ {proveedor}: Procesado y subido exitosamente")
-                if resultado.get('link_api'):
-                    print(f"   🔗 Link: {resultado['link_api']}")
-                    links_api.append((proveedor, resultado['link_api']))
+            if resultado.get('sin_cambios', False):
+                print(f"⏭️ {proveedor}: Sin cambios desde la última subida")
+                for link in enlaces_api(resultado):
+                    print(f"   🔗 Link: {link}")
+                    links_api.append((proveedor, link))
+                archivos_exitosos += 1
+            elif resultado.get('subida_exitosa', False):
+                if resultado.get('desde_registro', False):
+                    print(f"♻️ {proveedor}: Procesado, mismo contenido ya subido (link reutilizado)")
+                else:
+                    print(f"✅ {proveedor}: Procesado y subido exitosamente")
+                for link in enlaces_api(resultado):
+                    print(f"   🔗 Link: {link}")
+                    links_api.append((proveedor, link))
+                if resultado.get('delta'):
+                    delta = resultado['delta']
+                    print(f"   🔀 Delta: {delta['altas']:,} altas, {delta['bajas']:,} bajas, "
+                          f"{delta['cambios_precio']:,} cambios de precio, {delta['otros_cambios']:,} otros cambios")
                 archivos_exitosos += 1
             else:
                 print(f"⚠️ {proveedor}: Procesado pero falló la subida")
@@ -84,9 +201,47 @@ def main():
         for proveedor, error in errores:
             print(f"   {proveedor}: {error}")
     
+    if metricas.habilitado:
+        print(f"\n📈 Métricas por etapa: {metricas.ruta}")
+
+    if not completa:
+        print(f"\n↪️ Ejecución incompleta ({ejecucion.ruta}): con --reanudar se retoma desde la primera etapa pendiente")
+
     print("\n" + "="*60)
     print("PROCESO COMPLETADO")
     print("="*60)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Descarga, procesa y sube las listas de precios de los proveedores")
+    parser.add_argument("--paralelo", action="store_true",
+                        help="Descargar los proveedores en paralelo, con un navegador por proveedor")
+    parser.add_argument("--http", action="store_true",
+                        help="Descargar los archivos por HTTP usando la sesión del navegador, con la URL del botón o la "
+                             "aprendida en ejecuciones anteriores (fallback al clic)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Usar el daemon de descargas (python daemon_descargas.py iniciar) si está activo")
+    parser.add_argument("--forzar", action="store_true",
+                        help="Procesar y subir aunque la lista del proveedor no haya cambiado o su contenido ya se haya subido")
+    parser.add_argument("--concurrencia", type=int, default=PIPELINE_CONCURRENCIA,
+                        help="Proveedores que se procesan y suben a la vez (1 = secuencial)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Subir solo las altas y modificaciones respecto de la última lista subida")
+    parser.add_argument("--profile", action="store_true",
+                        help="Registrar la duración de cada etapa por proveedor en metricas/metricas_<fecha>.jsonl")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="Con --profile, guardar un perfil de cProfile por etapa en metricas/perfiles/")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Con --profile, adjuntar a cada etapa las mayores asignaciones de memoria (tracemalloc)")
+    parser.add_argument("--reanudar", action="store_true",
+                        help="Retomar la última ejecución incompleta sin volver a descargar ni procesar lo ya completado")
+    parser.add_argument("--por-lotes", type=int, nargs="?", const=TAMANO_LOTE, default=None, metavar="FILAS",
+                        help=f"Leer, transformar y exportar por lotes de FILAS filas con memoria acotada "
+                             f"(por defecto {TAMANO_LOTE}; no calcula el delta)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    main(paralelo=args.paralelo, modo_http=args.http, usar_daemon=args.daemon, forzar=args.forzar,
+         max_concurrencia=args.concurrencia, incremental=args.incremental, reanudar=args.reanudar,
+         tamano_lote=args.por_lotes,
+         metricas=RegistroMetricas(habilitado=args.profile, cprofile=args.cprofile, memoria=args.tracemalloc))
\ No newline at end of file
@@ -0,0 +1,121 @@
+import os
+import shutil
+import importlib.util
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from utils.utils import columnas_requeridas
+from utils.memoria import texto_fijo
+
+
+DIRECTORIO_SNAPSHOTS = os.path.join("datos_procesados", "snapshots")
+
+# Clave de un artículo en la lista de un proveedor
+CLAVES_DELTA = ['CODIGO', 'MARCA']
+
+# Diferencia mínima para considerar que un precio cambió (medio centavo)
+TOLERANCIA_PRECIO = 0.005
+
+
+def _ruta_snapshot(proveedor: str, directorio: str) -> str:
+    extension = '.parquet' if importlib.util.find_spec('pyarrow') is not None else '.pkl'
+    return os.path.join(directorio, f"{proveedor}{extension}")
+
+
+def cargar_snapshot(proveedor: str, directorio: str = DIRECTORIO_SNAPSHOTS) -> Optional[pd.DataFrame]:
+    """
+    Carga la última lista procesada y subida del proveedor, o None si no hay.
+    """
+    ruta = _ruta_snapshot(proveedor, directorio)
+    if not os.path.exists(ruta):
+        return None
+    try:
+        return pd.read_parquet(ruta) if ruta.endswith('.parquet') else pd.read_pickle(ruta)
+    except Exception as e:
+        print(f"⚠️ No se pudo leer el snapshot {ruta}: {e}")
+        return None
+
+
+def guardar_snapshot(proveedor: str, df: pd.DataFrame, directorio: str = DIRECTORIO_SNAPSHOTS) -> str:
+    """
+    Guarda la lista procesada del proveedor de forma atómica (archivo temporal + reemplazo)
+    y devuelve la ruta del archivo. Las columnas de texto se escriben con tipo fijo.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    ruta = _ruta_snapshot(proveedor, directorio)
+    ruta_tmp = ruta + ".tmp"
+    if ruta.endswith('.parquet'):
+        texto_fijo(df).to_parquet(ruta_tmp, index=False)
+    else:
+        df.to_pickle(ruta_tmp)
+    os.replace(ruta_tmp, ruta)
+    return ruta
+
+
+def copiar_snapshot(proveedor: str, ruta_origen: str, directorio: str = DIRECTORIO_SNAPSHOTS) -> str:
+    """
+    Reemplaza el snapshot por una lista ya guardada en disco (con el mismo formato)
+    sin cargarla en memoria.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    ruta = _ruta_snapshot(proveedor, directorio)
+    ruta_tmp = ruta + ".tmp"
+    shutil.copyfile(ruta_origen, ruta_tmp)
+    os.replace(ruta_tmp, ruta)
+    return ruta
+
+
+def _por_clave(df: pd.DataFrame) -> pd.DataFrame:
+    # Claves como texto: las categorías de MARCA pueden diferir entre ambas listas
+    df = df[columnas_requeridas].astype({clave: str for clave in CLAVES_DELTA})
+    return df.drop_duplicates(subset=CLAVES_DELTA, keep='last')
+
+
+def calcular_delta(anterior: pd.DataFrame, actual: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Compara dos listas procesadas por (CODIGO, MARCA) con un único merge vectorizado.
+
+    Returns:
+        Dict con:
+            altas: artículos nuevos
+            bajas: artículos que ya no están (con los datos de la lista anterior)
+            cambios_precio: artículos con otro precio (con PRECIO_ANTERIOR)
+            otros_cambios: artículos con el mismo precio y otra DESCRIPCION
+    """
+    combinado = _por_clave(actual).merge(_por_clave(anterior), on=CLAVES_DELTA, how='outer',
+                                         suffixes=('', '_ANTERIOR'), indicator=True)
+    origen = combinado['_merge']
+
+    altas = combinado.loc[origen == 'left_only', columnas_requeridas]
+    bajas = (combinado.loc[origen == 'right_only', CLAVES_DELTA + ['DESCRIPCION_ANTERIOR', 'PRECIO_ANTERIOR']]
+             .rename(columns={'DESCRIPCION_ANTERIOR': 'DESCRIPCION', 'PRECIO_ANTERIOR': 'PRECIO'})
+             [columnas_requeridas])
+
+    ambos = combinado.loc[origen == 'both']
+    cambio_precio = ~np.isclose(ambos['PRECIO'].to_numpy(dtype=float), ambos['PRECIO_ANTERIOR'].to_numpy(dtype=float),
+                                rtol=0, atol=TOLERANCIA_PRECIO)
+    cambio_descripcion = (ambos['DESCRIPCION'].fillna('').to_numpy(dtype=object)
+                          != ambos['DESCRIPCION_ANTERIOR'].fillna('').to_numpy(dtype=object))
+
+    return {
+        'altas': altas.reset_index(drop=True),
+        'bajas': bajas.reset_index(drop=True),
+        'cambios_precio': ambos.loc[cambio_precio, columnas_requeridas + ['PRECIO_ANTERIOR']].reset_index(drop=True),
+        'otros_cambios': ambos.loc[~cambio_precio & cambio_descripcion, columnas_requeridas].reset_index(drop=True)
+    }
+
+
+def resumen_delta(delta: Dict[str, pd.DataFrame]) -> Dict[str, int]:
+    return {nombre: len(df) for nombre, df in delta.items()}
+
+
+def delta_vacio(delta: Dict[str, pd.DataFrame]) -> bool:
+    return all(df.empty for df in delta.values())
+
+
+def filas_a_subir(delta: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Filas del delta que se suben a la API: altas y artículos modificados, con las columnas requeridas.
+    """
+    partes = [delta['altas'], delta['cambios_precio'][columnas_requeridas], delta['otros_cambios']]
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,149 @@
+import os
+import glob
+import shutil
+import threading
+import datetime
+from typing import Any, Dict, Iterable, Optional
+import pandas as pd
+from utils.manifiesto import cargar_manifiesto, guardar_manifiesto
+from utils.delta import cargar_snapshot, guardar_snapshot
+from config.config import EJECUCION_GUARDAR_PROCESADO, EJECUCIONES_CONSERVADAS
+
+
+DIRECTORIO_EJECUCIONES = os.path.join("datos_procesados", "ejecuciones")
+
+# Etapas del pipeline de cada proveedor, en orden
+ETAPAS_EJECUCION = ('descargado', 'procesado', 'exportado', 'subido')
+
+
+def _ahora() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def podar_ejecuciones(directorio: str = DIRECTORIO_EJECUCIONES, conservar: int = EJECUCIONES_CONSERVADAS,
+                     excepto: Optional[str] = None):
+    """Borra los manifiestos (y listas procesadas) de las ejecuciones más viejas que las últimas 'conservar'"""
+    rutas = sorted(glob.glob(os.path.join(directorio, "ejecucion_*.json")), reverse=True)
+    for ruta in rutas[max(conservar, 1):]:
+        id_ejecucion = os.path.basename(ruta)[len("ejecucion_"):-len(".json")]
+        if id_ejecucion == excepto:
+            continue
+        try:
+            os.remove(ruta)
+        except OSError:
+            continue
+        shutil.rmtree(os.path.join(directorio, f"procesados_{id_ejecucion}"), ignore_errors=True)
+
+
+def firma_archivo(ruta: str) -> Dict[str, Any]:
+    """Tamaño y fecha de modificación: alcanza para detectar que un artefacto fue reemplazado"""
+    estado = os.stat(ruta)
+    return {"archivo": ruta, "bytes": estado.st_size, "modificado": estado.st_mtime}
+
+
+class ManifiestoEjecucion:
+    """
+    Manifiesto de una ejecución de main.py: etapas completadas por proveedor
+    (descargado, procesado, exportado, subido) y sus artefactos, en
+    datos_procesados/ejecuciones/ejecucion_<id>.json.
+
+    Al reanudar (--reanudar) cada proveedor sigue desde su primera etapa incompleta.
+    Una etapa cuenta como completa solo si su artefacto sigue en disco sin cambios;
+    registrar una etapa descarta las posteriores. La lista procesada solo se guarda
+    con guardar_procesados (EJECUCION_GUARDAR_PROCESADO); sin ella, al reanudar antes
+    de la exportación se vuelve a procesar el archivo descargado.
+    """
+
+    def __init__(self, id_ejecucion: Optional[str] = None, directorio: str = DIRECTORIO_EJECUCIONES,
+                 datos: Optional[Dict[str, Any]] = None, guardar_procesados: bool = EJECUCION_GUARDAR_PROCESADO):
+        self.id_ejecucion = id_ejecucion or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.directorio = directorio
+        self.ruta = os.path.join(directorio, f"ejecucion_{self.id_ejecucion}.json")
+        # DataFrames procesados de la ejecución (para reanudar sin volver a leer el archivo original)
+        self.directorio_procesados = os.path.join(directorio, f"procesados_{self.id_ejecucion}")
+        self.datos = datos or {"id": self.id_ejecucion, "inicio": _ahora(), "estado": "en_curso", "proveedores": {}}
+        self.guardar_procesados = guardar_procesados
+        self._lock = threading.Lock()
+
+    @classmethod
+    def ultima_incompleta(cls, directorio: str = DIRECTORIO_EJECUCIONES) -> Optional["ManifiestoEjecucion"]:
+        """Devuelve la ejecución más reciente que no terminó, o None"""
+        rutas = sorted(glob.glob(os.path.join(directorio, "ejecucion_*.json")), reverse=True)
+        for ruta in rutas:
+            datos = cargar_manifiesto(ruta)
+            if datos.get("id"):
+                return cls(datos["id"], directorio, datos) if datos.get("estado") != "completa" else None
+        return None
+
+    def _guardar(self):
+        guardar_manifiesto(self.datos, self.ruta)
+
+    def etapa(self, proveedor: str, etapa: str) -> Optional[Dict[str, Any]]:
+        return self.datos["proveedores"].get(proveedor, {}).get(etapa)
+
+    def registrar(self, proveedor: str, etapa: str, **datos):
+        """Marca la etapa como completa y descarta las posteriores"""
+        with self._lock:
+            etapas = self.datos["proveedores"].setdefault(proveedor, {})
+            for posterior in ETAPAS_EJECUCION[ETAPAS_EJECUCION.index(etapa):]:
+                etapas.pop(posterior, None)
+            etapas[etapa] = {**datos, "fecha": _ahora()}
+            self._guardar()
+
+    def completada(self, proveedor: str, etapa: str) -> bool:
+        entrada = self.etapa(proveedor, etapa)
+        if not entrada:
+            return False
+        if etapa == 'descargado':
+            # El archivo original debe ser el mismo que se registró
+            try:
+                firma = firma_archivo(entrada["archivo"])
+            except OSError:
+                return False
+            return firma["bytes"] == entrada["bytes"] and firma["modificado"] == entrada["modificado"]
+        if etapa in ('procesado', 'exportado'):
+            return bool(entrada.get("archivo")) and os.path.exists(entrada["archivo"])
+        return True
+
+    def registrar_descarga(self, proveedor: str, ruta: str):
+        self.registrar(proveedor, 'descargado', **firma_archivo(ruta))
+
+    def guardar_procesado(self, proveedor: str, df: pd.DataFrame):
+        archivo = guardar_snapshot(proveedor, df, self.directorio_procesados)
+        self.registrar(proveedor, 'procesado', archivo=archivo, filas=len(df))
+
+    def ruta_base_procesado(self, proveedor: str) -> str:
+        """Ruta (sin extensión) de la lista procesada, para escribirla por lotes"""
+        os.makedirs(self.directorio_procesados, exist_ok=True)
+        return os.path.join(self.directorio_procesados, proveedor)
+
+    def cargar_procesado(self, proveedor: str) -> Optional[pd.DataFrame]:
+        if not self.completada(proveedor, 'procesado'):
+            return None
+        return cargar_snapshot(proveedor, self.directorio_procesados)
+
+    def registrar_subida(self, proveedor: str, resultado: Dict[str, Any]):
+        """Guarda el resultado final del proveedor (el que se muestra en el resumen)"""
+        campos = ('archivo_local', 'subida_exitosa', 'link_api', 'error', 'proveedor', 'sin_cambios',
+                  'desde_registro', 'delta', 'archivo_bajas', 'fragmentos')
+        self.registrar(proveedor, 'subido', resultado={c: resultado[c] for c in campos if c in resultado})
+
+    def resultado(self, proveedor: str) -> Optional[Dict[str, Any]]:
+        entrada = self.etapa(proveedor, 'subido')
+        return dict(entrada["resultado"]) if entrada else None
+
+    def cerrar(self, proveedores: Iterable[str]) -> bool:
+        """
+        Marca la ejecución como completa si todos los proveedores llegaron a la subida
+        y en ese caso borra los DataFrames procesados intermedios. Conserva solo los
+        manifiestos de las últimas EJECUCIONES_CONSERVADAS ejecuciones.
+        """
+        completa = all(self.completada(proveedor, 'subido') for proveedor in proveedores)
+        with self._lock:
+            self.datos["estado"] = "completa" if completa else "incompleta"
+            self.datos["fin"] = _ahora()
+            self._guardar()
+        if completa:
+            shutil.rmtree(self.directorio_procesados, ignore_errors=True)
+        podar_ejecuciones(self.directorio, excepto=self.id_ejecucion)
+        return completa
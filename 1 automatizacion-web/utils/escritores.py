@@ -0,0 +1,286 @@
+import os
+import re
+import time
+import zipfile
+import datetime
+import importlib.util
+import pandas as pd
+from typing import Any, Dict, List
+from config.config import FORMATO_SUBIDA, FORMATOS_ARCHIVO, FILAS_POR_FRAGMENTO
+from utils.memoria import COLUMNAS_TEXTO, COLUMNAS_CATEGORICAS, normalizar_texto
+
+
+EXTENSIONES = {
+    'xlsx': '.xlsx',
+    'xlsx_streaming': '.xlsx',
+    'csv': '.csv',
+    'parquet': '.parquet'
+}
+
+# La API solo acepta Excel
+FORMATOS_SUBIDA = ('xlsx', 'xlsx_streaming')
+
+# Fecha fija en las propiedades del libro: el mismo contenido genera el mismo archivo
+FECHA_CREACION_FIJA = datetime.datetime(2000, 1, 1)
+
+
+def _fijar_fechas_xlsx(ruta: str):
+    """
+    openpyxl guarda la hora actual en las propiedades del libro (docProps/core.xml)
+    y en cada entrada del zip: se reemplazan por FECHA_CREACION_FIJA.
+    """
+    fecha = FECHA_CREACION_FIJA.strftime('%Y-%m-%dT%H:%M:%SZ')
+    ruta_tmp = ruta + '.tmp'
+    with zipfile.ZipFile(ruta) as origen, zipfile.ZipFile(ruta_tmp, 'w', zipfile.ZIP_DEFLATED) as destino:
+        for entrada in origen.infolist():
+            datos = origen.read(entrada.filename)
+            if entrada.filename == 'docProps/core.xml':
+                datos = re.sub(rb'(<dcterms:(?:created|modified)[^>]*>)[^<]*', rb'\g<1>' + fecha.encode(), datos)
+            destino.writestr(zipfile.ZipInfo(entrada.filename, FECHA_CREACION_FIJA.timetuple()[:6]), datos,
+                             compress_type=entrada.compress_type)
+    os.replace(ruta_tmp, ruta)
+
+
+def _escribir_xlsx(df: pd.DataFrame, ruta: str):
+    df.to_excel(ruta, index=False, engine='openpyxl')
+    _fijar_fechas_xlsx(ruta)
+
+
+def _limpiar_fila(fila) -> list:
+    return [None if valor is pd.NA or (isinstance(valor, float) and valor != valor) else valor for valor in fila]
+
+
+class EscritorPorLotes:
+    """
+    Escritor incremental: recibe el DataFrame de a lotes (mismas columnas) y deja el
+    archivo completo al cerrar, sin tener nunca la lista entera en memoria.
+    """
+    formato = None
+
+    def __init__(self, ruta: str, columnas):
+        self.ruta = ruta
+        self.columnas = [str(columna) for columna in columnas]
+        self.filas = 0
+        self.descartado = False
+        self._inicio = time.perf_counter()
+
+    def escribir(self, df: pd.DataFrame):
+        self._escribir(df)
+        self.filas += len(df)
+
+    def _escribir(self, df: pd.DataFrame):
+        raise NotImplementedError
+
+    def _cerrar(self):
+        pass
+
+    def descartar(self):
+        """Cierra y borra el archivo a medio escribir"""
+        self.descartado = True
+        try:
+            self._cerrar()
+        except Exception:
+            pass
+        if os.path.exists(self.ruta):
+            os.remove(self.ruta)
+
+    def cerrar(self) -> Dict[str, Any]:
+        """Cierra el archivo y devuelve lo mismo que escribir()"""
+        self._cerrar()
+        return {
+            'formato': self.formato,
+            'ruta': self.ruta,
+            'bytes': os.path.getsize(self.ruta),
+            'segundos': time.perf_counter() - self._inicio
+        }
+
+
+class _EscritorXlsxStreaming(EscritorPorLotes):
+    """
+    xlsx fila por fila con memoria constante (xlsxwriter en modo constant_memory).
+    Sin xlsxwriter se usa openpyxl en modo solo escritura.
+    """
+    formato = 'xlsx_streaming'
+
+    def __init__(self, ruta: str, columnas):
+        super().__init__(ruta, columnas)
+        if importlib.util.find_spec('xlsxwriter') is not None:
+            import xlsxwriter
+
+            self._workbook = xlsxwriter.Workbook(ruta, {'constant_memory': True})
+            self._workbook.set_properties({'created': FECHA_CREACION_FIJA})
+            self._worksheet = self._workbook.add_worksheet()
+            self._worksheet.write_row(0, 0, self.columnas)
+            self._xlsxwriter = True
+        else:
+            from openpyxl import Workbook
+
+            self._workbook = Workbook(write_only=True)
+            self._worksheet = self._workbook.create_sheet()
+            self._worksheet.append(self.columnas)
+            self._xlsxwriter = False
+
+    def _escribir(self, df: pd.DataFrame):
+        filas = df.itertuples(index=False, name=None)
+        if self._xlsxwriter:
+            for i, fila in enumerate(filas, self.filas + 1):
+                self._worksheet.write_row(i, 0, _limpiar_fila(fila))
+        else:
+            for fila in filas:
+                self._worksheet.append(_limpiar_fila(fila))
+
+    def _cerrar(self):
+        if self._xlsxwriter:
+            self._workbook.close()
+        else:
+            self._workbook.save(self.ruta)
+            _fijar_fechas_xlsx(self.ruta)
+
+
+class _EscritorCsv(EscritorPorLotes):
+    formato = 'csv'
+
+    def __init__(self, ruta: str, columnas):
+        super().__init__(ruta, columnas)
+        self._archivo = open(ruta, 'w', encoding='utf-8', newline='')
+
+    def _escribir(self, df: pd.DataFrame):
+        df.to_csv(self._archivo, index=False, header=self.filas == 0)
+
+    def _cerrar(self):
+        if self.filas == 0:
+            self._archivo.write(','.join(self.columnas) + '\n')
+        self._archivo.close()
+
+
+class _EscritorParquet(EscritorPorLotes):
+    """
+    Un row group por lote. Las categóricas se escriben como texto: sus categorías
+    (y el tipo del diccionario) cambian de un lote a otro y el esquema debe ser único.
+    Por lo mismo CODIGO, DESCRIPCION y MARCA se escriben siempre como texto, aunque
+    un lote traiga solo números o números y textos mezclados.
+    """
+    formato = 'parquet'
+
+    def __init__(self, ruta: str, columnas):
+        if importlib.util.find_spec('pyarrow') is None:
+            raise RuntimeError("El formato parquet requiere pyarrow (pip install pyarrow)")
+        super().__init__(ruta, columnas)
+        self._writer = None
+        self._esquema = None
+
+    def _escribir(self, df: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columnas = {c: df[c].astype(str) for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)}
+        for c in COLUMNAS_TEXTO + COLUMNAS_CATEGORICAS:
+            if c in df.columns:
+                serie = df[c]
+                columnas[c] = normalizar_texto(serie.astype(object) if isinstance(serie.dtype, pd.CategoricalDtype) else serie)
+        tabla = pa.Table.from_pandas(df.assign(**columnas), schema=self._esquema, preserve_index=False)
+        if self._writer is None:
+            self._esquema = tabla.schema
+            self._writer = pq.ParquetWriter(self.ruta, self._esquema)
+        self._writer.write_table(tabla)
+
+    def _cerrar(self):
+        if self._writer is None:
+            # Sin lotes: archivo vacío con las columnas
+            pd.DataFrame(columns=self.columnas).to_parquet(self.ruta, index=False)
+        else:
+            self._writer.close()
+
+
+ESCRITORES_POR_LOTES = {
+    'xlsx_streaming': _EscritorXlsxStreaming,
+    'csv': _EscritorCsv,
+    'parquet': _EscritorParquet
+}
+
+
+def abrir_escritor(ruta_base: str, formato: str, columnas) -> EscritorPorLotes:
+    """
+    Abre un escritor por lotes, agregando la extensión a ruta_base. 'xlsx' no se puede
+    escribir por partes con pandas: se usa 'xlsx_streaming', que genera el mismo contenido.
+    """
+    if formato == 'xlsx':
+        formato = 'xlsx_streaming'
+    if formato not in ESCRITORES_POR_LOTES:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+    return ESCRITORES_POR_LOTES[formato](ruta_base + EXTENSIONES[formato], columnas)
+
+
+def _escribir_xlsx_streaming(df: pd.DataFrame, ruta: str):
+    escritor = _EscritorXlsxStreaming(ruta, df.columns)
+    escritor.escribir(df)
+    escritor.cerrar()
+
+
+def _escribir_csv(df: pd.DataFrame, ruta: str):
+    df.to_csv(ruta, index=False, encoding='utf-8')
+
+
+def _escribir_parquet(df: pd.DataFrame, ruta: str):
+    if importlib.util.find_spec('pyarrow') is None:
+        raise RuntimeError("El formato parquet requiere pyarrow (pip install pyarrow)")
+    df.to_parquet(ruta, index=False)
+
+
+ESCRITORES = {
+    'xlsx': _escribir_xlsx,
+    'xlsx_streaming': _escribir_xlsx_streaming,
+    'csv': _escribir_csv,
+    'parquet': _escribir_parquet
+}
+
+
+def escribir(df: pd.DataFrame, ruta_base: str, formato: str) -> Dict[str, Any]:
+    """
+    Escribe el DataFrame en el formato indicado, agregando la extensión a ruta_base.
+
+    Returns:
+        Dict con formato, ruta, bytes escritos y segundos empleados
+    """
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+
+    ruta = ruta_base + EXTENSIONES[formato]
+    inicio = time.perf_counter()
+    ESCRITORES[formato](df, ruta)
+    segundos = time.perf_counter() - inicio
+
+    return {
+        'formato': formato,
+        'ruta': ruta,
+        'bytes': os.path.getsize(ruta),
+        'segundos': segundos
+    }
+
+
+def formato_subida(proveedor: str) -> str:
+    """
+    Formato del archivo que se sube a la API: FORMATO_SUBIDA_<PROVEEDOR> o FORMATO_SUBIDA.
+    """
+    formato = os.getenv(f"FORMATO_SUBIDA_{proveedor.upper()}", FORMATO_SUBIDA)
+    if formato not in FORMATOS_SUBIDA:
+        print(f"⚠️ Formato de subida '{formato}' inválido para la API, se usará xlsx")
+        return 'xlsx'
+    return formato
+
+
+def formatos_archivo(proveedor: str) -> List[str]:
+    """
+    Formatos adicionales para el archivo interno: FORMATOS_ARCHIVO_<PROVEEDOR> o FORMATOS_ARCHIVO
+    (lista separada por comas, por ejemplo 'csv,parquet').
+    """
+    valor = os.getenv(f"FORMATOS_ARCHIVO_{proveedor.upper()}", FORMATOS_ARCHIVO)
+    return [formato.strip() for formato in valor.split(",") if formato.strip()]
+
+
+def filas_fragmento_subida(proveedor: str) -> int:
+    """
+    Filas máximas por fragmento del archivo a subir: FILAS_POR_FRAGMENTO_<PROVEEDOR> o
+    FILAS_POR_FRAGMENTO (0 = sin fragmentar).
+    """
+    return max(0, int(os.getenv(f"FILAS_POR_FRAGMENTO_{proveedor.upper()}", FILAS_POR_FRAGMENTO)))
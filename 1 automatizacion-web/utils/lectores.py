@@ -0,0 +1,284 @@
+import codecs
+import importlib.util
+import pandas as pd
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from config.config import MOTOR_EXCEL
+from utils.memoria import concatenar_bloques
+
+
+ENCODINGS_CANDIDATOS = ('utf-8', 'latin-1')
+
+# Motores de lectura de Excel, del más rápido al más lento
+MOTORES_EXCEL = ('calamine', 'openpyxl_streaming', 'openpyxl')
+
+
+def detectar_encoding(ruta: str, tamano_muestra: int = 256 * 1024,
+                      candidatos: Sequence[str] = ENCODINGS_CANDIDATOS) -> str:
+    """
+    Detecta el encoding de un archivo de texto decodificando solo una muestra inicial.
+    Devuelve el primer candidato que decodifica la muestra sin errores.
+    """
+    with open(ruta, 'rb') as f:
+        muestra = f.read(tamano_muestra)
+
+    if muestra.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+
+    for encoding in candidatos:
+        try:
+            # Decodificador incremental: un carácter multibyte cortado al final de la muestra no es un error
+            codecs.getincrementaldecoder(encoding)().decode(muestra, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return candidatos[-1]
+
+
+def procesar_csv_por_bloques(ruta: str, transformar: Callable[[pd.DataFrame], pd.DataFrame],
+                             sep: str = ';', tamano_bloque: int = 100_000,
+                             encoding: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Lee un CSV por bloques de filas y aplica 'transformar' a cada bloque: el archivo
+    crudo nunca está entero en memoria, pero los bloques transformados se acumulan y
+    se concatenan, así que la memoria sigue creciendo con el tamaño de la lista
+    (para memoria acotada está el modo por lotes, leer_csv_por_lotes).
+
+    Todas las columnas se leen como texto; 'transformar' convierte los precios y
+    CODIGO queda como texto, igual que tras compactar_tipos.
+
+    El encoding se detecta una sola vez a partir de una muestra. Si más adelante
+    aparece un byte inválido para ese encoding, se reinicia la lectura con latin-1.
+
+    Returns:
+        DataFrame con todos los bloques transformados, o None si el archivo no tiene filas
+    """
+    encoding = encoding or detectar_encoding(ruta)
+    print(f"Encoding detectado para {ruta}: {encoding}")
+
+    try:
+        bloques = [transformar(bloque) for bloque in
+                   pd.read_csv(ruta, sep=sep, encoding=encoding, dtype=str, chunksize=tamano_bloque)]
+    except UnicodeDecodeError as e:
+        if encoding == 'latin-1':
+            raise
+        print(f"Error de decodificación con {encoding} fuera de la muestra, releyendo con latin-1: {e}")
+        return procesar_csv_por_bloques(ruta, transformar, sep, tamano_bloque, encoding='latin-1')
+
+    if not bloques:
+        return None
+    return concatenar_bloques(bloques)
+
+
+def _decodificar_latin1(error: UnicodeDecodeError):
+    return error.object[error.start:error.end].decode('latin-1'), error.end
+
+
+# Bytes inválidos para el encoding detectado: se decodifican como latin-1 sin reiniciar la lectura
+codecs.register_error('latin1_respaldo', _decodificar_latin1)
+
+
+def leer_csv_por_lotes(ruta: str, sep: str = ';', tamano_lote: int = 50_000,
+                       encoding: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Generador de lotes de filas de un CSV (todas las columnas como texto).
+
+    A diferencia de procesar_csv_por_bloques no se puede volver a empezar con latin-1
+    si aparece un byte inválido fuera de la muestra (los lotes anteriores ya se
+    escribieron): esos bytes se decodifican como latin-1 y la lectura sigue.
+    """
+    encoding = encoding or detectar_encoding(ruta)
+    print(f"Encoding detectado para {ruta}: {encoding}")
+    with pd.read_csv(ruta, sep=sep, encoding=encoding, encoding_errors='latin1_respaldo', dtype=str,
+                     chunksize=tamano_lote) as lector:
+        yield from lector
+
+
+def motor_disponible(motor: str) -> bool:
+    """
+    Indica si la dependencia del motor de lectura está instalada.
+    """
+    if motor == 'calamine':
+        return importlib.util.find_spec('python_calamine') is not None
+    return motor in MOTORES_EXCEL
+
+
+def resolver_motor_excel(motor: Optional[str] = None) -> str:
+    """
+    Resuelve el motor configurado ('auto' elige el más rápido disponible).
+    Si el motor pedido no está disponible se usa openpyxl.
+    """
+    motor = (motor or MOTOR_EXCEL or 'auto').lower()
+    if motor == 'auto':
+        return next(m for m in MOTORES_EXCEL if motor_disponible(m))
+    if motor not in MOTORES_EXCEL:
+        print(f"⚠️ Motor de Excel desconocido '{motor}', se usará openpyxl")
+        return 'openpyxl'
+    if not motor_disponible(motor):
+        print(f"⚠️ Motor de Excel '{motor}' no disponible, se usará openpyxl")
+        return 'openpyxl'
+    return motor
+
+
+def _nombres_columnas(encabezado) -> list:
+    """
+    Replica los nombres de columnas de pandas: 'Unnamed: i' para vacías y sufijos .1, .2 para duplicadas.
+    """
+    nombres = []
+    vistos: Dict[str, int] = {}
+    for i, valor in enumerate(encabezado):
+        nombre = f"Unnamed: {i}" if valor is None else str(valor)
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f"{nombre}.{vistos[nombre]}"
+        else:
+            vistos[nombre] = 0
+        nombres.append(nombre)
+    return nombres
+
+
+def _hoja_openpyxl_streaming(ws, skiprows: int = 0) -> pd.DataFrame:
+    """
+    Convierte una hoja de openpyxl en modo solo lectura a DataFrame, recorriendo las filas una vez.
+    """
+    filas = ws.iter_rows(values_only=True)
+    for _ in range(skiprows):
+        if next(filas, None) is None:
+            return pd.DataFrame()
+    encabezado = next(filas, None)
+    if encabezado is None:
+        return pd.DataFrame()
+
+    registros = list(filas)
+    # En modo solo lectura las dimensiones pueden incluir filas vacías al final
+    while registros and all(valor is None for valor in registros[-1]):
+        registros.pop()
+    return pd.DataFrame.from_records(registros, columns=_nombres_columnas(encabezado))
+
+
+def _leer_excel_openpyxl_streaming(ruta: str, sheet_name, skiprows: int):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        if sheet_name is None:
+            return {ws.title: _hoja_openpyxl_streaming(ws, skiprows) for ws in wb.worksheets}
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        return _hoja_openpyxl_streaming(ws, skiprows)
+    finally:
+        wb.close()
+
+
+def leer_excel(ruta: str, sheet_name: Union[int, str, None] = 0, skiprows: int = 0,
+               motor: Optional[str] = None) -> Union[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """
+    Lee un archivo Excel con el motor configurado (MOTOR_EXCEL) y vuelve a openpyxl si falla.
+
+    Args:
+        ruta: Ruta al archivo .xlsx
+        sheet_name: Hoja a leer (índice o nombre), o None para todas
+        skiprows: Filas a saltear antes del encabezado
+        motor: 'calamine', 'openpyxl_streaming', 'openpyxl' o 'auto'
+
+    Returns:
+        DataFrame, o dict nombre_hoja -> DataFrame si sheet_name es None
+    """
+    motor = resolver_motor_excel(motor)
+    try:
+        if motor == 'openpyxl_streaming':
+            return _leer_excel_openpyxl_streaming(ruta, sheet_name, skiprows)
+        return pd.read_excel(ruta, engine=motor, sheet_name=sheet_name, skiprows=skiprows)
+    except Exception as e:
+        if motor == 'openpyxl':
+            raise
+        print(f"⚠️ Error leyendo {ruta} con {motor}, se usará openpyxl: {e}")
+        return pd.read_excel(ruta, engine='openpyxl', sheet_name=sheet_name, skiprows=skiprows)
+
+
+def _lotes_hoja_openpyxl(ws, skiprows: int, tamano_lote: int) -> Iterator[pd.DataFrame]:
+    filas = ws.iter_rows(values_only=True)
+    for _ in range(skiprows):
+        if next(filas, None) is None:
+            return
+    encabezado = next(filas, None)
+    if encabezado is None:
+        return
+    columnas = _nombres_columnas(encabezado)
+
+    lote = []
+    for fila in filas:
+        # Filas vacías (en modo solo lectura las dimensiones pueden incluirlas)
+        if all(valor is None for valor in fila):
+            continue
+        lote.append(fila)
+        if len(lote) >= tamano_lote:
+            yield pd.DataFrame.from_records(lote, columns=columnas)
+            lote = []
+    if lote:
+        yield pd.DataFrame.from_records(lote, columns=columnas)
+
+
+def leer_excel_por_lotes(ruta: str, skiprows: int = 0, tamano_lote: int = 50_000,
+                         todas_las_hojas: bool = False) -> Iterator[Tuple[Optional[str], pd.DataFrame]]:
+    """
+    Generador de lotes de filas de un Excel con openpyxl en modo solo lectura, que
+    recorre el archivo sin cargar las hojas completas (calamine y pandas sí lo hacen).
+
+    Yields:
+        (nombre de la hoja o None si solo se lee la primera, lote)
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        hojas = wb.worksheets if todas_las_hojas else wb.worksheets[:1]
+        for ws in hojas:
+            for lote in _lotes_hoja_openpyxl(ws, skiprows, tamano_lote):
+                yield (ws.title if todas_las_hojas else None), lote
+    finally:
+        wb.close()
+
+
+class LibroExcel:
+    """
+    Libro de Excel abierto una sola vez, del que se leen las hojas bajo demanda.
+    Permite recorrer libros con cientos de hojas sin cargarlas todas en memoria.
+    """
+
+    def __init__(self, ruta: str, motor: Optional[str] = None):
+        self.ruta = ruta
+        self.motor = resolver_motor_excel(motor)
+        try:
+            self._abrir(self.motor)
+        except Exception as e:
+            if self.motor == 'openpyxl':
+                raise
+            print(f"⚠️ Error abriendo {ruta} con {self.motor}, se usará openpyxl: {e}")
+            self.motor = 'openpyxl'
+            self._abrir(self.motor)
+
+    def _abrir(self, motor: str):
+        if motor == 'openpyxl_streaming':
+            from openpyxl import load_workbook
+            self._libro = load_workbook(self.ruta, read_only=True, data_only=True)
+            self.hojas: List[str] = list(self._libro.sheetnames)
+        else:
+            self._libro = pd.ExcelFile(self.ruta, engine=motor)
+            self.hojas = list(self._libro.sheet_names)
+
+    def leer_hoja(self, nombre: str, skiprows: int = 0) -> pd.DataFrame:
+        if self.motor == 'openpyxl_streaming':
+            return _hoja_openpyxl_streaming(self._libro[nombre], skiprows)
+        return self._libro.parse(nombre, skiprows=skiprows)
+
+    def __iter__(self) -> Iterator[Tuple[str, pd.DataFrame]]:
+        for nombre in self.hojas:
+            yield nombre, self.leer_hoja(nombre)
+
+    def cerrar(self):
+        self._libro.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
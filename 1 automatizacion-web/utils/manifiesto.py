@@ -0,0 +1,98 @@
+import os
+import json
+import hashlib
+import threading
+import datetime
+from typing import Any, Dict, Optional
+
+
+RUTA_MANIFIESTO = os.path.join("datos_procesados", "manifiesto.json")
+
+_lock_manifiesto = threading.Lock()
+
+
+def calcular_hash(ruta: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calcula el SHA-256 de un archivo leyéndolo por bloques.
+    """
+    sha256 = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(bloque)
+    return sha256.hexdigest()
+
+
+def cargar_manifiesto(ruta: str = RUTA_MANIFIESTO) -> Dict[str, Any]:
+    """
+    Carga el manifiesto de hashes por proveedor. Devuelve un dict vacío si no existe o está dañado.
+    """
+    if not os.path.exists(ruta):
+        return {}
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ No se pudo leer el manifiesto {ruta}: {e}")
+        return {}
+
+
+def guardar_manifiesto(manifiesto: Dict[str, Any], ruta: str = RUTA_MANIFIESTO):
+    """
+    Guarda el manifiesto de forma atómica (archivo temporal + reemplazo).
+    """
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    ruta_tmp = ruta + ".tmp"
+    with open(ruta_tmp, "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+    os.replace(ruta_tmp, ruta)
+
+
+def resultado_sin_cambios(proveedor: str, hash_origen: str, api_url: str,
+                          ruta: str = RUTA_MANIFIESTO) -> Optional[Dict[str, Any]]:
+    """
+    Si el archivo original del proveedor no cambió desde la última subida exitosa a la
+    misma API, devuelve el resultado de esa subida (con su link_api) para evitar procesar,
+    exportar y subir de nuevo. En otro caso devuelve None.
+    """
+    entrada = cargar_manifiesto(ruta).get(proveedor)
+    if not entrada or entrada.get("hash_origen") != hash_origen or not entrada.get("link_api"):
+        return None
+    if entrada.get("api_url") != api_url:
+        return None
+
+    return {
+        'archivo_local': entrada.get("archivo_local"),
+        'subida_exitosa': True,
+        'link_api': entrada["link_api"],
+        'error': None,
+        'proveedor': proveedor,
+        'sin_cambios': True
+    }
+
+
+def registrar_resultado(proveedor: str, archivo_origen: str, hash_origen: str, resultado: Optional[Dict[str, Any]],
+                        api_url: str, ruta: str = RUTA_MANIFIESTO):
+    """
+    Registra en el manifiesto los hashes del archivo original y del procesado, y la API a la que se subió.
+    Solo se registran las subidas exitosas, para que los fallos se reintenten en la próxima ejecución.
+    """
+    if not resultado or not resultado.get('subida_exitosa') or resultado.get('sin_cambios'):
+        return
+
+    archivo_local = resultado.get('archivo_local')
+    entrada = {
+        "archivo_origen": archivo_origen,
+        "hash_origen": hash_origen,
+        "archivo_local": archivo_local,
+        "hash_procesado": calcular_hash(archivo_local) if archivo_local and os.path.isfile(archivo_local) else None,
+        "link_api": resultado.get('link_api'),
+        "api_url": api_url,
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds")
+    }
+
+    with _lock_manifiesto:
+        manifiesto = cargar_manifiesto(ruta)
+        manifiesto[proveedor] = entrada
+        guardar_manifiesto(manifiesto, ruta)
@@ -0,0 +1,172 @@
+import os
+import importlib.util
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Columnas de pocos valores distintos que se guardan como categóricas
+COLUMNAS_CATEGORICAS = ('MARCA',)
+
+# Columnas que siempre son texto: los códigos son identificadores, no números
+COLUMNAS_TEXTO = ('CODIGO', 'DESCRIPCION')
+
+
+def _tipo_texto():
+    """
+    Strings respaldados por Arrow (un buffer contiguo en lugar de un objeto Python por valor),
+    con NaN como faltante igual que el tipo str de pandas 3 cuando la versión lo permite.
+    """
+    if importlib.util.find_spec('pyarrow') is None:
+        return None
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        return pd.StringDtype('pyarrow')
+
+
+TIPO_TEXTO = _tipo_texto()
+
+
+def _valor_texto(valor):
+    if pd.isna(valor):
+        return valor
+    if isinstance(valor, float) and valor.is_integer():
+        # 123.0 (Excel o una columna con faltantes) es el código '123'
+        return str(int(valor))
+    return str(valor)
+
+
+def normalizar_texto(serie: pd.Series) -> pd.Series:
+    """Convierte la columna a texto conservando los faltantes, sin '.0' en los números enteros"""
+    if serie.dtype != object or pd.api.types.infer_dtype(serie, skipna=True) != 'string':
+        if not isinstance(serie.dtype, pd.StringDtype):
+            serie = serie.map(_valor_texto).astype(object)
+    return serie.astype(TIPO_TEXTO if TIPO_TEXTO is not None else str)
+
+
+def texto_fijo(df: pd.DataFrame, columnas: Sequence[str] = COLUMNAS_TEXTO + COLUMNAS_CATEGORICAS) -> pd.DataFrame:
+    """
+    Pasa a texto las columnas indicadas que sean object o categóricas con categorías
+    object (números y textos mezclados): parquet necesita un tipo único por columna.
+    """
+    cambios = {}
+    for columna in columnas:
+        if columna not in df.columns:
+            continue
+        serie = df[columna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            if serie.cat.categories.dtype == object:
+                cambios[columna] = normalizar_texto(serie.astype(object)).astype('category')
+        elif serie.dtype == object:
+            cambios[columna] = normalizar_texto(serie)
+    return df.assign(**cambios) if cambios else df
+
+
+def compactar_tipos(df: pd.DataFrame, categoricas: Sequence[str] = COLUMNAS_CATEGORICAS) -> pd.DataFrame:
+    """
+    Convierte las columnas de texto a strings de Arrow y las de pocos valores
+    distintos a categóricas. Los precios quedan en float64: con float32 se
+    perderían centavos en precios grandes y el xlsx mostraría decimales espurios.
+
+    CODIGO y DESCRIPCION se pasan siempre a texto (123 y 'A-1' quedan '123' y
+    'A-1'), así los escritores (xlsx, parquet) reciben un tipo estable. Las demás
+    columnas object solo se convierten si todos sus valores ya son texto.
+    """
+    columnas = {}
+    for columna in df.columns:
+        serie = df[columna]
+        if columna in COLUMNAS_TEXTO:
+            if TIPO_TEXTO is None or serie.dtype != TIPO_TEXTO:
+                columnas[columna] = normalizar_texto(serie)
+        elif columna in categoricas:
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                columnas[columna] = serie.astype('category')
+        elif TIPO_TEXTO is None or serie.dtype == TIPO_TEXTO:
+            continue
+        elif isinstance(serie.dtype, pd.StringDtype) or \
+                (serie.dtype == object and pd.api.types.infer_dtype(serie, skipna=True) == 'string'):
+            columnas[columna] = serie.astype(TIPO_TEXTO)
+    if not columnas:
+        return df
+    return df.assign(**columnas)
+
+
+def concatenar_bloques(dfs: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatena bloques u hojas conservando las columnas categóricas: pd.concat las
+    convierte a object si las categorías de cada bloque difieren, así que antes se
+    unifican las categorías de todos los bloques.
+    """
+    if len(dfs) > 1:
+        for columna in dfs[0].columns:
+            if not all(isinstance(df[columna].dtype, pd.CategoricalDtype) for df in dfs):
+                continue
+            categorias = pd.api.types.union_categoricals([df[columna] for df in dfs]).categories
+            dfs = [df.assign(**{columna: df[columna].cat.set_categories(categorias)}) for df in dfs]
+    return pd.concat(dfs, ignore_index=True)
+
+
+def rss_actual_mb() -> Optional[float]:
+    """
+    Memoria residente actual del proceso en MB, de /proc/self/statm (None fuera de Linux).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return paginas * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def rss_pico_mb() -> Optional[float]:
+    """
+    Pico de memoria residente en toda la vida del proceso, en MB (None si la plataforma
+    no lo informa). Solo crece: no sirve para comparar etapas, para eso está rss_actual_mb.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def memoria_df_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+class ReporteMemoria:
+    """
+    Memoria por etapa del procesamiento de un proveedor: RSS actual del proceso al
+    terminar la etapa, pico de RSS del proceso hasta ese momento y memoria del
+    DataFrame (memory_usage(deep=True)).
+
+    El RSS es del proceso completo: con varios proveedores en paralelo incluye la
+    memoria de los demás pipelines. Para comparar etapas, la medida propia del
+    proveedor es df_mb.
+    """
+
+    def __init__(self, proveedor: str):
+        self.proveedor = proveedor
+        self.etapas: List[Dict[str, Any]] = []
+
+    def registrar(self, etapa: str, df: Optional[pd.DataFrame] = None):
+        self.etapas.append({
+            'etapa': etapa,
+            'rss_mb': rss_actual_mb(),
+            'rss_pico_proceso_mb': rss_pico_mb(),
+            'df_mb': round(memoria_df_mb(df), 2) if df is not None else None,
+            'filas': len(df) if df is not None else None
+        })
+
+    def imprimir(self):
+        print(f"🧠 Memoria de {self.proveedor}:")
+        mb = lambda valor: f"{valor:,.1f} MB" if valor is not None else "n/d"
+        for e in self.etapas:
+            df = f"{e['df_mb']:,.2f} MB ({e['filas']:,} filas)" if e['df_mb'] is not None else "-"
+            print(f"   {e['etapa'].ljust(14)} RSS {mb(e['rss_mb']).rjust(12)} | "
+                  f"pico del proceso {mb(e['rss_pico_proceso_mb']).rjust(12)} | DataFrame {df}")
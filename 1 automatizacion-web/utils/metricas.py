@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+
+DIRECTORIO_METRICAS = "metricas"
+
+
+class RegistroMetricas:
+    """
+    Métricas estructuradas de una ejecución: una línea JSON por etapa y proveedor
+    (duración y datos adicionales) en metricas/metricas_<ejecucion>.jsonl.
+
+    Opcionalmente adjunta a cada etapa un perfil de cProfile (archivo .prof, del hilo
+    que ejecuta la etapa; las etapas anidadas quedan dentro del perfil de la etapa
+    exterior) y la diferencia de tracemalloc entre el inicio y el fin de la etapa.
+
+    tracemalloc es global al proceso: con varios proveedores en paralelo, la
+    diferencia incluye también las asignaciones de los demás pipelines.
+    """
+
+    def __init__(self, habilitado: bool = True, directorio: str = DIRECTORIO_METRICAS,
+                 cprofile: bool = False, memoria: bool = False, top_memoria: int = 10):
+        self.habilitado = habilitado
+        self.cprofile = habilitado and cprofile
+        self.memoria = habilitado and memoria
+        self.top_memoria = top_memoria
+        self.id_ejecucion = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.directorio = directorio
+        self.ruta = os.path.join(directorio, f"metricas_{self.id_ejecucion}.jsonl")
+        self._lock = threading.Lock()
+        # Un solo perfil activo por hilo: cProfile no admite perfiles anidados
+        self._hilo = threading.local()
+
+        if self.habilitado:
+            os.makedirs(directorio, exist_ok=True)
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def registrar(self, proveedor: Optional[str], etapa: str, segundos: Optional[float], **extra):
+        """Agrega una línea al archivo de métricas"""
+        if not self.habilitado:
+            return
+        linea = {
+            "ejecucion": self.id_ejecucion,
+            "fecha": datetime.now().isoformat(timespec="milliseconds"),
+            "proveedor": proveedor or "general",
+            "etapa": etapa,
+            "segundos": round(segundos, 6) if segundos is not None else None,
+            **extra
+        }
+        with self._lock:
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                f.write(json.dumps(linea, ensure_ascii=False, default=str) + "\n")
+
+    @contextmanager
+    def etapa(self, proveedor: Optional[str], etapa: str, **extra) -> Iterator[Dict[str, Any]]:
+        """
+        Mide la duración del bloque y la registra al salir. El dict devuelto permite
+        agregar datos a la línea (por ejemplo, filas procesadas); al salir queda en él
+        la duración medida ('segundos').
+        """
+        if not self.habilitado:
+            yield extra
+            return
+
+        perfil = cProfile.Profile() if self.cprofile and not getattr(self._hilo, "perfilando", False) else None
+        antes = tracemalloc.take_snapshot() if self.memoria else None
+        inicio = time.perf_counter()
+        if perfil:
+            self._hilo.perfilando = True
+            perfil.enable()
+        try:
+            yield extra
+        except Exception as e:
+            extra["error"] = str(e)
+            raise
+        finally:
+            if perfil:
+                perfil.disable()
+                self._hilo.perfilando = False
+            segundos = time.perf_counter() - inicio
+            if perfil:
+                extra["perfil"] = self._guardar_perfil(perfil, proveedor, etapa)
+            if antes is not None:
+                extra["tracemalloc"] = self._diferencia_memoria(antes)
+            self.registrar(proveedor, etapa, segundos, **extra)
+            extra["segundos"] = segundos
+
+    def _guardar_perfil(self, perfil: cProfile.Profile, proveedor: Optional[str], etapa: str) -> str:
+        directorio = os.path.join(self.directorio, "perfiles")
+        os.makedirs(directorio, exist_ok=True)
+        ruta = os.path.join(directorio, f"{self.id_ejecucion}_{proveedor or 'general'}_{etapa}.prof")
+        perfil.dump_stats(ruta)
+        return ruta
+
+    def _diferencia_memoria(self, antes) -> Dict[str, Any]:
+        despues = tracemalloc.take_snapshot()
+        actual, pico = tracemalloc.get_traced_memory()
+        diferencias = despues.compare_to(antes, "lineno")[:self.top_memoria]
+        return {
+            "actual_mb": round(actual / (1024 * 1024), 3),
+            "pico_mb": round(pico / (1024 * 1024), 3),
+            "top": [{"linea": str(d.traceback[0]), "diferencia_kb": round(d.size_diff / 1024, 1),
+                     "bloques": d.count_diff} for d in diferencias]
+        }
+
+    def registrar_tiempos_descarga(self, registro_tiempos):
+        """
+        Vuelca el presupuesto de tiempos de la descarga (RegistroTiempos): una línea por servicio y paso.
+        """
+        for servicio, datos in registro_tiempos.reporte().items():
+            for paso, valores in datos["pasos"].items():
+                self.registrar(servicio, f"descarga.{paso}", valores["espera"] + valores["trabajo"],
+                               espera=round(valores["espera"], 6), trabajo=round(valores["trabajo"], 6))
+            self.registrar(servicio, "descarga.total", datos["total"],
+                           espera=round(datos["espera"], 6), trabajo=round(datos["trabajo"], 6))
+
+
+# Registro que no escribe nada, para cuando no se piden métricas
+SIN_METRICAS = RegistroMetricas(habilitado=False)
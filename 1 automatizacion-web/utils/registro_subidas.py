@@ -0,0 +1,66 @@
+import os
+import threading
+import datetime
+from typing import Any, Dict, Optional
+from config.config import VIGENCIA_REGISTRO_SUBIDAS_HORAS
+from utils.manifiesto import calcular_hash, cargar_manifiesto, guardar_manifiesto
+
+
+RUTA_REGISTRO_SUBIDAS = os.path.join("datos_procesados", "registro_subidas.json")
+
+_lock_registro = threading.Lock()
+
+
+def _vencida(entrada: Dict[str, Any], vigencia_horas: float, ahora: datetime.datetime) -> bool:
+    if vigencia_horas <= 0:
+        return False
+    try:
+        fecha = datetime.datetime.fromisoformat(entrada["fecha"])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return ahora - fecha > datetime.timedelta(hours=vigencia_horas)
+
+
+def buscar_subida(hash_procesado: str, api_url: str, vigencia_horas: float = VIGENCIA_REGISTRO_SUBIDAS_HORAS,
+                  ruta: str = RUTA_REGISTRO_SUBIDAS) -> Optional[Dict[str, Any]]:
+    """
+    Devuelve la subida registrada para un contenido (hash SHA-256 del archivo procesado)
+    si existe, se hizo a la misma API y no venció, o None. Así un link de una API de
+    pruebas (benchmarks/api_stub.py) no se reutiliza en una ejecución contra la API real.
+    """
+    entrada = cargar_manifiesto(ruta).get(hash_procesado)
+    if not entrada or not entrada.get("link") or entrada.get("api_url") != api_url:
+        return None
+    if _vencida(entrada, vigencia_horas, datetime.datetime.now()):
+        return None
+    return entrada
+
+
+def registrar_subida(hash_procesado: str, link: str, archivo: str, api_url: str,
+                     vigencia_horas: float = VIGENCIA_REGISTRO_SUBIDAS_HORAS,
+                     ruta: str = RUTA_REGISTRO_SUBIDAS):
+    """
+    Registra el link devuelto por la API para un contenido y descarta las entradas vencidas.
+    """
+    ahora = datetime.datetime.now()
+    with _lock_registro:
+        registro = cargar_manifiesto(ruta)
+        registro = {h: e for h, e in registro.items() if not _vencida(e, vigencia_horas, ahora)}
+        registro[hash_procesado] = {
+            "link": link,
+            "archivo": archivo,
+            "api_url": api_url,
+            "fecha": ahora.isoformat(timespec="seconds")
+        }
+        guardar_manifiesto(registro, ruta)
+
+
+def subida_registrada(ruta_archivo: str, api_url: str, **kwargs) -> tuple:
+    """
+    Calcula el hash del archivo y busca su subida a api_url en el registro.
+
+    Returns:
+        (hash_procesado, entrada o None)
+    """
+    hash_procesado = calcular_hash(ruta_archivo)
+    return hash_procesado, buscar_subida(hash_procesado, api_url, **kwargs)
@@ -0,0 +1,105 @@
+import pandas as pd
+from typing import Dict, List, Optional
+from utils.utils import columnas_requeridas, parsear_precio
+from utils.memoria import compactar_tipos
+
+
+class PlanTransformacion:
+    """
+    Transformación de un proveedor compilada a partir de su ProveedorConfig.
+
+    Se resuelve una sola vez qué columnas del origen hacen falta para cada columna
+    requerida; luego cada bloque u hoja se transforma en una pasada: se filtran las
+    filas sin CODIGO, se calculan las cuatro columnas finales y se arma un único
+    DataFrame de salida, sin renombrar ni copiar el DataFrame original. La salida
+    usa tipos compactos (MARCA categórica, textos de Arrow).
+    """
+
+    def __init__(self, columnas: Dict[str, str], concatenar: Optional[Dict[str, List[str]]] = None,
+                 eliminar_caracteres: Optional[Dict[str, str]] = None, truncar: Optional[Dict[str, int]] = None,
+                 limpiar_codigo: bool = False, marca_desde_hoja: bool = False,
+                 separador_decimal: Optional[str] = None, separador_miles: Optional[str] = None):
+        # Columna requerida -> columna del origen
+        self.origen = {destino: origen for origen, destino in columnas.items()}
+        # Columna requerida -> columnas del origen que se unen con un espacio
+        self.concatenar = {destino: list(fuentes) for destino, fuentes in (concatenar or {}).items()}
+        self.eliminar_caracteres = eliminar_caracteres or {}
+        self.truncar = truncar or {}
+        self.limpiar_codigo = limpiar_codigo
+        self.marca_desde_hoja = marca_desde_hoja
+        self.separador_decimal = separador_decimal
+        self.separador_miles = separador_miles
+
+        if 'CODIGO' not in self.origen:
+            raise ValueError("La configuración del proveedor no define la columna de origen de CODIGO")
+        faltantes = [c for c in columnas_requeridas
+                     if c not in self.origen and c not in self.concatenar and not (c == 'MARCA' and marca_desde_hoja)]
+        if faltantes:
+            raise ValueError(f"La configuración del proveedor no define las columnas {faltantes}")
+
+        self.columna_codigo = self.origen['CODIGO']
+
+    def _texto(self, df: pd.DataFrame, columna: str) -> pd.Series:
+        return df[columna].fillna('').astype(str)
+
+    def _columna_texto(self, df: pd.DataFrame, destino: str) -> pd.Series:
+        if destino in self.concatenar:
+            fuentes = self.concatenar[destino]
+            serie = self._texto(df, fuentes[0])
+            for fuente in fuentes[1:]:
+                serie = serie + ' ' + self._texto(df, fuente)
+        else:
+            serie = df[self.origen[destino]]
+
+        if destino in self.eliminar_caracteres:
+            for caracter in self.eliminar_caracteres[destino]:
+                serie = serie.str.replace(caracter, '', regex=False)
+        if destino in self.truncar:
+            serie = serie.str[:self.truncar[destino]]
+        return serie
+
+    def aplicar(self, df: pd.DataFrame, hoja: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Transforma un bloque (o una hoja) del archivo del proveedor.
+
+        Returns:
+            DataFrame con las columnas requeridas, o None si falta la columna de CODIGO
+        """
+        if self.columna_codigo not in df.columns:
+            print(f"Hoja {hoja} sin columna {self.columna_codigo}, se omite." if hoja
+                  else f"Bloque sin columna {self.columna_codigo}, se omite.")
+            return None
+
+        validas = df[self.columna_codigo].notna()
+        if not validas.all():
+            df = df.loc[validas]
+
+        codigo = df[self.columna_codigo]
+        if self.limpiar_codigo:
+            codigo = codigo.astype(str).str.strip()
+
+        # Mismo orden que columnas_requeridas
+        salida = {
+            'CODIGO': codigo,
+            'DESCRIPCION': self._columna_texto(df, 'DESCRIPCION'),
+            'MARCA': hoja if self.marca_desde_hoja else self._columna_texto(df, 'MARCA'),
+            'PRECIO': parsear_precio(df[self.origen['PRECIO']], self.separador_decimal,
+                                     self.separador_miles).fillna(0)
+        }
+        return compactar_tipos(pd.DataFrame(salida, index=df.index))
+
+
+def compilar_plan(config) -> PlanTransformacion:
+    """
+    Compila la configuración declarativa de un proveedor (ProveedorConfig) en su plan de transformación.
+    """
+    return PlanTransformacion(
+        columnas=config.columnas,
+        concatenar=config.concatenar,
+        eliminar_caracteres=config.eliminar_caracteres,
+        truncar=config.truncar,
+        limpiar_codigo=config.limpiar_codigo,
+        marca_desde_hoja=config.marca_desde_hoja,
+        separador_decimal=config.separador_decimal,
+        separador_miles=config.separador_miles
+    )
@@ -1,6 +1,10 @@
 import os
+import glob
+import time
+import numpy as np
 import pandas as pd
-from controller.fetch_data_controller import upload_files
+from controller.fetch_data_controller import upload_files, obtener_cliente_subida
+from utils.escritores import escribir, abrir_escritor, formato_subida, formatos_archivo, filas_fragmento_subida
 
 
 columnas_requeridas = ['CODIGO', 'DESCRIPCION', 'MARCA', 'PRECIO']
@@ -13,20 +17,75 @@ def renombrar_columnas(df, viejas_columnas, nuevas_columnas):
     df.rename(columns=nuevas_columnas, inplace=True)
     return df
 
-def formatear_precio(df):
+def detectar_separadores(texto, tamano_muestra=1000):
     """
-    Formatea la columna PRECIO para usar punto como separador decimal y eliminar separadores de miles.
+    Detecta los separadores (decimal, miles) de una serie de precios en texto a partir de una muestra.
+    El último separador de cada valor es decimal si no lo sigue un grupo de exactamente 3 dígitos.
+    Si la muestra no decide, se asume el formato local: coma decimal y punto de miles.
+    """
+    muestra = texto.dropna().head(tamano_muestra)
+    ultimos = muestra.str.extract(r'([.,])(\d*)\s*$')
+    decisivos = ultimos[ultimos[1].str.len() != 3][0].dropna()
+    if not decisivos.empty and decisivos.value_counts().idxmax() == '.':
+        return '.', ','
+    return ',', '.'
+
+def _parsear_texto(texto, separador_decimal, separador_miles):
+    if separador_miles:
+        texto = texto.str.replace(separador_miles, '', regex=False)
+    if separador_decimal and separador_decimal != '.':
+        texto = texto.str.replace(separador_decimal, '.', regex=False)
+    return pd.to_numeric(texto, errors='coerce')
+
+def parsear_precio(serie, separador_decimal=None, separador_miles=None):
+    """
+    Convierte una serie de precios a float de forma vectorizada.
+
+    Los valores que ya son numéricos (por ejemplo, floats de Excel) se conservan tal cual;
+    solo se parsean los textos, quitando el separador de miles y usando punto decimal.
+    Si no se indican los separadores del proveedor se detectan con detectar_separadores.
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype('float64')
+
+    # Separar los valores de texto de los numéricos (columnas mixtas de Excel)
+    tipo = pd.api.types.infer_dtype(serie, skipna=True)
+    if tipo in ('string', 'empty'):
+        es_texto = serie.notna()
+    elif tipo in ('floating', 'integer', 'mixed-integer-float', 'decimal'):
+        return pd.to_numeric(serie, errors='coerce').astype('float64')
+    else:
+        es_texto = serie.map(lambda valor: isinstance(valor, str)).astype(bool)
+
+    if es_texto.all():
+        resultado = pd.Series(np.nan, index=serie.index, dtype='float64')
+    else:
+        resultado = pd.to_numeric(serie.where(~es_texto), errors='coerce').astype('float64')
+        if not es_texto.any():
+            return resultado
+
+    texto = serie[es_texto].astype(str)
+    if separador_decimal is None and separador_miles is None:
+        separador_decimal, separador_miles = detectar_separadores(texto)
+    valores = _parsear_texto(texto, separador_decimal, separador_miles)
+
+    # Segunda pasada solo para los textos con símbolos o espacios ("$ 1.234,56")
+    fallidos = valores.isna() & texto.ne('')
+    if fallidos.any():
+        limpio = texto[fallidos].str.replace(r'[^\d,.\-]', '', regex=True)
+        valores.loc[fallidos] = _parsear_texto(limpio, separador_decimal, separador_miles)
+
+    resultado.loc[es_texto] = valores
+    return resultado
+
+def formatear_precio(df, separador_decimal=None, separador_miles=None):
+    """
+    Formatea la columna PRECIO como float con punto decimal, respetando los separadores
+    del proveedor (automático si no se indican). Los precios inválidos quedan en 0.
     Retorna el DataFrame con PRECIO como float.
     """
     if 'PRECIO' in df.columns:
-        # Convertir a string para limpiar comas/puntos
-        df['PRECIO'] = df['PRECIO'].astype(str)
-        # Reemplazar comas y puntos de separadores de miles
-        df['PRECIO'] = df['PRECIO'].str.replace(',', '').str.replace('.', '', regex=False)
-        # Convertir a float
-        df['PRECIO'] = pd.to_numeric(df['PRECIO'], errors='coerce') / 100  # Dividir por 100 para ajustar decimales
-        # Reemplazar NaN con 0
-        df['PRECIO'] = df['PRECIO'].fillna(0)
+        df['PRECIO'] = parsear_precio(df['PRECIO'], separador_decimal, separador_miles).fillna(0)
     return df
 
 def filtrar_columnas(df):
@@ -42,11 +101,21 @@ def print_data(df):
     print("Primeras 5 filas:")
     print(df.head())
 
-def export_data(df, proveedor, directorio="datos_procesados"):
+def export_data(df, proveedor, directorio="datos_procesados", formato=None, formatos_extra=None, forzar=False, sufijo="",
+                filas_por_fragmento=None):
     """
     Exporta el DataFrame a un archivo Excel con el nombre del proveedor y la fecha actual.
+    Opcionalmente escribe copias en otros formatos (csv, parquet) en directorio/archivo.
     Maneja errores de subida sin interrumpir el proceso.
     
+    Args:
+        formato: Formato del archivo a subir ('xlsx' o 'xlsx_streaming'); por defecto, el configurado para el proveedor
+        formatos_extra: Formatos para el archivo interno; por defecto, los configurados para el proveedor
+        forzar: Sube aunque el mismo contenido ya figure en el registro de subidas
+        sufijo: Agregado al nombre del archivo tras el proveedor (por ejemplo '_delta')
+        filas_por_fragmento: Si la lista tiene más filas, se sube en fragmentos de este tamaño
+            (ver subir_fragmentos); por defecto, lo configurado para el proveedor (0 = un solo archivo)
+    
     Returns:
         Dict con información sobre el proceso de exportación y subida
     """
@@ -56,62 +125,288 @@ def export_data(df, proveedor, directorio="datos_procesados"):
         # Obtener la fecha actual en formato YYYYMMDD
         fecha_actual = datetime.datetime.now().strftime("%Y%m%d")
         
-        # Crear el nombre de archivo
-        nombre_archivo = f"{proveedor}_{fecha_actual}.xlsx"
+        # Crear el nombre de archivo (sin extensión, la agrega el escritor)
+        nombre_base = f"{proveedor}{sufijo}_{fecha_actual}"
         
         # Crear el directorio si no existe
         if not os.path.exists(directorio):
             os.makedirs(directorio)
             print(f"Directorio creado: {directorio}")
         
-        # Ruta completa del archivo
-        ruta_completa = os.path.join(directorio, nombre_archivo)
+        # Exportar a Excel para la API (en fragmentos si la lista supera el máximo de filas)
+        formato = formato or formato_subida(proveedor)
+        filas_por_fragmento = filas_fragmento_subida(proveedor) if filas_por_fragmento is None else filas_por_fragmento
+        if filas_por_fragmento and len(df) > filas_por_fragmento:
+            exportacion = escribir_fragmentos(df, os.path.join(directorio, f"{nombre_base}_fragmentos"), formato,
+                                              filas_por_fragmento)
+            ruta_completa = exportacion['ruta']
+            print(f"Archivo exportado: {ruta_completa} ({len(exportacion['fragmentos'])} fragmentos de hasta "
+                  f"{filas_por_fragmento:,} filas, {exportacion['bytes']:,} bytes en {exportacion['segundos']:.2f}s, "
+                  f"{exportacion['formato']})")
+        else:
+            exportacion = escribir(df, os.path.join(directorio, nombre_base), formato)
+            ruta_completa = exportacion['ruta']
+            print(f"Archivo exportado: {ruta_completa} ({exportacion['bytes']:,} bytes en {exportacion['segundos']:.2f}s, {exportacion['formato']})")
         
-        # Exportar a Excel
-        df.to_excel(ruta_completa, index=False, engine='openpyxl')
-        print(f"Archivo exportado: {ruta_completa}")
+        # Copias para el archivo interno
+        archivos_extra = []
+        formatos_extra = formatos_archivo(proveedor) if formatos_extra is None else formatos_extra
+        if formatos_extra:
+            directorio_archivo = os.path.join(directorio, "archivo")
+            os.makedirs(directorio_archivo, exist_ok=True)
+            for formato_extra in formatos_extra:
+                try:
+                    extra = escribir(df, os.path.join(directorio_archivo, nombre_base), formato_extra)
+                    print(f"Archivo exportado: {extra['ruta']} ({extra['bytes']:,} bytes en {extra['segundos']:.2f}s)")
+                    archivos_extra.append(extra)
+                except Exception as e:
+                    print(f"⚠️ No se pudo exportar {proveedor} en formato {formato_extra}: {str(e)}")
         
-        # Intentar subir a la API
-        try:
-            print(f"\n🔄 Intentando subir {nombre_archivo} a la API...")
-            resultado_subida = upload_files(ruta_completa)
-            
-            if resultado_subida and 'link' in resultado_subida:
-                print(f"✅ Archivo subido exitosamente: {resultado_subida['link']}")
-                return {
-                    'archivo_local': ruta_completa,
-                    'subida_exitosa': True,
-                    'link_api': resultado_subida['link'],
-                    'error': None,
-                    'proveedor': proveedor
-                }
-            else:
-                print(f"⚠️ Subida completada pero sin enlace válido")
-                return {
-                    'archivo_local': ruta_completa,
-                    'subida_exitosa': False,
-                    'link_api': None,
-                    'error': 'Sin enlace válido en respuesta',
-                    'proveedor': proveedor
-                }
-                
-        except Exception as e:
-            print(f"❌ Error al subir {nombre_archivo} a la API: {str(e)}")
-            print(f"📁 Archivo guardado localmente en: {ruta_completa}")
+        return subir_exportacion(ruta_completa, proveedor, forzar=forzar, exportacion=exportacion,
+                                 archivos_extra=archivos_extra)
+        
+    except Exception as e:
+        print(f"❌ Error al exportar archivo para {proveedor}: {str(e)}")
+        return {
+            'archivo_local': None,
+            'subida_exitosa': False,
+            'link_api': None,
+            'error': str(e),
+            'proveedor': proveedor
+        }
+
+
+def exportar_lotes(lotes, proveedor, directorio="datos_procesados", formato=None, formatos_extra=None, sufijo=""):
+    """
+    Escribe los lotes (DataFrames con las columnas requeridas) a medida que llegan, en el
+    archivo a subir y en las copias para el archivo interno. En memoria solo hay un lote a la vez.
+
+    Returns:
+        (exportacion, archivos_extra), con los mismos datos que escribir()
+    """
+    import datetime
+
+    fecha_actual = datetime.datetime.now().strftime("%Y%m%d")
+    nombre_base = f"{proveedor}{sufijo}_{fecha_actual}"
+    os.makedirs(directorio, exist_ok=True)
+
+    principal = abrir_escritor(os.path.join(directorio, nombre_base), formato or formato_subida(proveedor),
+                               columnas_requeridas)
+    extras = []
+    formatos_extra = formatos_archivo(proveedor) if formatos_extra is None else formatos_extra
+    if formatos_extra:
+        directorio_archivo = os.path.join(directorio, "archivo")
+        os.makedirs(directorio_archivo, exist_ok=True)
+        for formato_extra in formatos_extra:
+            try:
+                extras.append(abrir_escritor(os.path.join(directorio_archivo, nombre_base), formato_extra,
+                                             columnas_requeridas))
+            except Exception as e:
+                print(f"⚠️ No se pudo exportar {proveedor} en formato {formato_extra}: {str(e)}")
+
+    try:
+        for lote in lotes:
+            principal.escribir(lote)
+            for extra in list(extras):
+                try:
+                    extra.escribir(lote)
+                except Exception as e:
+                    print(f"⚠️ No se pudo exportar {proveedor} en formato {extra.formato}: {str(e)}")
+                    extras.remove(extra)
+    except Exception:
+        # Cerrar los archivos a medio escribir antes de propagar el error
+        for escritor in [principal] + extras:
+            try:
+                escritor.cerrar()
+            except Exception:
+                pass
+        raise
+
+    exportacion = principal.cerrar()
+    exportacion['filas'] = principal.filas
+    print(f"Archivo exportado: {exportacion['ruta']} ({principal.filas:,} filas, {exportacion['bytes']:,} bytes "
+          f"en {exportacion['segundos']:.2f}s, {exportacion['formato']}, por lotes)")
+    archivos_extra = []
+    for extra in extras:
+        archivo = extra.cerrar()
+        print(f"Archivo exportado: {archivo['ruta']} ({archivo['bytes']:,} bytes en {archivo['segundos']:.2f}s)")
+        archivos_extra.append(archivo)
+    return exportacion, archivos_extra
+
+
+def escribir_fragmentos(df, directorio, formato, filas_por_fragmento):
+    """
+    Escribe el DataFrame en fragmentos de hasta filas_por_fragmento filas dentro de
+    directorio (parte_001de004.xlsx, parte_002de004.xlsx, ...).
+
+    Returns:
+        Dict como el de escribir(), con ruta = directorio, bytes y segundos totales,
+        y 'fragmentos' con el resultado de escribir() de cada parte (más sus 'filas')
+    """
+    os.makedirs(directorio, exist_ok=True)
+    # Partes de una exportación anterior del mismo día (pueden ser otra cantidad)
+    for anterior in glob.glob(os.path.join(directorio, "parte_*")):
+        os.remove(anterior)
+
+    total = -(-len(df) // filas_por_fragmento)
+    fragmentos = []
+    for numero, inicio in enumerate(range(0, len(df), filas_por_fragmento), start=1):
+        parte = df.iloc[inicio:inicio + filas_por_fragmento]
+        fragmento = escribir(parte, os.path.join(directorio, f"parte_{numero:03d}de{total:03d}"), formato)
+        fragmento['filas'] = len(parte)
+        fragmentos.append(fragmento)
+
+    return {
+        'formato': formato,
+        'ruta': directorio,
+        'bytes': sum(fragmento['bytes'] for fragmento in fragmentos),
+        'segundos': sum(fragmento['segundos'] for fragmento in fragmentos),
+        'fragmentos': fragmentos
+    }
+
+
+def fragmentos_exportados(directorio):
+    """Reconstruye la exportación de escribir_fragmentos a partir de las partes en disco"""
+    rutas = sorted(ruta for ruta in glob.glob(os.path.join(directorio, "parte_*")) if os.path.isfile(ruta))
+    fragmentos = [{'ruta': ruta, 'bytes': os.path.getsize(ruta), 'filas': None} for ruta in rutas]
+    return {
+        'formato': None,
+        'ruta': directorio,
+        'bytes': sum(fragmento['bytes'] for fragmento in fragmentos),
+        'segundos': 0.0,
+        'fragmentos': fragmentos
+    }
+
+
+def subir_fragmentos(exportacion, proveedor, forzar=False, archivos_extra=None):
+    """
+    Sube los fragmentos de escribir_fragmentos a la vez con el ClienteSubida compartido
+    (concurrencia acotada sobre el pool de conexiones). Cada fragmento se reintenta por
+    separado y queda en el registro de subidas, así que un fallo solo obliga a volver a
+    subir esa parte: en la siguiente ejecución las demás reutilizan su link.
+
+    Returns:
+        Dict como el de export_data; 'link_api' es la lista de links en el orden de las
+        partes (solo si todas se subieron) y 'fragmentos' el resultado de cada una
+    """
+    partes = exportacion['fragmentos']
+    cliente = obtener_cliente_subida()
+    print(f"\n🔄 Subiendo {len(partes)} fragmentos de {proveedor} a la API ({cliente.max_concurrencia} a la vez)...")
+    inicio = time.perf_counter()
+    resultados = cliente.subir_varios([parte['ruta'] for parte in partes], forzar=forzar)
+    segundos = time.perf_counter() - inicio
+
+    fragmentos = []
+    for parte in partes:
+        resultado = resultados[parte['ruta']]
+        respuesta = resultado['respuesta'] or {}
+        link = respuesta.get('link')
+        error = resultado['error'] or (None if link else 'Sin enlace válido en respuesta')
+        nombre = os.path.basename(parte['ruta'])
+        if error:
+            print(f"❌ {nombre}: {error}")
+        else:
+            print(f"✅ {nombre}: {link}")
+        fragmentos.append({
+            'archivo_local': parte['ruta'],
+            'filas': parte.get('filas'),
+            'subida_exitosa': error is None,
+            'link_api': link,
+            'error': error,
+            'desde_registro': respuesta.get('desde_registro', False),
+            'metricas_subida': respuesta.get('metricas')
+        })
+
+    fallidos = [fragmento for fragmento in fragmentos if not fragmento['subida_exitosa']]
+    enviados = sum((fragmento['metricas_subida'] or {}).get('bytes', 0) for fragmento in fragmentos)
+    metricas = {
+        'fragmentos': len(fragmentos),
+        'fallidos': len(fallidos),
+        'bytes': enviados,
+        'bytes_por_segundo': round(enviados / max(segundos, 1e-9), 1),
+        'segundos_totales': round(segundos, 4)
+    }
+    if fallidos:
+        print(f"⚠️ {len(fallidos)} de {len(fragmentos)} fragmentos sin subir; "
+              f"📁 Archivos guardados localmente en: {exportacion['ruta']}")
+    else:
+        print(f"✅ {len(fragmentos)} fragmentos subidos en {segundos:.2f}s "
+              f"({enviados:,} bytes a {metricas['bytes_por_segundo'] / 1024:,.0f} KB/s)")
+
+    return {
+        'archivo_local': exportacion['ruta'],
+        'subida_exitosa': not fallidos,
+        'link_api': None if fallidos else [fragmento['link_api'] for fragmento in fragmentos],
+        'error': "; ".join(f"{os.path.basename(f['archivo_local'])}: {f['error']}" for f in fallidos) or None,
+        'proveedor': proveedor,
+        'exportacion': exportacion,
+        'archivos_extra': archivos_extra or [],
+        'metricas_subida': metricas,
+        'desde_registro': all(fragmento['desde_registro'] for fragmento in fragmentos),
+        'fragmentos': fragmentos
+    }
+
+
+def subir_exportacion(ruta_completa, proveedor, forzar=False, exportacion=None, archivos_extra=None):
+    """
+    Sube a la API un archivo ya exportado y arma el resultado de export_data.
+    Permite reintentar solo la subida (por ejemplo, al reanudar una ejecución) sin volver a exportar.
+    Si ruta_completa es el directorio de una exportación fragmentada, sube sus partes.
+    """
+    if os.path.isdir(ruta_completa):
+        respuesta = subir_fragmentos(exportacion or fragmentos_exportados(ruta_completa), proveedor, forzar=forzar,
+                                     archivos_extra=archivos_extra)
+        respuesta['exportacion'] = exportacion
+        return respuesta
+
+    nombre_archivo = os.path.basename(ruta_completa)
+    archivos_extra = archivos_extra or []
+    
+    # Intentar subir a la API
+    try:
+        print(f"\n🔄 Intentando subir {nombre_archivo} a la API...")
+        resultado_subida = upload_files(ruta_completa, forzar=forzar)
+
+        if resultado_subida and 'link' in resultado_subida:
+            print(f"✅ Archivo subido exitosamente: {resultado_subida['link']}")
+            metricas = resultado_subida.get('metricas')
+            if metricas:
+                print(f"📶 {metricas['bytes']:,} bytes a {metricas['bytes_por_segundo'] / 1024:,.0f} KB/s, "
+                      f"TTFB {metricas['ttfb']:.2f}s, latencia total {metricas['latencia_total']:.2f}s")
+            return {
+                'archivo_local': ruta_completa,
+                'subida_exitosa': True,
+                'link_api': resultado_subida['link'],
+                'error': None,
+                'proveedor': proveedor,
+                'exportacion': exportacion,
+                'archivos_extra': archivos_extra,
+                'metricas_subida': resultado_subida.get('metricas'),
+                'desde_registro': resultado_subida.get('desde_registro', False)
+            }
+        else:
+            print(f"⚠️ Subida completada pero sin enlace válido")
             return {
                 'archivo_local': ruta_completa,
                 'subida_exitosa': False,
                 'link_api': None,
-                'error': str(e),
-                'proveedor': proveedor
+                'error': 'Sin enlace válido en respuesta',
+                'proveedor': proveedor,
+                'exportacion': exportacion,
+                'archivos_extra': archivos_extra,
+                'metricas_subida': (resultado_subida or {}).get('metricas')
             }
-        
+
     except Exception as e:
-        print(f"❌ Error al exportar archivo para {proveedor}: {str(e)}")
+        print(f"❌ Error al subir {nombre_archivo} a la API: {str(e)}")
+        print(f"📁 Archivo guardado localmente en: {ruta_completa}")
         return {
-            'archivo_local': None,
+            'archivo_local': ruta_completa,
             'subida_exitosa': False,
             'link_api': None,
             'error': str(e),
-            'proveedor': proveedor
+            'proveedor': proveedor,
+            'exportacion': exportacion,
+            'archivos_extra': archivos_extra,
+            'metricas_subida': None
         }
@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+from utils.utils import columnas_requeridas
+from utils.delta import CLAVES_DELTA
+from config.config import (VALIDACION_MAX_DUPLICADOS, VALIDACION_MAX_DESCRIPCIONES_VACIAS,
+                           VALIDACION_MAX_PRECIOS_CERO)
+
+
+# Clave de un artículo (la misma que usa el delta)
+CLAVES_VALIDACION = CLAVES_DELTA
+
+# Códigos de ejemplo que se guardan por problema en el reporte
+EJEMPLOS_POR_PROBLEMA = 5
+
+# Problemas sin código de ejemplo (el código es justamente lo que falta)
+SIN_EJEMPLOS = ('codigos_vacios',)
+
+
+def _hash_columna(serie: pd.Series) -> np.ndarray:
+    """
+    Hash por valor (como texto) de cada fila: el mismo valor da el mismo hash en
+    cualquier lote, sin importar las categorías o el tipo de la columna.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Se hashean solo las categorías y se indexa con los códigos
+        categorias = pd.util.hash_array(serie.cat.categories.astype(str).to_numpy(dtype=object), categorize=False)
+        codigos = serie.cat.codes.to_numpy()
+        return np.where(codigos >= 0, categorias[codigos], np.uint64(0))
+    return pd.util.hash_array(serie.astype(str).to_numpy(dtype=object), categorize=False)
+
+
+def hash_claves(df: pd.DataFrame) -> np.ndarray:
+    """Hash de 8 bytes de la clave CODIGO+MARCA de cada fila"""
+    hashes = _hash_columna(df[CLAVES_VALIDACION[0]])
+    for columna in CLAVES_VALIDACION[1:]:
+        hashes = hashes * np.uint64(0x9E3779B97F4A7C15) ^ _hash_columna(df[columna])
+    return hashes
+
+
+@dataclass
+class ReporteValidacion:
+    """Resultado de la validación previa de una lista procesada"""
+    proveedor: str
+    filas: int = 0
+    errores: List[str] = field(default_factory=list)
+    advertencias: List[str] = field(default_factory=list)
+    conteos: Dict[str, int] = field(default_factory=dict)
+    ejemplos: Dict[str, List[Any]] = field(default_factory=dict)
+
+    @property
+    def valido(self) -> bool:
+        return not self.errores
+
+    def resumen(self) -> str:
+        conteos = ", ".join(f"{nombre.replace('_', ' ')} {cantidad:,}" for nombre, cantidad in self.conteos.items())
+        linea = f"{self.proveedor}: {self.filas:,} filas" + (f" | {conteos}" if conteos else "")
+        if self.errores:
+            linea += " | " + "; ".join(self.errores)
+        return linea
+
+    def imprimir(self):
+        print(f"{'✅' if self.valido else '❌'} Validación {self.resumen()}")
+        for advertencia in self.advertencias:
+            print(f"   ⚠️ {advertencia}")
+        for problema, ejemplos in self.ejemplos.items():
+            if ejemplos:
+                print(f"   • {problema.replace('_', ' ')}: p. ej. {', '.join(map(str, ejemplos))}")
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            'valido': self.valido,
+            'filas': self.filas,
+            'errores': self.errores,
+            'advertencias': self.advertencias,
+            'conteos': self.conteos,
+            'ejemplos': self.ejemplos
+        }
+
+
+class ErrorValidacion(ValueError):
+    """La lista no pasa la validación previa: no se exporta ni se sube"""
+
+    def __init__(self, reporte: ReporteValidacion):
+        super().__init__(f"Validación previa fallida: {reporte.resumen()}")
+        self.reporte = reporte
+
+
+class ValidadorLista:
+    """
+    Validación vectorizada de la lista de un proveedor antes de exportarla y subirla.
+
+    Se le pueden pasar los lotes de a uno (modo por lotes) o la lista completa. Los
+    problemas de estructura (columnas requeridas faltantes, PRECIO no numérico) cortan
+    de inmediato con ErrorValidacion. Las claves CODIGO+MARCA duplicadas, las
+    descripciones vacías y los precios en 0 (los que formatear_precio no pudo parsear y
+    completó con fillna(0)) se cuentan, y son error si superan la fracción máxima
+    configurada (VALIDACION_MAX_*); los códigos vacíos y precios negativos solo se
+    advierten. Para los duplicados entre lotes se guarda solo un hash de 8 bytes por fila.
+    """
+
+    def __init__(self, proveedor: str, max_duplicados: float = VALIDACION_MAX_DUPLICADOS,
+                 max_descripciones_vacias: float = VALIDACION_MAX_DESCRIPCIONES_VACIAS,
+                 max_precios_cero: float = VALIDACION_MAX_PRECIOS_CERO):
+        self.reporte = ReporteValidacion(proveedor)
+        self.maximos = {
+            'claves_duplicadas': max_duplicados,
+            'descripciones_vacias': max_descripciones_vacias,
+            'precios_cero': max_precios_cero
+        }
+        self.conteos = {'claves_duplicadas': 0, 'codigos_vacios': 0, 'descripciones_vacias': 0,
+                        'precios_cero': 0, 'precios_negativos': 0}
+        self.ejemplos: Dict[str, List[Any]] = {problema: [] for problema in self.conteos}
+        self._hashes: List[np.ndarray] = []
+
+    def _fallar(self, error: str):
+        self.reporte.errores.append(error)
+        self.reporte.conteos = {problema: cantidad for problema, cantidad in self.conteos.items() if cantidad}
+        raise ErrorValidacion(self.reporte)
+
+    def _contar(self, problema: str, df: pd.DataFrame, mascara: pd.Series):
+        cantidad = int(mascara.sum())
+        if not cantidad:
+            return
+        self.conteos[problema] += cantidad
+        faltan = EJEMPLOS_POR_PROBLEMA - len(self.ejemplos[problema])
+        if faltan > 0 and problema not in SIN_EJEMPLOS:
+            self.ejemplos[problema].extend(df.loc[mascara, 'CODIGO'].head(faltan).tolist())
+
+    def _vacios(self, serie: pd.Series) -> pd.Series:
+        return serie.isna() | serie.astype(str).str.strip().eq('')
+
+    def agregar(self, df: pd.DataFrame):
+        """Valida un lote (o la lista completa) y acumula los conteos"""
+        faltantes = [columna for columna in columnas_requeridas if columna not in df.columns]
+        if faltantes:
+            self._fallar(f"faltan las columnas requeridas {faltantes}")
+        if not pd.api.types.is_numeric_dtype(df['PRECIO']):
+            self._fallar(f"PRECIO no es numérico ({df['PRECIO'].dtype})")
+
+        self.reporte.filas += len(df)
+        precio = df['PRECIO']
+        self._contar('codigos_vacios', df, self._vacios(df['CODIGO']))
+        self._contar('descripciones_vacias', df, self._vacios(df['DESCRIPCION']))
+        self._contar('precios_cero', df, precio.eq(0) | precio.isna())
+        self._contar('precios_negativos', df, precio.lt(0))
+        self._hashes.append(hash_claves(df))
+
+    def _duplicados(self) -> int:
+        if not self._hashes:
+            return 0
+        hashes = np.concatenate(self._hashes) if len(self._hashes) > 1 else self._hashes[0]
+        return len(hashes) - len(pd.unique(hashes))
+
+    def finalizar(self) -> ReporteValidacion:
+        """Aplica los máximos configurados y devuelve el reporte"""
+        reporte = self.reporte
+        self.conteos['claves_duplicadas'] = self._duplicados()
+        reporte.conteos = {problema: cantidad for problema, cantidad in self.conteos.items() if cantidad}
+        reporte.ejemplos = {problema: ejemplos for problema, ejemplos in self.ejemplos.items() if ejemplos}
+
+        if reporte.filas == 0:
+            reporte.errores.append("la lista no tiene filas")
+            return reporte
+        for problema, maximo in self.maximos.items():
+            fraccion = self.conteos[problema] / reporte.filas
+            if not fraccion:
+                continue
+            mensaje = f"{problema.replace('_', ' ')}: {self.conteos[problema]:,} ({fraccion:.1%})"
+            if fraccion > maximo:
+                reporte.errores.append(f"{mensaje}, máximo {maximo:.0%}")
+            else:
+                reporte.advertencias.append(mensaje)
+        for problema in ('codigos_vacios', 'precios_negativos'):
+            if self.conteos[problema]:
+                reporte.advertencias.append(f"{problema.replace('_', ' ')}: {self.conteos[problema]:,}")
+        return reporte
+
+
+def validar_lista(df: pd.DataFrame, proveedor: str, **maximos) -> ReporteValidacion:
+    """
+    Valida la lista completa de un proveedor antes de exportarla.
+
+    Returns:
+        ReporteValidacion (reporte.valido indica si se puede subir)
+    """
+    validador = ValidadorLista(proveedor, **maximos)
+    try:
+        validador.agregar(df)
+    except ErrorValidacion as e:
+        return e.reporte
+    return validador.finalizar()